@@ -0,0 +1,154 @@
+"""
+JSON File Cache
+Process-level cache for P.json and story files
+
+Entries are keyed on path and validated with one os.stat() per access
+(inode + mtime_ns + size), so unchanged files are never re-read or
+re-parsed. The inode catches a same-size os.replace() within one mtime
+tick. Writers call invalidate() (or put()) after writing.
+
+Cached values are shared - treat them as read-only. Code that modifies a
+loaded value asks for private copies of just the sections it changes
+(load(..., copy_sections=("wave_state",))), so a gate update does not copy
+the codebase file listing.
+
+Usage:
+    cache = get_json_cache()
+    p = cache.load(p_json_path)                                   # read
+    p = cache.load(p_json_path, copy_sections=("wave_state",))    # modify
+    ...
+    cache.invalidate(p_json_path)   # after writing
+"""
+
+import os
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FILE CACHE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class JSONFileCache:
+    """
+    Parsed JSON files keyed on path, validated by inode, mtime and size.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(
+        self,
+        path: str,
+        copy_sections: Union[bool, Iterable[str], None] = None
+    ) -> Optional[Any]:
+        """
+        Load a JSON file through the cache.
+
+        Args:
+            path: File path
+            copy_sections: Top-level sections to return as private copies
+                (the rest of a dict is shared, shallow-copied at the top
+                level); True copies everything
+
+        Returns:
+            Parsed value, or None if the file is missing
+
+        Raises:
+            json.JSONDecodeError: File is not valid JSON
+            IOError: File could not be read
+        """
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.invalidate(path)
+            return None
+
+        key = file_stamp(st)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            value = entry[1]
+        else:
+            self.misses += 1
+            with open(path, "r") as f:
+                value = json.load(f)
+            with self._lock:
+                self._entries[path] = (key, value)
+
+        if copy_sections is True or (copy_sections and not isinstance(value, dict)):
+            return _deep_copy(value)
+        if copy_sections:
+            copied = dict(value)
+            for section in copy_sections:
+                if section in copied:
+                    copied[section] = _deep_copy(copied[section])
+            return copied
+        return value
+
+    def put(self, path: str, value: Any) -> None:
+        """Prime the cache with a value just written to path."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._entries[path] = (file_stamp(st), value)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop one path (or everything) from the cache."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def file_stamp(st: os.stat_result) -> Tuple[int, int, int]:
+    """Cache validation key of a stat result."""
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _deep_copy(value: Any) -> Any:
+    # JSON round-trip is several times faster than copy.deepcopy for JSON data
+    if isinstance(value, (dict, list)):
+        return json.loads(json.dumps(value))
+    return value
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HELPER FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Global singleton
+_json_cache: Optional[JSONFileCache] = None
+
+
+def get_json_cache() -> JSONFileCache:
+    """Get or create global JSON file cache instance"""
+    global _json_cache
+    if _json_cache is None:
+        _json_cache = JSONFileCache()
+    return _json_cache
+
+
+def invalidate_json_cache(path: Optional[str] = None) -> None:
+    """Invalidation hook for writers of cached files."""
+    get_json_cache().invalidate(path)
+
+
+__all__ = [
+    "JSONFileCache",
+    "file_stamp",
+    "get_json_cache",
+    "invalidate_json_cache",
+]
@@ -0,0 +1,453 @@
+"""
+P Variable Redis Mirror
+Shared, change-notified copy of .claude/P.json for multi-worker deployments
+
+Layout (per project):
+    wave:p:{project}:s:{section}   hash - one per top-level section,
+                                   field per key (JSON-encoded value)
+    wave:p:{project}:sections      set of section names
+    wave:p:{project}:version       counter, incremented on every change
+    wave:p:{project}:source        P.json stamp the mirror was published from
+    wave:p:{project}:changed       pub/sub channel: {"version", "sections"}
+
+The process that writes P.json (PVariableStore) republishes only the
+sections a write touched. Readers keep a local per-section cache that the
+change channel invalidates, so reading context costs no disk I/O and no
+Redis round trip until something changes. If the subscription drops,
+readers fall back to checking the version key on each read.
+
+The mirror is only as fresh as its last publish: writes that bypass the
+store (another process without WAVE_P_MIRROR, direct P.json writes) or a
+failed publish would leave it stale. Each publish therefore records the
+on-disk stamp it was made from (PVariableStore.source_stamp), readers that
+can see P.json pass their own stamp to get(), and a mismatch falls back to
+disk and republishes (resync_store). After a failed publish the next write
+republishes every section.
+
+Enable with WAVE_P_MIRROR=1 (and REDIS_URL). The project key defaults to
+the project directory name; set WAVE_PROJECT_ID when containers mount the
+project under different names.
+
+Usage:
+    mirror = get_p_mirror(repo_path)
+    if mirror:
+        p = mirror.get()                      # whole P Variable
+        state = mirror.get(["wave_state"])    # selected sections
+"""
+
+import os
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+# Redis client
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+P_MIRROR_ENABLED = os.getenv("WAVE_P_MIRROR", "").lower() in ("1", "true", "yes")
+
+P_MIRROR_PREFIX = "wave:p"
+
+# Hash field used for sections that are not objects
+SCALAR_FIELD = "__value__"
+
+_MISSING = object()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENCODING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def encode_section(value: Any) -> Dict[str, str]:
+    """Section value -> hash fields."""
+    if isinstance(value, dict):
+        return {str(key): json.dumps(item) for key, item in value.items()}
+    return {SCALAR_FIELD: json.dumps(value)}
+
+
+def decode_section(fields: Dict[str, str]) -> Any:
+    """Hash fields -> section value."""
+    if len(fields) == 1 and SCALAR_FIELD in fields:
+        return json.loads(fields[SCALAR_FIELD])
+    return {key: json.loads(item) for key, item in fields.items()}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MIRROR
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class PVariableMirror:
+    """
+    Redis mirror of one project's P Variable, with a local read cache.
+    """
+
+    def __init__(self, project_id: str, redis_url: Optional[str] = None, subscribe: bool = True):
+        """
+        Initialize mirror.
+
+        Args:
+            project_id: Project key shared by all workers
+            redis_url: Redis connection URL (default: from env or localhost)
+            subscribe: Listen for change notifications (readers)
+        """
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package not installed. Run: pip install redis")
+
+        self.redis = redis.from_url(
+            redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"),
+            decode_responses=True
+        )
+        self.project_id = project_id
+        self.prefix = f"{P_MIRROR_PREFIX}:{project_id}"
+        self.sections_key = f"{self.prefix}:sections"
+        self.version_key = f"{self.prefix}:version"
+        self.source_key = f"{self.prefix}:source"
+        self.channel = f"{self.prefix}:changed"
+
+        # Local cache: section -> value, and the version each was fetched at
+        self._cache: Dict[str, Any] = {}
+        self._cache_versions: Dict[str, int] = {}
+        self._invalidated_at: Dict[str, int] = {}
+        self._section_names: Optional[List[str]] = None
+        self._source: Optional[str] = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._listening = False
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        # Set when a publish failed: the next publish sends every section
+        self.dirty = False
+
+        if subscribe:
+            self.subscribe()
+
+    def _section_key(self, section: str) -> str:
+        return f"{self.prefix}:s:{section}"
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # PUBLISH (writer)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def publish(
+        self,
+        p_variable: Dict[str, Any],
+        sections: Optional[Iterable[str]] = None,
+        source: Optional[str] = None
+    ) -> int:
+        """
+        Write sections to Redis and notify readers.
+
+        Args:
+            p_variable: Full P Variable after the change
+            sections: Top-level sections that changed (None = all; sections
+                missing from p_variable are deleted). Ignored while the
+                mirror is dirty.
+            source: On-disk stamp p_variable was read from
+
+        Returns:
+            New mirror version
+
+        Raises:
+            redis.RedisError: The mirror is marked dirty and left unchanged
+        """
+        if self.dirty:
+            sections = None
+        names = list(p_variable) if sections is None else list(sections)
+        removed = []
+        if sections is None:
+            removed = [s for s in self.redis.smembers(self.sections_key) if s not in p_variable]
+
+        try:
+            version = self._publish(p_variable, names, removed, source)
+        except Exception:
+            self.dirty = True
+            raise
+        self.dirty = False
+        return version
+
+    def _publish(
+        self,
+        p_variable: Dict[str, Any],
+        names: List[str],
+        removed: List[str],
+        source: Optional[str]
+    ) -> int:
+        pipe = self.redis.pipeline(transaction=True)
+        for section in names + removed:
+            pipe.delete(self._section_key(section))
+            if section in p_variable:
+                fields = encode_section(p_variable[section])
+                if fields:
+                    pipe.hset(self._section_key(section), mapping=fields)
+                pipe.sadd(self.sections_key, section)
+            else:
+                pipe.srem(self.sections_key, section)
+        if source is not None:
+            pipe.set(self.source_key, source)
+        else:
+            pipe.delete(self.source_key)
+        pipe.incr(self.version_key)
+        version = pipe.execute()[-1]
+
+        # Read-your-writes for this process without waiting for the echo
+        self._invalidate(version, names + removed)
+        self.redis.publish(self.channel, json.dumps({
+            "version": version,
+            "sections": names + removed
+        }))
+        return version
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # READ (workers)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def get(
+        self,
+        sections: Optional[Iterable[str]] = None,
+        source: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read the P Variable (or selected sections) through the local cache.
+
+        Returned section values are shared - treat them as read-only.
+
+        Args:
+            sections: Sections to read (None = all)
+            source: Caller's on-disk stamp; if the mirror was published from
+                a different one it is stale and None is returned
+
+        Returns:
+            Dict of sections, or None if nothing has been mirrored yet, the
+            mirror does not match source, or sections kept changing while
+            being fetched
+        """
+        if not self._listening:
+            self._check_version()
+
+        if source is not None and self._source_stamp() != source:
+            self.stale += 1
+            return None
+
+        names = self._section_names
+        if names is None:
+            with self._lock:
+                version = self._version
+            names = sorted(self.redis.smembers(self.sections_key))
+            if not names:
+                return None
+            with self._lock:
+                if self._version == version:
+                    self._section_names = names
+        if sections is not None:
+            names = [s for s in sections if s in names]
+
+        missing = [s for s in names if s not in self._cache]
+        self.hits += len(names) - len(missing)
+        for _ in range(2):
+            if missing:
+                self.misses += len(missing)
+                self._fetch(missing)
+            # The listener thread may drop sections while this runs
+            result = {s: self._cache.get(s, _MISSING) for s in names}
+            result = {s: value for s, value in result.items() if value is not _MISSING}
+            if len(result) == len(names):
+                return result
+            # A section was invalidated while being fetched: fetch it again
+            missing = [s for s in names if s not in result]
+
+        # Still changing: a partial P Variable would look complete to callers
+        return None
+
+    def _fetch(self, sections: List[str]) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.get(self.version_key)
+        for section in sections:
+            pipe.hgetall(self._section_key(section))
+        results = pipe.execute()
+        version = int(results[0] or 0)
+
+        with self._lock:
+            for section, fields in zip(sections, results[1:]):
+                # Skip values older than an invalidation already received
+                if version < self._invalidated_at.get(section, 0):
+                    continue
+                self._cache[section] = decode_section(fields)
+                self._cache_versions[section] = version
+
+    def _source_stamp(self) -> Optional[str]:
+        source = self._source
+        if source is None:
+            with self._lock:
+                version = self._version
+            source = self.redis.get(self.source_key)
+            with self._lock:
+                if self._version == version:
+                    self._source = source
+        return source
+
+    def _check_version(self) -> None:
+        """Without a live subscription, drop the cache when the version moved."""
+        version = int(self.redis.get(self.version_key) or 0)
+        with self._lock:
+            if version != self._version:
+                self._cache.clear()
+                self._cache_versions.clear()
+                self._section_names = None
+                self._source = None
+                self._version = version
+
+    def _invalidate(self, version: int, sections: List[str]) -> None:
+        with self._lock:
+            self._version = max(self._version, version)
+            self._section_names = None
+            self._source = None
+            for section in sections:
+                self._invalidated_at[section] = version
+                if self._cache_versions.get(section, 0) < version:
+                    self._cache.pop(section, None)
+                    self._cache_versions.pop(section, None)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # SUBSCRIBE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def subscribe(self) -> None:
+        """Invalidate the local cache from change notifications (daemon thread)."""
+        try:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+        except Exception as e:
+            print(f"[PMirror] Subscribe failed, checking version per read: {e}")
+            return
+
+        # Anything cached before the subscription is untrusted
+        self._check_version()
+        self._listening = True
+
+        def listener():
+            try:
+                for message in pubsub.listen():
+                    try:
+                        data = json.loads(message["data"])
+                        self._invalidate(int(data["version"]), list(data["sections"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+            except Exception as e:
+                print(f"[PMirror] Subscription lost, checking version per read: {e}")
+            finally:
+                self._listening = False
+
+        threading.Thread(target=listener, daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "project_id": self.project_id,
+            "version": self._version,
+            "cached_sections": len(self._cache),
+            "listening": self._listening,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "dirty": self.dirty,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HELPER FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def project_id_for(repo_path: str) -> str:
+    """Mirror key for a project (WAVE_PROJECT_ID or the directory name)."""
+    return os.getenv("WAVE_PROJECT_ID") or os.path.basename(os.path.abspath(repo_path))
+
+
+# Global instances (one per project)
+_mirrors: Dict[str, Optional[PVariableMirror]] = {}
+
+
+def get_p_mirror(repo_path: str, store: Any = None) -> Optional[PVariableMirror]:
+    """
+    Get the project's mirror, or None when mirroring is disabled or Redis
+    is unreachable.
+
+    Args:
+        repo_path: Project root
+        store: PVariableStore to republish from after each write (seeds the
+            mirror from P.json if it is empty)
+    """
+    if not (P_MIRROR_ENABLED and REDIS_AVAILABLE):
+        return None
+
+    project_id = project_id_for(repo_path)
+    if project_id not in _mirrors:
+        try:
+            mirror = PVariableMirror(project_id)
+            mirror.redis.ping()
+        except Exception as e:
+            print(f"[PMirror] Redis unavailable, reading P.json from disk: {e}")
+            mirror = None
+        _mirrors[project_id] = mirror
+
+    mirror = _mirrors[project_id]
+    if mirror is not None and store is not None:
+        attach_store(mirror, store)
+    return mirror
+
+
+def attach_store(mirror: PVariableMirror, store: Any) -> None:
+    """
+    Republish the sections each store write touches, and seed the mirror
+    from P.json if it is empty or was published from another version.
+    """
+    def on_change(p_variable: Dict[str, Any], sections: List[str]) -> None:
+        try:
+            mirror.publish(p_variable, sections, source=store.source_stamp())
+        except Exception as e:
+            print(f"[PMirror] Publish error, republishing all sections next write: {e}")
+
+    store.add_listener(on_change)
+    try:
+        if mirror.redis.get(mirror.source_key) != store.source_stamp():
+            resync_store(mirror, store)
+    except Exception as e:
+        print(f"[PMirror] Seed error: {e}")
+
+
+def resync_store(mirror: PVariableMirror, store: Any) -> Optional[Dict[str, Any]]:
+    """
+    Republish every section from disk (the mirror missed a write).
+
+    Runs under the store lock so no store write interleaves.
+
+    Returns:
+        The P Variable read from disk, or None if there is none
+    """
+    with store.lock():
+        p_variable = store.read()
+        if p_variable:
+            mirror.publish(p_variable, source=store.source_stamp())
+    return p_variable
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "PVariableMirror",
+    "encode_section",
+    "decode_section",
+    "get_p_mirror",
+    "attach_store",
+    "resync_store",
+    "project_id_for",
+]
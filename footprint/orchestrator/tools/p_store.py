@@ -0,0 +1,526 @@
+"""
+P Variable Store
+Atomic, concurrent-safe incremental updates to .claude/P.json
+
+- Writers hold an exclusive flock on .claude/P.json.lock for the whole
+  read-modify-write, so parallel agents no longer lose updates
+- P.json is written to a temp file, fsynced and renamed into place, so
+  readers never see a half-written file
+- Changes are JSON Patch operations (RFC 6902 add/replace/remove, with
+  missing parent objects created on add), computed from a transaction's
+  before/after state or passed directly
+- Optional append-only journal (.claude/P.journal.jsonl): a write appends
+  one line of patch ops instead of rewriting P.json, and the journal is
+  compacted into P.json every compact_every entries. Readers replay it on
+  top of P.json (cached by journal size).
+
+Usage:
+    store = get_p_store(repo_path)
+    store.patch([{"op": "replace", "path": "/wave_state/current_gate", "value": 3}])
+
+    with store.transaction(sections=("wave_state",)) as p:
+        p["wave_state"]["gate_history"].append(entry)
+"""
+
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    from .json_cache import file_stamp, get_json_cache
+except ImportError:
+    from json_cache import file_stamp, get_json_cache
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Enable the journal for stores created by get_p_store()
+P_JOURNAL_ENABLED = os.getenv("WAVE_P_JOURNAL", "").lower() in ("1", "true", "yes")
+
+# Journal entries before compaction into P.json
+DEFAULT_COMPACT_EVERY = 200
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# JSON PATCH
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class PatchError(ValueError):
+    """Raised when a patch operation cannot be applied."""
+
+
+def _pointer(parts: Iterable[Any]) -> str:
+    return "".join("/" + str(p).replace("~", "~0").replace("/", "~1") for p in parts)
+
+
+def _parse_pointer(path: str) -> List[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer: {path}")
+    return [p.replace("~1", "/").replace("~0", "~") for p in path[1:].split("/")]
+
+
+def _resolve_parent(doc: Any, parts: List[str], create: bool) -> Tuple[Any, str]:
+    node = doc
+    for part in parts[:-1]:
+        if isinstance(node, list):
+            node = node[int(part)]
+        elif part in node:
+            node = node[part]
+        elif create:
+            node[part] = {}
+            node = node[part]
+        else:
+            raise PatchError(f"Path not found: {_pointer(parts)}")
+    return node, parts[-1]
+
+
+def apply_patch(doc: Dict[str, Any], ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply JSON Patch operations to doc in place.
+
+    Supports add (creates missing parent objects; "-" appends to lists),
+    replace and remove.
+
+    Raises:
+        PatchError: Unknown op or missing path
+    """
+    for op in ops:
+        kind = op.get("op")
+        parts = _parse_pointer(op.get("path", ""))
+        if not parts:
+            if kind in ("add", "replace"):
+                doc.clear()
+                doc.update(op["value"])
+                continue
+            raise PatchError(f"Cannot {kind} the document root")
+
+        parent, key = _resolve_parent(doc, parts, create=(kind == "add"))
+        if kind in ("add", "replace"):
+            if isinstance(parent, list):
+                if key == "-":
+                    parent.append(op["value"])
+                elif kind == "add":
+                    parent.insert(int(key), op["value"])
+                else:
+                    parent[int(key)] = op["value"]
+            else:
+                parent[key] = op["value"]
+        elif kind == "remove":
+            try:
+                if isinstance(parent, list):
+                    del parent[int(key)]
+                else:
+                    del parent[key]
+            except (KeyError, IndexError):
+                raise PatchError(f"Path not found: {op['path']}")
+        else:
+            raise PatchError(f"Unsupported patch op: {kind}")
+    return doc
+
+
+def diff_ops(old: Any, new: Any, parts: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+    """
+    JSON Patch operations turning old into new.
+
+    Dicts are diffed per key; a list that only grew is expressed as appends;
+    anything else that changed is replaced. Unchanged shared sub-objects
+    are skipped by identity without being walked.
+    """
+    if old is new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": _pointer(parts + (key,))})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer(parts + (key,)), "value": value})
+            else:
+                ops.extend(diff_ops(old[key], value, parts + (key,)))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        if len(new) >= len(old) and new[:len(old)] == old:
+            return [
+                {"op": "add", "path": _pointer(parts + ("-",)), "value": item}
+                for item in new[len(old):]
+            ]
+    if old == new:
+        return []
+    return [{"op": "replace" if parts else "add", "path": _pointer(parts), "value": new}]
+
+
+def merge_ops(base: Dict[str, Any], updates: Dict[str, Any], parts: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+    """Ops for deep-merging updates into base (dicts merge, anything else replaces)."""
+    ops = []
+    for key, value in updates.items():
+        current = base.get(key) if isinstance(base, dict) else None
+        if isinstance(current, dict) and isinstance(value, dict):
+            ops.extend(merge_ops(current, value, parts + (key,)))
+        else:
+            ops.append({"op": "add", "path": _pointer(parts + (key,)), "value": value})
+    return ops
+
+
+def _copy_sections(doc: Dict[str, Any], ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shallow copy of doc with private copies of the sections ops touch."""
+    copied = dict(doc)
+    for op in ops:
+        parts = _parse_pointer(op.get("path", ""))
+        if not parts:
+            return json.loads(json.dumps(doc))
+        if parts[0] in copied and copied[parts[0]] is doc.get(parts[0]):
+            copied[parts[0]] = json.loads(json.dumps(doc[parts[0]]))
+    return copied
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# P VARIABLE STORE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Journal replay cache: journal path -> (P.json stamp, journal size, state)
+_replay_cache: Dict[str, Tuple[Tuple[int, int, int], int, Dict[str, Any]]] = {}
+_replay_lock = threading.Lock()
+
+
+class PVariableStore:
+    """
+    Locked, atomic, patch-based access to a project's P.json.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        journal: bool = P_JOURNAL_ENABLED,
+        compact_every: int = DEFAULT_COMPACT_EVERY
+    ):
+        """
+        Initialize store.
+
+        Args:
+            repo_path: Project root
+            journal: Append patches to the journal instead of rewriting P.json
+            compact_every: Journal entries before compaction
+        """
+        self.claude_dir = os.path.join(repo_path, ".claude")
+        self.path = os.path.join(self.claude_dir, "P.json")
+        self.lock_path = self.path + ".lock"
+        self.journal_path = os.path.join(self.claude_dir, "P.journal.jsonl")
+        self.journal = journal
+        self.compact_every = compact_every
+        self._thread_lock = threading.RLock()
+        self._listeners: List[Callable[[Dict[str, Any], Optional[List[str]]], None]] = []
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # LOCKING
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Exclusive lock across threads and processes (flock on P.json.lock).
+
+        Cached P.json and journal state is dropped on acquire, so a
+        read-modify-write under the lock always starts from disk; writes
+        made while holding the lock re-prime the cache.
+        """
+        with self._thread_lock:
+            os.makedirs(self.claude_dir, exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                get_json_cache().invalidate(self.path)
+                with _replay_lock:
+                    _replay_cache.pop(self.journal_path, None)
+                try:
+                    yield
+                finally:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # READ
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """
+        Current P Variable (P.json plus any journal entries).
+
+        The result is shared and cached - do not modify it.
+
+        Returns:
+            P Variable dict, or None if P.json and the journal are missing
+        """
+        base = get_json_cache().load(self.path)
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except OSError:
+            return base
+        if journal_size == 0:
+            return base
+
+        try:
+            stamp = file_stamp(os.stat(self.path))
+        except OSError:
+            stamp = (0, 0, 0)
+
+        cached = _replay_cache.get(self.journal_path)
+        if cached and cached[0] == stamp and cached[1] == journal_size:
+            return cached[2]
+
+        state = json.loads(json.dumps(base or {}))
+        base_seq = state.get("meta", {}).get("journal_seq", 0)
+        for seq, ops in self._journal_entries():
+            if seq > base_seq:
+                try:
+                    apply_patch(state, ops)
+                except PatchError as e:
+                    print(f"[RLM] Warning: Skipping journal entry {seq}: {e}")
+
+        with _replay_lock:
+            _replay_cache[self.journal_path] = (stamp, journal_size, state)
+        return state
+
+    def source_stamp(self) -> Optional[str]:
+        """
+        Version of the on-disk state: P.json's (inode, mtime, size) plus the
+        journal size. Changes on every write, including writes that bypass
+        the store.
+
+        Returns:
+            Stamp string, or None if P.json and the journal are missing
+        """
+        try:
+            stamp = file_stamp(os.stat(self.path))
+        except OSError:
+            stamp = None
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except OSError:
+            journal_size = 0
+        if stamp is None and not journal_size:
+            return None
+        ino, mtime_ns, size = stamp or (0, 0, 0)
+        return f"{ino}:{mtime_ns}:{size}:{journal_size}"
+
+    def _journal_entries(self) -> List[Tuple[int, List[Dict[str, Any]]]]:
+        entries = []
+        try:
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        entries.append((entry["seq"], entry["ops"]))
+                    except (json.JSONDecodeError, KeyError):
+                        # Torn last line from a crash mid-append
+                        continue
+        except IOError:
+            pass
+        return entries
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # WRITE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def patch(self, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply JSON Patch operations atomically.
+
+        Args:
+            ops: Patch operations
+
+        Returns:
+            The new P Variable (shared - do not modify)
+
+        Raises:
+            PatchError: An op could not be applied (nothing is written)
+        """
+        if not ops:
+            return self.read() or {}
+        with self.lock():
+            return self._patch_locked(ops)
+
+    def update(self, updates: Dict[str, Any], touch: bool = True) -> Dict[str, Any]:
+        """
+        Deep-merge updates (dicts merge, other values replace).
+
+        Args:
+            updates: Nested updates
+            touch: Also set meta.updated_at
+        """
+        from datetime import datetime, timezone
+
+        with self.lock():
+            current = self.read() or {}
+            ops = merge_ops(current, updates)
+            if touch:
+                ops.append({
+                    "op": "add",
+                    "path": "/meta/updated_at",
+                    "value": datetime.now(timezone.utc).isoformat()
+                })
+            return self._patch_locked(ops)
+
+    @contextmanager
+    def transaction(self, sections: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Locked read-modify-write. Modify the yielded dict; on exit the
+        difference is written as a patch.
+
+        Args:
+            sections: Top-level sections that will be modified (others are
+                shared with the cache and must not be modified); None copies
+                everything
+        """
+        with self.lock():
+            current = self.read() or {}
+            if sections is None:
+                working = json.loads(json.dumps(current))
+            else:
+                working = dict(current)
+                for section in sections:
+                    if section in working:
+                        working[section] = json.loads(json.dumps(working[section]))
+            yield working
+            self._patch_locked(diff_ops(current, working))
+
+    def compact(self) -> None:
+        """Fold the journal into P.json."""
+        with self.lock():
+            self._compact_locked()
+
+    def add_listener(self, listener: Callable[[Dict[str, Any], Optional[List[str]]], None]) -> None:
+        """
+        Call listener(p_variable, sections) after each write, with the
+        top-level sections it touched (None = whole document). Used by the
+        Redis mirror (p_mirror).
+        """
+        self._listeners.append(listener)
+
+    def _patch_locked(self, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        new_state = self._apply_locked(ops)
+        if ops and self._listeners:
+            sections: Optional[List[str]] = []
+            for op in ops:
+                parts = _parse_pointer(op.get("path", ""))
+                if not parts:
+                    sections = None
+                    break
+                if parts[0] not in sections:
+                    sections.append(parts[0])
+            for listener in self._listeners:
+                listener(new_state, sections)
+        return new_state
+
+    def _apply_locked(self, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        current = self.read() or {}
+        if not ops:
+            return current
+        new_state = apply_patch(_copy_sections(current, ops), ops)
+
+        if not self.journal:
+            if os.path.exists(self.journal_path):
+                # Journal left by a journaling writer: fold it in first so
+                # this write does not get replayed over by older entries
+                self._compact_locked()
+                current = self.read() or {}
+                new_state = apply_patch(_copy_sections(current, ops), ops)
+            self._write_atomic(new_state)
+            return new_state
+
+        entries = self._journal_entries()
+        seq = (entries[-1][0] if entries else current.get("meta", {}).get("journal_seq", 0)) + 1
+        line = json.dumps({"seq": seq, "ops": ops}) + "\n"
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        if len(entries) + 1 >= self.compact_every:
+            self._compact_locked()
+            return self.read() or {}
+        return new_state
+
+    def _compact_locked(self) -> None:
+        entries = self._journal_entries()
+        if not entries:
+            return
+        state = json.loads(json.dumps(self.read() or {}))
+        state.setdefault("meta", {})["journal_seq"] = entries[-1][0]
+        # P.json first, then the journal: a crash in between only leaves
+        # entries at or below journal_seq, which replay skips
+        self._write_atomic(state)
+        os.unlink(self.journal_path)
+        with _replay_lock:
+            _replay_cache.pop(self.journal_path, None)
+
+    def _write_atomic(self, data: Dict[str, Any]) -> None:
+        os.makedirs(self.claude_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.claude_dir, prefix=".P.json.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        get_json_cache().put(self.path, data)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HELPER FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Global instances (one per project)
+_stores: Dict[str, PVariableStore] = {}
+
+
+def get_p_store(repo_path: str) -> PVariableStore:
+    """
+    Get or create the store for a project (one per process).
+
+    When the Redis mirror is enabled (WAVE_P_MIRROR=1) the store republishes
+    each write to it.
+    """
+    key = os.path.abspath(repo_path)
+    store = _stores.get(key)
+    if store is None:
+        store = _stores.setdefault(key, PVariableStore(repo_path))
+        try:
+            from .p_mirror import get_p_mirror
+        except ImportError:
+            from p_mirror import get_p_mirror
+        get_p_mirror(repo_path, store=store)
+    return store
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "PatchError",
+    "PVariableStore",
+    "apply_patch",
+    "diff_ops",
+    "merge_ops",
+    "get_p_store",
+]
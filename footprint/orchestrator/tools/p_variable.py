@@ -15,11 +15,36 @@ import json
 from typing import Dict, Any, Optional
 from datetime import datetime, timezone
 
+# Shared tokenizer-backed counter (falls back to the chars/4 heuristic)
+try:
+    from src.safety.token_counter import count_object_tokens
+except ImportError:
+    count_object_tokens = None
+
+try:
+    from .usage_timeseries import UsageTimeSeries
+    from .json_cache import get_json_cache
+    from .p_store import get_p_store, PatchError
+    from .p_mirror import get_p_mirror, resync_store
+except ImportError:
+    from usage_timeseries import UsageTimeSeries
+    from json_cache import get_json_cache
+    from p_store import get_p_store, PatchError
+    from p_mirror import get_p_mirror, resync_store
+
 
 def load_p_variable(repo_path: str) -> Optional[Dict[str, Any]]:
     """
     Load the P Variable from a project's .claude directory.
 
+    P.json is served from the process-level JSON cache, re-parsed only when
+    its mtime or size changes, with any journaled updates replayed on top
+    (see p_store). The returned dict is shared: copy before modifying (see
+    update_p_variable). With the Redis mirror enabled (WAVE_P_MIRROR=1) it
+    is read from the mirror's change-invalidated local cache instead, as
+    long as the mirror was published from the P.json version on disk (a
+    stat, no parse); otherwise P.json is read and republished.
+
     Args:
         repo_path: Path to the project root
 
@@ -29,16 +54,42 @@ def load_p_variable(repo_path: str) -> Optional[Dict[str, Any]]:
     if not repo_path:
         return None
 
+    # Redis mirror (multi-worker deployments)
+    store = get_p_store(repo_path)
+    mirror = get_p_mirror(repo_path)
+    if mirror is not None:
+        try:
+            source = store.source_stamp()
+            p_variable = mirror.get(source=source)
+            if p_variable:
+                return p_variable
+            if source is not None:
+                # Missed a write (direct P.json write, failed publish)
+                return resync_store(mirror, store)
+        except Exception as e:
+            print(f"[RLM] Warning: P mirror read failed, using disk: {e}")
+
     # Try P.json first (newer format)
-    p_json_path = os.path.join(repo_path, ".claude", "P.json")
-    if os.path.exists(p_json_path):
+    if os.path.exists(store.path) or os.path.exists(store.journal_path):
         try:
-            with open(p_json_path, 'r') as f:
-                return json.load(f)
+            return store.read()
         except (json.JSONDecodeError, IOError) as e:
             print(f"[RLM] Warning: Failed to load P.json: {e}")
 
     # Try P.md as fallback (older format)
+    return load_p_md(repo_path)
+
+
+def load_p_md(repo_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the older P.md format as a P Variable.
+
+    Args:
+        repo_path: Path to the project root
+
+    Returns:
+        {"meta", "content"} dict or None if P.md is missing
+    """
     p_md_path = os.path.join(repo_path, ".claude", "P.md")
     if os.path.exists(p_md_path):
         try:
@@ -165,14 +216,15 @@ def get_current_stories(p_variable: Dict[str, Any], repo_path: str) -> list:
     stories = []
     stories_dir = os.path.join(repo_path, "stories", f"wave{wave_num}")
 
+    cache = get_json_cache()
     for story_file in story_files:
         story_path = os.path.join(stories_dir, story_file)
-        if os.path.exists(story_path):
-            try:
-                with open(story_path, 'r') as f:
-                    stories.append(json.load(f))
-            except (json.JSONDecodeError, IOError):
-                pass
+        try:
+            story = cache.load(story_path)
+        except (json.JSONDecodeError, IOError):
+            continue
+        if story is not None:
+            stories.append(story)
 
     return stories
 
@@ -181,6 +233,10 @@ def update_p_variable(repo_path: str, updates: Dict[str, Any]) -> bool:
     """
     Update the P Variable with new information.
 
+    The read-merge-write runs under the P.json lock and is written as an
+    incremental patch (atomic rename, or a journal append), so concurrent
+    agents do not overwrite each other's updates.
+
     Args:
         repo_path: Path to project root
         updates: Dict of updates to merge
@@ -188,11 +244,6 @@ def update_p_variable(repo_path: str, updates: Dict[str, Any]) -> bool:
     Returns:
         True if successful
     """
-    p_json_path = os.path.join(repo_path, ".claude", "P.json")
-
-    # Load existing
-    p_variable = load_p_variable(repo_path) or {}
-
     # Deep merge updates
     def deep_merge(base: dict, updates: dict) -> dict:
         for key, value in updates.items():
@@ -202,20 +253,21 @@ def update_p_variable(repo_path: str, updates: Dict[str, Any]) -> bool:
                 base[key] = value
         return base
 
-    p_variable = deep_merge(p_variable, updates)
-
-    # Update timestamp
-    if "meta" not in p_variable:
-        p_variable["meta"] = {}
-    p_variable["meta"]["updated_at"] = datetime.now(timezone.utc).isoformat()
-
-    # Write back
     try:
-        os.makedirs(os.path.dirname(p_json_path), exist_ok=True)
-        with open(p_json_path, 'w') as f:
-            json.dump(p_variable, f, indent=2)
+        store = get_p_store(repo_path)
+        with store.transaction(sections=list(updates) + ["meta"]) as p_variable:
+            if not p_variable:
+                # No P.json yet - seed from P.md if present (not through
+                # load_p_variable: a mirror resync would take the lock again)
+                p_variable.update(load_p_md(repo_path) or {})
+            deep_merge(p_variable, updates)
+
+            # Update timestamp
+            if "meta" not in p_variable:
+                p_variable["meta"] = {}
+            p_variable["meta"]["updated_at"] = datetime.now(timezone.utc).isoformat()
         return True
-    except IOError as e:
+    except (json.JSONDecodeError, IOError, PatchError) as e:
         print(f"[RLM] Error updating P.json: {e}")
         return False
 
@@ -227,7 +279,8 @@ def update_p_variable(repo_path: str, updates: Dict[str, Any]) -> bool:
 def check_rlm_budget(
     rlm_config: Dict[str, Any],
     tokens_used: int = 0,
-    cost_used: float = 0.0
+    cost_used: float = 0.0,
+    timeseries: Optional[UsageTimeSeries] = None
 ) -> Dict[str, Any]:
     """
     Check if current usage is within RLM budget limits.
@@ -236,6 +289,9 @@ def check_rlm_budget(
         rlm_config: RLM configuration dict
         tokens_used: Tokens used this minute
         cost_used: Cost used this hour/day
+        timeseries: Usage history; when given, tokens_used is the sliding
+            60s token count, the hourly limit is checked against the last
+            hour's cost and the daily limit against the last 24h
 
     Returns:
         Dict with safe status, warnings, and usage percentages
@@ -248,13 +304,20 @@ def check_rlm_budget(
     max_daily = budget.get("maxDailySpend", 50)
     alert_threshold = budget.get("alertThreshold", 0.8)
 
+    cost_hour = cost_day = cost_used
+    if timeseries is not None:
+        window = timeseries.summary()
+        tokens_used = window["tokens_last_minute"]
+        cost_hour = window["cost_last_hour"]
+        cost_day = cost_used = window["cost_last_day"]
+
     # Calculate percentages
     token_percent = (tokens_used / max_tokens * 100) if max_tokens > 0 else 0
-    cost_percent = (cost_used / max_daily * 100) if max_daily > 0 else 0
+    cost_percent = (cost_day / max_daily * 100) if max_daily > 0 else 0
 
     # Determine status
     token_warning = token_percent >= (alert_threshold * 100)
-    cost_warning = cost_used >= (max_cost_hour * alert_threshold)
+    cost_warning = cost_hour >= (max_cost_hour * alert_threshold)
     over_limit = token_percent > 100
 
     return {
@@ -277,9 +340,11 @@ def check_rlm_budget(
 
 def estimate_token_count(obj: Any) -> int:
     """
-    Estimate token count for an object (rough approximation).
+    Estimate token count for an object.
 
-    Uses ~4 chars per token heuristic for JSON.
+    Uses the shared token counter when available, which walks the object
+    without serializing it and caches counts per string. Otherwise falls
+    back to ~4 chars per token of the JSON dump.
 
     Args:
         obj: Object to estimate tokens for
@@ -289,6 +354,8 @@ def estimate_token_count(obj: Any) -> int:
     """
     if obj is None:
         return 0
+    if count_object_tokens is not None:
+        return count_object_tokens(obj)
     try:
         json_str = json.dumps(obj)
         # Rough estimate: ~4 characters per token
@@ -378,37 +445,46 @@ class RLMBudgetTracker:
     """
     Tracks token and cost usage over time.
 
-    Used by agents to monitor budget consumption.
+    Used by agents to monitor budget consumption. Per-minute figures are
+    sliding 60s windows over a UsageTimeSeries, so they never need resetting.
     """
 
-    def __init__(self):
+    def __init__(self, timeseries: Optional[UsageTimeSeries] = None):
         self.total_tokens = 0
         self.total_cost = 0.0
-        self.tokens_this_minute = 0
-        self._minute_start = datetime.now(timezone.utc)
+        self.timeseries = timeseries or UsageTimeSeries()
 
     def add_usage(self, tokens: int = 0, cost: float = 0.0):
         """Add usage to tracker."""
         self.total_tokens += tokens
         self.total_cost += cost
-        self.tokens_this_minute += tokens
+        self.timeseries.add(tokens, cost)
+
+    @property
+    def tokens_this_minute(self) -> int:
+        """Tokens used in the last 60 seconds."""
+        return self.timeseries.window_sum(60)[0]
 
-    def _reset_minute_counter(self):
-        """Reset per-minute counter (called when minute changes)."""
-        self.tokens_this_minute = 0
-        self._minute_start = datetime.now(timezone.utc)
+    def check(self, rlm_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Check usage against the RLM rate limits and budget."""
+        return check_rlm_budget(rlm_config, timeseries=self.timeseries)
 
     def get_status(self) -> Dict[str, Any]:
         """Get current usage status."""
+        window = self.timeseries.summary()
         return {
             "total_tokens": self.total_tokens,
             "total_cost": self.total_cost,
-            "tokens_this_minute": self.tokens_this_minute
+            "tokens_this_minute": window["tokens_last_minute"],
+            "tokens_last_hour": window["tokens_last_hour"],
+            "cost_last_hour": window["cost_last_hour"],
+            "cost_last_day": window["cost_last_day"],
         }
 
 
 __all__ = [
     "load_p_variable",
+    "load_p_md",
     "load_rlm_config",
     "get_default_rlm_config",
     "get_project_context",
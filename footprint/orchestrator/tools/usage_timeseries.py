@@ -0,0 +1,322 @@
+"""
+RLM Usage Time Series
+Ring-buffer token/cost history for budget rate limits and dashboards
+
+Every sample is added to four fixed-size rings at once:
+- second: 300 one-second buckets (5 minutes)
+- minute: 1440 one-minute buckets (24 hours)
+- hour:   720 one-hour buckets (30 days)
+- day:    366 one-day buckets (1 year)
+
+Each bucket stores its start time, so stale slots are detected and reset on
+write, and windowed sums never need a background roll-up job. Sliding windows
+are read from the finest ring that covers them (a 60s window is exact to
+the second).
+
+Persisted as a compact binary file (~70 KB) at .claude/rlm-usage.bin.
+
+Usage:
+    series = UsageTimeSeries.load(project_path)
+    series.add(tokens=1200, cost=0.004)
+    series.window_sum(60)         # (tokens, cost) in the last minute
+    series.series("minute", since=time.time() - 3600)
+    series.save()
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+import threading
+from array import array
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Resolution name -> (bucket seconds, bucket count)
+RESOLUTIONS = {
+    "second": (1, 300),
+    "minute": (60, 1440),
+    "hour": (3600, 720),
+    "day": (86400, 366),
+}
+
+USAGE_TIMESERIES_FILE = os.path.join(".claude", "rlm-usage.bin")
+
+_MAGIC = b"RLMTS1\x00\x00"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RING BUFFER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _Ring:
+    """Fixed-size ring of (bucket start, tokens, cost) buckets."""
+
+    def __init__(self, bucket_seconds: int, size: int):
+        self.bucket_seconds = bucket_seconds
+        self.size = size
+        self.starts = array("q", [-1]) * size
+        self.tokens = array("q", [0]) * size
+        self.costs = array("d", [0.0]) * size
+
+    def add(self, ts: float, tokens: int, cost: float) -> None:
+        start = int(ts) // self.bucket_seconds * self.bucket_seconds
+        idx = (start // self.bucket_seconds) % self.size
+        if self.starts[idx] != start:
+            self.starts[idx] = start
+            self.tokens[idx] = 0
+            self.costs[idx] = 0.0
+        self.tokens[idx] += tokens
+        self.costs[idx] += cost
+
+    def span(self) -> int:
+        return self.bucket_seconds * self.size
+
+    def sum(self, since: float, until: float) -> Tuple[int, float]:
+        """Sum of buckets whose start lies in [since, until]."""
+        tokens = 0
+        cost = 0.0
+        first = int(since) // self.bucket_seconds * self.bucket_seconds
+        last = int(until) // self.bucket_seconds * self.bucket_seconds
+        # Walk only the slots the range maps to
+        count = min(self.size, (last - first) // self.bucket_seconds + 1)
+        for i in range(count):
+            start = last - i * self.bucket_seconds
+            idx = (start // self.bucket_seconds) % self.size
+            if self.starts[idx] == start:
+                tokens += self.tokens[idx]
+                cost += self.costs[idx]
+        return tokens, cost
+
+    def points(self, since: float, until: float) -> List[Tuple[int, int, float]]:
+        first = int(since) // self.bucket_seconds * self.bucket_seconds
+        last = int(until) // self.bucket_seconds * self.bucket_seconds
+        count = min(self.size, (last - first) // self.bucket_seconds + 1)
+        out = []
+        for i in reversed(range(count)):
+            start = last - i * self.bucket_seconds
+            idx = (start // self.bucket_seconds) % self.size
+            if self.starts[idx] == start:
+                out.append((start, self.tokens[idx], self.costs[idx]))
+        return out
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# USAGE TIME SERIES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class UsageTimeSeries:
+    """
+    Token and cost usage over time at second/minute/hour/day resolution.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize an empty time series.
+
+        Args:
+            path: File used by save() (None = in-memory only)
+        """
+        self.path = path
+        self._rings: Dict[str, _Ring] = {
+            name: _Ring(seconds, size) for name, (seconds, size) in RESOLUTIONS.items()
+        }
+        self._lock = threading.Lock()
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # RECORDING
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def add(self, tokens: int = 0, cost: float = 0.0, timestamp: Optional[float] = None) -> None:
+        """
+        Record usage.
+
+        Args:
+            tokens: Tokens used
+            cost: Cost in USD
+            timestamp: Epoch seconds (default: now)
+        """
+        ts = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            for ring in self._rings.values():
+                ring.add(ts, tokens, cost)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # QUERIES
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def window_sum(self, seconds: float, now: Optional[float] = None) -> Tuple[int, float]:
+        """
+        Tokens and cost in the sliding window (now - seconds, now].
+
+        Uses the finest resolution whose ring covers the window; windows
+        longer than a ring's span are rounded to that ring's bucket size.
+
+        Returns:
+            Tuple of (tokens, cost)
+        """
+        now = now if now is not None else time.time()
+        ring = self._ring_for(seconds)
+        with self._lock:
+            return ring.sum(now - seconds + ring.bucket_seconds, now)
+
+    def rate_per_minute(self, window_seconds: float = 60, now: Optional[float] = None) -> float:
+        """Tokens per minute averaged over the sliding window."""
+        tokens, _ = self.window_sum(window_seconds, now)
+        return tokens * 60.0 / window_seconds if window_seconds > 0 else 0.0
+
+    def series(
+        self,
+        resolution: str = "minute",
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Non-empty buckets in [since, until] for dashboards.
+
+        Args:
+            resolution: second, minute, hour or day
+            since: Epoch seconds (default: as far back as the ring holds)
+            until: Epoch seconds (default: now)
+
+        Returns:
+            List of {"ts", "tokens", "cost"} dicts, oldest first
+        """
+        if resolution not in self._rings:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        ring = self._rings[resolution]
+        until = until if until is not None else time.time()
+        since = since if since is not None else until - ring.span() + ring.bucket_seconds
+        with self._lock:
+            points = ring.points(since, until)
+        return [{"ts": ts, "tokens": tokens, "cost": cost} for ts, tokens, cost in points]
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Common windows in one call (for status lines and dashboards)."""
+        now = now if now is not None else time.time()
+        minute = self.window_sum(60, now)
+        hour = self.window_sum(3600, now)
+        day = self.window_sum(86400, now)
+        return {
+            "tokens_last_minute": minute[0],
+            "tokens_last_hour": hour[0],
+            "tokens_last_day": day[0],
+            "cost_last_minute": minute[1],
+            "cost_last_hour": hour[1],
+            "cost_last_day": day[1],
+        }
+
+    def _ring_for(self, seconds: float) -> _Ring:
+        for ring in self._rings.values():
+            if seconds <= ring.span():
+                return ring
+        return self._rings["day"]
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # PERSISTENCE
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Write all rings to a compact binary file (temp file + rename).
+        """
+        path = path or self.path
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with self._lock, open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(struct.pack("<I", len(self._rings)))
+            for name, ring in self._rings.items():
+                encoded = name.encode()
+                f.write(struct.pack("<B", len(encoded)) + encoded)
+                f.write(struct.pack("<II", ring.bucket_seconds, ring.size))
+                ring.starts.tofile(f)
+                ring.tokens.tofile(f)
+                ring.costs.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, project_path: str, path: Optional[str] = None) -> "UsageTimeSeries":
+        """
+        Load a project's time series, or start an empty one.
+
+        Args:
+            project_path: Project root (file at .claude/rlm-usage.bin)
+            path: Explicit file path instead
+
+        Returns:
+            UsageTimeSeries bound to that path
+        """
+        path = path or os.path.join(project_path, USAGE_TIMESERIES_FILE)
+        series = cls(path)
+        if not os.path.exists(path):
+            return series
+
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    raise ValueError("bad header")
+                (count,) = struct.unpack("<I", f.read(4))
+                for _ in range(count):
+                    (name_len,) = struct.unpack("<B", f.read(1))
+                    name = f.read(name_len).decode()
+                    bucket_seconds, size = struct.unpack("<II", f.read(8))
+                    ring = _Ring(bucket_seconds, size)
+                    ring.starts = array("q")
+                    ring.starts.fromfile(f, size)
+                    ring.tokens = array("q")
+                    ring.tokens.fromfile(f, size)
+                    ring.costs = array("d")
+                    ring.costs.fromfile(f, size)
+                    # Resolutions changed since the file was written: drop that ring
+                    if RESOLUTIONS.get(name) == (bucket_seconds, size):
+                        series._rings[name] = ring
+        except (ValueError, EOFError, struct.error, IOError) as e:
+            print(f"[RLM] Warning: Failed to load usage time series: {e}")
+            return cls(path)
+
+        return series
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description="RLM Usage Time Series")
+    parser.add_argument("--project", "-p", required=True, help="Project path")
+    parser.add_argument("--resolution", "-r", default="minute", choices=list(RESOLUTIONS))
+    parser.add_argument("--since", type=int, default=None, help="Seconds back from now")
+    parser.add_argument("--summary", action="store_true", help="Print window totals only")
+    args = parser.parse_args()
+
+    path = os.path.join(args.project, USAGE_TIMESERIES_FILE)
+    if not os.path.exists(path):
+        print(f"No usage time series at {path}")
+        sys.exit(1)
+
+    series = UsageTimeSeries.load(args.project)
+    if args.summary:
+        print(json.dumps(series.summary(), indent=2))
+    else:
+        since = time.time() - args.since if args.since else None
+        print(json.dumps(series.series(args.resolution, since=since), indent=2))
+
+
+__all__ = [
+    "RESOLUTIONS",
+    "USAGE_TIMESERIES_FILE",
+    "UsageTimeSeries",
+]
+
+
+if __name__ == "__main__":
+    main()
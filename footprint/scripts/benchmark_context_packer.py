@@ -0,0 +1,213 @@
+"""
+Context Packer Benchmark
+
+Compares fixed character truncation (code[:N]) with the relevance-ranked
+context packer at equal token cost: for every run and prompt, the packer
+gets exactly the tokens the truncated text uses, so the only difference is
+which code is kept.
+
+Story runs (default) are built from this repo: each story's existing files
+are mixed, in random order, with the files of other stories (distractors).
+The query is the story's title, description and acceptance criteria - what
+the QA prompt passes - and the scores are target recall (the fraction of the
+story's own code lines still in the context) and target precision (the
+fraction of kept lines that are the story's own). Targets are defined by file
+ownership, not by the scoring terms, so the benchmark does not grade the
+packer on its own vocabulary.
+
+The packer is run both without and with the story's files as focus files
+(production passes them), since the focus boost alone can explain a win.
+
+Recorded runs are JSONL, one run per line, scored by finding recall (the
+fraction of reviewer-flagged snippets still in the context):
+    {"story_id": "...", "requirements": "...", "files": ["..."],
+     "code": "<agent code output>", "findings": ["<flagged snippet>", ...]}
+
+Usage:
+    python benchmark_context_packer.py
+    python benchmark_context_packer.py --stories "stories/wave8/*.json" --distractors 3
+    python benchmark_context_packer.py --runs runs.jsonl
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import random
+import argparse
+from typing import Dict, Any, List
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.context_packer import pack_code, build_query, CONTEXT_BUDGETS
+from src.safety.token_counter import count_tokens
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prompt (CONTEXT_BUDGETS key) -> character cap it replaces
+PROMPTS = {
+    "cto_review": 8000,
+    "qa_review": 10000,
+    "qa_node": 3000,
+    "cto_master": 2000,
+}
+
+FILE_LANGUAGES = {".ts": "typescript", ".tsx": "tsx", ".js": "javascript", ".jsx": "jsx", ".json": "json"}
+
+_FENCE_RE = re.compile(r"^```[\w+-]*:(\S+)")
+
+
+def load_runs(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _story_files(story: Dict[str, Any]) -> List[str]:
+    files = story.get("files", {})
+    paths = []
+    for key in ("create", "modify", "created", "modified"):
+        for entry in files.get(key, []) if isinstance(files, dict) else []:
+            path = entry if isinstance(entry, str) else (entry or {}).get("path", "")
+            if path and os.path.isfile(os.path.join(REPO_ROOT, path)) and path not in paths:
+                paths.append(path)
+    return paths
+
+
+def _fenced(path: str) -> str:
+    with open(os.path.join(REPO_ROOT, path)) as f:
+        body = f.read().rstrip("\n")
+    language = FILE_LANGUAGES.get(os.path.splitext(path)[1], "text")
+    return f"```{language}:{path}\n{body}\n```"
+
+
+def story_runs(pattern: str, distractors: int = 2, seed: int = 7) -> List[Dict[str, Any]]:
+    """Runs built from the repo's stories and the files they created."""
+    stories = []
+    for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern))):
+        with open(path) as f:
+            story = json.load(f)
+        files = _story_files(story)
+        if files:
+            stories.append((story, files))
+
+    rng = random.Random(seed)
+    runs = []
+    for i, (story, files) in enumerate(stories):
+        others = [s for j, s in enumerate(stories) if j != i]
+        extra: List[str] = []
+        for _, other_files in rng.sample(others, min(distractors, len(others))):
+            extra.extend(f for f in other_files if f not in files and f not in extra)
+        order = files + extra
+        rng.shuffle(order)
+        criteria = [c.get("description", "") if isinstance(c, dict) else str(c)
+                    for c in story.get("acceptance_criteria", [])]
+        runs.append({
+            "story_id": story.get("story_id") or story.get("id", ""),
+            "requirements": build_query(story.get("title", ""), story.get("description", ""), criteria),
+            "files": files,
+            "code": "\n\n".join(_fenced(f) for f in order),
+            "targets": files,
+        })
+    return runs
+
+
+def lines_by_file(text: str) -> Dict[str, int]:
+    """Non-blank code lines per fenced file (elision markers excluded)."""
+    counts: Dict[str, int] = {}
+    source = None
+    for line in text.split("\n"):
+        fence = _FENCE_RE.match(line)
+        if fence:
+            source = fence.group(1)
+            continue
+        if line.startswith("```"):
+            source = None
+            continue
+        if source and line.strip() and not line.startswith("... ["):
+            counts[source] = counts.get(source, 0) + 1
+    return counts
+
+
+def _target_lines(text: str, targets: List[str]) -> int:
+    counts = lines_by_file(text)
+    return sum(counts.get(t, 0) for t in targets)
+
+
+def benchmark(runs: List[Dict[str, Any]], model: str) -> Dict[str, Any]:
+    variants = ("truncate", "packed", "packed_focus")
+    report = {}
+    for prompt, char_cap in PROMPTS.items():
+        totals = {v: {"tokens": 0, "lines": 0, "targets": 0, "findings": 0} for v in variants}
+        all_targets = 0
+        all_lines = 0
+        all_findings = 0
+        compared = 0
+
+        for run in runs:
+            code = run.get("code", "")
+            truncated = code[:char_cap]
+            if len(truncated) == len(code):
+                continue  # Fits the cap: nothing is dropped either way
+            compared += 1
+            budget = count_tokens(truncated, model)
+            query = build_query(run.get("requirements", ""), run.get("files", []))
+            texts = {
+                "truncate": truncated,
+                "packed": pack_code(code, query, budget, model=model).text,
+                "packed_focus": pack_code(code, query, budget, model=model,
+                                          focus_files=run.get("files", [])).text,
+            }
+
+            targets = run.get("targets", [])
+            all_targets += _target_lines(code, targets)
+            all_lines += sum(lines_by_file(code).values())
+            all_findings += len(run.get("findings", []))
+            for variant, text in texts.items():
+                totals[variant]["tokens"] += count_tokens(text, model)
+                totals[variant]["lines"] += sum(lines_by_file(text).values())
+                totals[variant]["targets"] += _target_lines(text, targets)
+                totals[variant]["findings"] += sum(f in text for f in run.get("findings", []))
+
+        entry: Dict[str, Any] = {
+            "char_cap": char_cap,
+            "production_budget": CONTEXT_BUDGETS[prompt],
+            "runs_over_cap": compared,
+        }
+        if all_targets:
+            # Target share of all code lines (what unranked selection keeps)
+            entry["target_line_share"] = round(all_targets / all_lines, 3)
+        for variant in variants:
+            entry[f"{variant}_tokens"] = totals[variant]["tokens"]
+            if all_targets:
+                entry[f"{variant}_target_recall"] = round(totals[variant]["targets"] / all_targets, 3)
+                entry[f"{variant}_target_precision"] = round(
+                    totals[variant]["targets"] / (totals[variant]["lines"] or 1), 3
+                )
+            if all_findings:
+                entry[f"{variant}_finding_recall"] = round(totals[variant]["findings"] / all_findings, 3)
+        report[prompt] = entry
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Context Packer Benchmark")
+    parser.add_argument("--runs", help="JSONL of recorded review runs (default: build runs from stories)")
+    parser.add_argument("--stories", default="stories/*/*.json", help="Story JSON glob (repo-relative)")
+    parser.add_argument("--distractors", type=int, default=2, help="Other stories' files mixed into each run")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--model", default="claude-sonnet-4-20250514")
+    args = parser.parse_args()
+
+    if args.runs:
+        runs = load_runs(args.runs)
+    else:
+        runs = story_runs(args.stories, args.distractors, args.seed)
+    print(f"[Benchmark] {len(runs)} runs, model {args.model}, equal token budgets")
+    print(json.dumps(benchmark(runs, args.model), indent=2))
+
+
+if __name__ == "__main__":
+    main()
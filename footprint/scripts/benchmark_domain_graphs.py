@@ -0,0 +1,84 @@
+"""
+Domain Graph Registry Benchmark
+
+Measures the time to get compiled sub-graphs for each routed story:
+- compile:  compile_domain_subgraph() per detected domain (previous
+            route_to_domain behaviour)
+- registry: route_to_domain() through the warmed DomainGraphRegistry
+
+Stories come from the stories/ directory (domains detected with
+DomainRouter); each story is routed to every domain it touches.
+
+Usage:
+    python benchmark_domain_graphs.py
+    python benchmark_domain_graphs.py --stories-dir ../stories --repeat 20
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domains.domain_graph import compile_domain_subgraph
+from src.domains.domain_router import get_domain_router, route_to_domain
+from src.domains.graph_registry import get_domain_graph_registry
+
+
+def main():
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "stories")
+    parser = argparse.ArgumentParser(description="Domain Graph Registry Benchmark")
+    parser.add_argument("--stories-dir", default=default_dir)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    router = get_domain_router()
+    routed = []
+    for wave in sorted(os.listdir(args.stories_dir)):
+        wave_dir = os.path.join(args.stories_dir, wave)
+        if os.path.isdir(wave_dir):
+            for matches in router.route_wave(wave_dir).values():
+                routed.append([m.domain for m in matches] or ["api"])
+    if not routed:
+        print(f"[Benchmark] No stories found in {args.stories_dir}")
+        return
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for domains in routed:
+            for domain in domains:
+                compile_domain_subgraph(domain)
+    compile_elapsed = time.perf_counter() - start
+
+    registry = get_domain_graph_registry()
+    registry.clear()
+    warm_seconds = registry.warm()
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for domains in routed:
+            for domain in domains:
+                route_to_domain(domain)
+    registry_elapsed = time.perf_counter() - start
+
+    runs = len(routed) * args.repeat
+    compile_ms = compile_elapsed / runs * 1000
+    registry_ms = registry_elapsed / runs * 1000
+    report = {
+        "stories": len(routed),
+        "domain_routes_per_story": round(sum(len(d) for d in routed) / len(routed), 2),
+        "warm_ms": round(warm_seconds * 1000, 3),
+        "compile_ms_per_story": round(compile_ms, 4),
+        "registry_ms_per_story": round(registry_ms, 4),
+        "saved_ms_per_story": round(compile_ms - registry_ms, 4),
+        "registry": registry.stats(),
+    }
+    print(f"[Benchmark] {len(routed)} stories x {args.repeat} runs")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Domain Router Benchmark
+
+Compares the compiled DomainRouter (one regex pass per domain with weighted
+scoring) against the previous per-pattern detection loop, and routes whole
+wave directories through DomainRouter.route_wave().
+
+Reports stories per second for both, and stories whose detected domain
+sets differ (expected: none).
+
+Usage:
+    python benchmark_domain_router.py
+    python benchmark_domain_router.py --stories-dir ../stories --repeat 20
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from typing import Dict, List
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domains.domain_router import DOMAIN_PATTERNS, get_domain_router, story_text
+
+
+def legacy_analyze(task: str) -> List[str]:
+    """Previous detection: re.search of every pattern, first hit per domain."""
+    task_lower = task.lower()
+    detected = []
+    for domain, patterns in DOMAIN_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, task_lower):
+                detected.append(domain)
+                break
+    return detected
+
+
+def load_waves(stories_dir: str) -> Dict[str, List[dict]]:
+    waves = {}
+    for wave in sorted(os.listdir(stories_dir)):
+        wave_dir = os.path.join(stories_dir, wave)
+        if not os.path.isdir(wave_dir):
+            continue
+        stories = []
+        for name in sorted(os.listdir(wave_dir)):
+            if name.endswith(".json"):
+                with open(os.path.join(wave_dir, name)) as f:
+                    stories.append(json.load(f))
+        waves[wave] = stories
+    return waves
+
+
+def main():
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "stories")
+    parser = argparse.ArgumentParser(description="Domain Router Benchmark")
+    parser.add_argument("--stories-dir", default=default_dir)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    waves = load_waves(args.stories_dir)
+    texts = [story_text(story) for stories in waves.values() for story in stories]
+    if not texts:
+        print(f"[Benchmark] No stories found in {args.stories_dir}")
+        return
+    router = get_domain_router()
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        legacy = [legacy_analyze(text) for text in texts]
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        ranked = [router.rank(text) for text in texts]
+    compiled_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for wave in waves:
+            router.route_wave(os.path.join(args.stories_dir, wave))
+    bulk_elapsed = time.perf_counter() - start
+
+    mismatches = [
+        {"legacy": old, "compiled": [m.domain for m in new]}
+        for old, new in zip(legacy, ranked)
+        if set(old) != {m.domain for m in new}
+    ]
+    runs = len(texts) * args.repeat
+    report = {
+        "stories": len(texts),
+        "waves": len(waves),
+        "legacy_stories_per_sec": round(runs / legacy_elapsed),
+        "compiled_stories_per_sec": round(runs / compiled_elapsed),
+        "speedup": round(legacy_elapsed / compiled_elapsed, 2),
+        "route_wave_stories_per_sec": round(runs / bulk_elapsed),
+        "domain_set_mismatches": len(mismatches),
+        "mismatch_examples": mismatches[:5],
+    }
+    print(f"[Benchmark] {len(texts)} stories x {args.repeat} runs")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
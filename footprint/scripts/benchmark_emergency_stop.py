@@ -0,0 +1,94 @@
+"""
+Emergency Stop Check Benchmark
+
+Measures EmergencyStop.check() throughput while the stop is inactive, and
+the time from trigger (stop file created by another process) to the first
+check() that sees it:
+- stat:    no watcher, one stat() of the stop file per check
+- poll:    watcher in polling mode
+- inotify: watcher driven by inotify (Linux)
+
+Runs in a temporary directory; does not touch the project's stop file.
+
+Usage:
+    python benchmark_emergency_stop.py
+    python benchmark_emergency_stop.py --checks 2000000 --poll-interval 0.1
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import subprocess
+from typing import Dict, Any
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_mode(mode: str, checks: int, poll_interval: float) -> Dict[str, Any]:
+    from src.safety import emergency_stop
+    from src.safety.emergency_stop import EmergencyStop
+    from src.safety.stop_watcher import INOTIFY_AVAILABLE
+
+    if mode == "inotify" and not INOTIFY_AVAILABLE:
+        return {"skipped": "inotify not available"}
+
+    EmergencyStop.stop_watcher()
+    EmergencyStop._active = False
+    stop_file = os.path.abspath(emergency_stop.EMERGENCY_STOP_FILE)
+    if os.path.exists(stop_file):
+        os.unlink(stop_file)
+
+    if mode != "stat":
+        EmergencyStop.start_watcher(mode=mode, poll_interval=poll_interval)
+    es = EmergencyStop(watch=False)
+
+    start = time.perf_counter()
+    for _ in range(checks):
+        es.check()
+    elapsed = time.perf_counter() - start
+
+    # Trigger from another process and time until check() sees it
+    subprocess.run(
+        [sys.executable, "-c", f"open({stop_file!r}, 'w').write('benchmark')"],
+        check=True
+    )
+    triggered = time.perf_counter()
+    while not es.check():
+        pass
+    latency = time.perf_counter() - triggered
+
+    EmergencyStop.stop_watcher()
+    EmergencyStop._active = False
+    os.unlink(stop_file)
+
+    return {
+        "checks_per_sec": round(checks / elapsed),
+        "ns_per_check": round(elapsed / checks * 1e9, 1),
+        "detect_latency_ms": round(latency * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emergency Stop Check Benchmark")
+    parser.add_argument("--checks", type=int, default=500_000)
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="estop-bench-")
+    os.chdir(workdir)
+    os.makedirs(".claude", exist_ok=True)
+
+    report = {
+        mode: run_mode(mode, args.checks, args.poll_interval)
+        for mode in ("stat", "poll", "inotify")
+    }
+    print(f"[Benchmark] {args.checks} checks per mode, poll interval {args.poll_interval}s")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Parallel Dev Graph Benchmark
+
+Runs the parallel dev graph with stubbed fe/be dev nodes that sleep for a
+fixed time, and compares story wall time against the same nodes wired
+sequentially (fe_dev → be_dev → merge_results, the previous topology).
+
+Expected: parallel ≈ max(fe, be), sequential ≈ fe + be.
+
+Usage:
+    python benchmark_parallel_dev.py
+    python benchmark_parallel_dev.py --fe-seconds 0.5 --be-seconds 0.3 --runs 5
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import argparse
+import statistics
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def stub_dev_nodes(fe_seconds: float, be_seconds: float) -> None:
+    """Replace nodes.dev_agents with sleeping stubs (no LLM calls)."""
+
+    def make_node(agent_type: str, seconds: float):
+        def node(state):
+            time.sleep(seconds)
+            return {
+                "agent_type": agent_type,
+                "files_modified": [f"src/{state.get('domain', 'app')}/{agent_type}.ts"],
+                "tests_written": [f"tests/{agent_type}.test.ts"],
+                "success": True,
+                "error": None,
+            }
+        return node
+
+    module = types.ModuleType("nodes.dev_agents")
+    module.fe_dev_node = make_node("frontend", fe_seconds)
+    module.be_dev_node = make_node("backend", be_seconds)
+    sys.modules.setdefault("nodes", types.ModuleType("nodes"))
+    sys.modules["nodes.dev_agents"] = module
+
+
+def time_runs(graph, runs: int) -> dict:
+    from src.domains.dev_agent_state import create_domain_dev_state
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = graph.invoke(create_domain_dev_state("auth"))
+        times.append(time.perf_counter() - start)
+    return {
+        "median_s": round(statistics.median(times), 4),
+        "dev_results": len(result.get("dev_results", [])),
+        "merged_files": len(result.get("merged_files", [])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel Dev Graph Benchmark")
+    parser.add_argument("--fe-seconds", type=float, default=0.4)
+    parser.add_argument("--be-seconds", type=float, default=0.6)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    stub_dev_nodes(args.fe_seconds, args.be_seconds)
+    from langgraph.graph import StateGraph, END
+    from src.domains.dev_agent_state import DomainDevState
+    from src.domains.dev_merger import merge_dev_results
+    from src.domains.parallel_dev_graph import (
+        compile_parallel_dev_graph,
+        fe_dev_wrapper,
+        be_dev_wrapper,
+    )
+
+    sequential = StateGraph(DomainDevState)
+    sequential.add_node("fe_dev", fe_dev_wrapper)
+    sequential.add_node("be_dev", be_dev_wrapper)
+    sequential.add_node("merge_results", merge_dev_results)
+    sequential.set_entry_point("fe_dev")
+    sequential.add_edge("fe_dev", "be_dev")
+    sequential.add_edge("be_dev", "merge_results")
+    sequential.add_edge("merge_results", END)
+
+    report = {
+        "fe_seconds": args.fe_seconds,
+        "be_seconds": args.be_seconds,
+        "sequential": time_runs(sequential.compile(), args.runs),
+        "parallel": time_runs(compile_parallel_dev_graph(), args.runs),
+    }
+    report["speedup"] = round(report["sequential"]["median_s"] / report["parallel"]["median_s"], 2)
+    print(f"[Benchmark] {args.runs} runs per topology")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Halt Latency Harness
+
+Spins up N local worker processes subscribed to the emergency stop channel,
+triggers a stop through HaltAckCollector and reports time-to-full-halt
+(p50/p100 ack latency and stragglers) against HALT_TIMEOUT_SECONDS.
+
+The HALT and RESUME it sends go to the real emergency stop channel, so it
+must run against a Redis no agents use: --redis-url is required (REDIS_URL
+is ignored), and the harness refuses to start if that Redis already has
+live workers registered, unless --i-know-this-halts-workers is given. Runs
+in a temporary directory, so the stop file it creates does not halt agents
+working on the project.
+
+Usage:
+    python halt_latency_harness.py --redis-url redis://localhost:6390 --workers 20
+    python halt_latency_harness.py --redis-url redis://localhost:6390 --workers 20 --slow 2 --callback-delay 8
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import multiprocessing as mp
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.safety.emergency_stop import EmergencyStop, EMERGENCY_WORKERS_KEY, HALT_TIMEOUT_SECONDS
+from src.safety.halt_slo import HaltAckCollector
+
+
+def worker(worker_id: str, workdir: str, callback_delay: float) -> None:
+    os.chdir(workdir)
+    if callback_delay:
+        # Simulates a worker whose stop handling (cleanup) is slow
+        EmergencyStop.register_callback(lambda reason: time.sleep(callback_delay))
+    es = EmergencyStop(watch=False)
+    es.subscribe(worker_id=worker_id)
+    # Acks come from the subscriber thread; stay alive until terminated
+    while True:
+        es.check()
+        time.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Halt Latency Harness")
+    parser.add_argument("--redis-url", required=True,
+                        help="Redis for the run; its subscribers receive a real HALT/RESUME")
+    parser.add_argument("--i-know-this-halts-workers", action="store_true",
+                        help="Run even if other workers are registered on this Redis")
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--slow", type=int, default=0, help="Workers with a slow stop callback")
+    parser.add_argument("--callback-delay", type=float, default=HALT_TIMEOUT_SECONDS + 1)
+    parser.add_argument("--timeout", type=float, default=HALT_TIMEOUT_SECONDS)
+    args = parser.parse_args()
+
+    # Workers and the collector connect through REDIS_URL
+    os.environ["REDIS_URL"] = args.redis_url
+    collector = HaltAckCollector()
+    others = collector.live_workers()
+    if others and not args.i_know_this_halts_workers:
+        print(f"[Harness] Refusing to run: {len(others)} live workers on {args.redis_url} "
+              f"(e.g. {others[0]}) would be halted. Use a separate Redis, or pass "
+              f"--i-know-this-halts-workers.")
+        sys.exit(2)
+
+    workdir = tempfile.mkdtemp(prefix="halt-harness-")
+    os.chdir(workdir)
+    run_id = os.getpid()
+    worker_ids = [f"harness-{run_id}-{i}" for i in range(args.workers)]
+
+    processes = []
+    for i, worker_id in enumerate(worker_ids):
+        delay = args.callback_delay if i < args.slow else 0.0
+        process = mp.Process(target=worker, args=(worker_id, workdir, delay), daemon=True)
+        process.start()
+        processes.append(process)
+
+    es = EmergencyStop(watch=False)
+    try:
+        # Wait for every worker to register its heartbeat
+        deadline = time.time() + 15
+        while time.time() < deadline and not set(worker_ids) <= set(collector.live_workers()):
+            time.sleep(0.1)
+
+        report = collector.trigger(es, "Halt latency harness", source="api", timeout=args.timeout)
+        print(f"[Harness] {args.workers} workers ({args.slow} slow), SLO {args.timeout}s")
+        print(json.dumps(report.to_dict(), indent=2))
+    finally:
+        es.clear()
+        for process in processes:
+            process.terminate()
+        collector.redis.hdel(EMERGENCY_WORKERS_KEY, *worker_ids)
+
+
+if __name__ == "__main__":
+    main()
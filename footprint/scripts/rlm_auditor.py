@@ -3,8 +3,8 @@ RLM Auditor - Real-time Budget and Context Monitoring
 Gate 0 Enhancement - Grok Improvement Request
 
 Monitors RLM budget during WAVE runs:
-- Tracks token and cost usage
-- Generates alerts at thresholds
+- Tracks token and cost usage from per-call usage events (Redis stream)
+- Generates alerts at thresholds, triggers Emergency Stop on hard breach
 - Optimizes context for agents
 - Integrates with issue_detector
 
@@ -32,6 +32,18 @@ from tools.p_variable import (
     prune_p_variable,
     estimate_token_count
 )
+from tools.usage_timeseries import UsageTimeSeries
+
+# Usage events and Emergency Stop (optional - falls back to polling)
+try:
+    from src.safety.usage_events import UsageEventSubscriber, UsageEvent
+    from src.safety.emergency_stop import EmergencyStop
+    USAGE_EVENTS_AVAILABLE = True
+except ImportError:
+    USAGE_EVENTS_AVAILABLE = False
+
+# Persist the time series at most this often while events stream in
+TIMESERIES_SAVE_INTERVAL = 60
 
 
 class RLMAuditor:
@@ -45,7 +57,9 @@ class RLMAuditor:
         self,
         project_path: str,
         issue_detector: Optional[Any] = None,
-        poll_interval: int = 60
+        poll_interval: int = 60,
+        heartbeat_interval: int = 300,
+        emergency_stop: Optional[Any] = None
     ):
         """
         Initialize RLM Auditor.
@@ -53,19 +67,32 @@ class RLMAuditor:
         Args:
             project_path: Path to project root
             issue_detector: Optional IssueDetector instance for integration
-            poll_interval: Seconds between status checks
+            poll_interval: Seconds between status checks when usage events
+                are unavailable (no Redis)
+            heartbeat_interval: Seconds without events before a liveness
+                status line is printed
+            emergency_stop: EmergencyStop to trigger on hard breach
+                (default: a new EmergencyStop when available)
         """
         self.project_path = project_path
         self.issue_detector = issue_detector
         self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.emergency_stop = emergency_stop
+        if self.emergency_stop is None and USAGE_EVENTS_AVAILABLE:
+            self.emergency_stop = EmergencyStop()
+        self._halt_triggered = False
+        self._last_save = time.time()
+        self._subscriber = None
 
         # Load configs
         self.rlm_config = load_rlm_config(project_path) or get_default_rlm_config()
         self.p_variable = load_p_variable(project_path)
 
-        # Usage tracking
+        # Usage tracking (running totals plus persisted per-second history)
         self.tokens_used = 0
         self.cost_used = 0.0
+        self.timeseries = UsageTimeSeries.load(project_path)
         self.start_time = datetime.now()  # Use naive datetime for consistency
 
         # Context optimization stats
@@ -85,6 +112,7 @@ class RLMAuditor:
             "tokens_used": self.tokens_used,
             "cost_used": self.cost_used,
             "budget_ok": budget_check["ok"],
+            "tokens_per_minute": budget_check["tokens_per_minute"],
             "warnings": self._alerts,
             "elapsed_seconds": (datetime.now() - self.start_time).total_seconds()
         }
@@ -93,6 +121,9 @@ class RLMAuditor:
         """
         Check current budget status.
 
+        Token usage is the sliding 60s window against maxTokensPerMinute;
+        cost is the last 24h against maxDailySpend.
+
         Returns:
             Dict with ok status, warnings, and halt recommendations
         """
@@ -103,8 +134,12 @@ class RLMAuditor:
         max_daily = budget.get("maxDailySpend", 50)
         alert_threshold = budget.get("alertThreshold", 0.8)
 
-        token_percent = (self.tokens_used / max_tokens * 100) if max_tokens > 0 else 0
-        cost_percent = (self.cost_used / max_daily * 100) if max_daily > 0 else 0
+        window = self.timeseries.summary()
+        tokens_per_minute = window["tokens_last_minute"]
+        cost_day = window["cost_last_day"]
+
+        token_percent = (tokens_per_minute / max_tokens * 100) if max_tokens > 0 else 0
+        cost_percent = (cost_day / max_daily * 100) if max_daily > 0 else 0
 
         # Check thresholds
         token_warning = token_percent >= (alert_threshold * 100)
@@ -116,12 +151,15 @@ class RLMAuditor:
             "token_percent": token_percent,
             "cost_percent": cost_percent,
             "warning": token_warning or cost_warning,
-            "halt_recommended": over_limit
+            "halt_recommended": over_limit,
+            "tokens_per_minute": tokens_per_minute,
+            "cost_last_hour": window["cost_last_hour"],
+            "cost_last_day": cost_day
         }
 
         # Add warning message if needed
         if token_warning:
-            result["warning_message"] = f"Token usage at {token_percent:.1f}% of limit"
+            result["warning_message"] = f"Token rate at {token_percent:.1f}% of per-minute limit"
         elif cost_warning:
             result["warning_message"] = f"Cost usage at {cost_percent:.1f}% of daily limit"
 
@@ -137,9 +175,12 @@ class RLMAuditor:
         """
         self.tokens_used += tokens
         self.cost_used += cost
+        self.timeseries.add(tokens, cost)
 
         # Check for alerts
         budget_status = self.check_budget()
+        if not budget_status.get("halt_recommended"):
+            self._halt_triggered = False  # Re-arm once usage is back under limits
         if budget_status.get("warning") and not budget_status.get("halt_recommended"):
             alert = f"[WARNING] Budget alert: {budget_status.get('warning_message', 'threshold crossed')}"
             if alert not in self._alerts:
@@ -152,6 +193,8 @@ class RLMAuditor:
                 self._alerts.append(alert)
                 print(alert)
 
+            self._trigger_halt(budget_status)
+
             # Report to issue detector if available
             if self.issue_detector:
                 try:
@@ -163,6 +206,48 @@ class RLMAuditor:
                 except Exception:
                     pass
 
+    def _trigger_halt(self, budget_status: Dict[str, Any]) -> None:
+        """Trigger Emergency Stop once per breach."""
+        if self._halt_triggered or not self.emergency_stop:
+            return
+        self._halt_triggered = True
+        reason = (
+            f"RLM budget exceeded: {budget_status['tokens_per_minute']} tokens/min "
+            f"({budget_status['token_percent']:.0f}%), "
+            f"${budget_status['cost_last_day']:.2f} today ({budget_status['cost_percent']:.0f}%)"
+        )
+        try:
+            self.emergency_stop.trigger(reason, source="safety")
+        except Exception as e:
+            print(f"[RLM Auditor] Failed to trigger emergency stop: {e}")
+
+    def on_usage_event(self, event: "UsageEvent") -> None:
+        """Evaluate budget immediately for one published LLM call."""
+        self.record_usage(tokens=event.tokens, cost=event.cost_usd)
+        if time.time() - self._last_save >= TIMESERIES_SAVE_INTERVAL:
+            self.timeseries.save()
+            self._last_save = time.time()
+
+    def heartbeat(self) -> None:
+        """Liveness status line (printed when no events arrive for a while)."""
+        status = self.get_status()
+        budget = self.check_budget()
+
+        print(f"\n[RLM Status] Tokens: {status['tokens_used']} | Cost: ${status['cost_used']:.4f}")
+        print(f"[RLM Status] Budget OK: {budget['ok']} | Tokens/min: {budget['tokens_per_minute']} ({budget['token_percent']:.1f}%)")
+
+        if budget.get("halt_recommended"):
+            print("[RLM ALERT] Budget exceeded - HALT RECOMMENDED")
+
+        self.timeseries.save()
+        self._last_save = time.time()
+
+    def stop(self) -> None:
+        """Stop the monitoring loop."""
+        self.is_running = False
+        if self._subscriber:
+            self._subscriber.stop()
+
     def get_alerts(self) -> List[str]:
         """Get all generated alerts."""
         return self._alerts.copy()
@@ -211,6 +296,7 @@ class RLMAuditor:
             "budget_status": "OK" if budget_status["ok"] else "EXCEEDED",
             "token_percent": budget_status["token_percent"],
             "cost_percent": budget_status["cost_percent"],
+            "usage_windows": self.timeseries.summary(),
             "alerts": self._alerts,
             "context_reduction": f"{context_reduction:.1f}%",
             "optimization": {
@@ -224,11 +310,13 @@ class RLMAuditor:
         """
         Run auditor in monitoring loop.
 
-        Polls status every poll_interval seconds.
+        Consumes usage events as they are published, so budgets are
+        evaluated within milliseconds of each call; a heartbeat status line
+        is printed after heartbeat_interval seconds without events. Without
+        Redis, falls back to polling every poll_interval seconds.
         """
         self.is_running = True
         print(f"[RLM Auditor] Starting for project: {self.project_path}")
-        print(f"[RLM Auditor] Poll interval: {self.poll_interval}s")
         print(f"[RLM Auditor] Config: {json.dumps(self.rlm_config, indent=2)}")
 
         # Initial context optimization
@@ -236,22 +324,35 @@ class RLMAuditor:
         print(f"[RLM Auditor] Context optimized: {self.original_context_size} -> {self.optimized_context_size} tokens")
 
         try:
-            while self.is_running:
-                status = self.get_status()
-                budget = self.check_budget()
-
-                print(f"\n[RLM Status] Tokens: {status['tokens_used']} | Cost: ${status['cost_used']:.4f}")
-                print(f"[RLM Status] Budget OK: {budget['ok']} | Token%: {budget['token_percent']:.1f}%")
-
-                if budget.get("halt_recommended"):
-                    print("[RLM ALERT] Budget exceeded - HALT RECOMMENDED")
+            if USAGE_EVENTS_AVAILABLE:
+                try:
+                    self._subscriber = UsageEventSubscriber()
+                except RuntimeError as e:
+                    print(f"[RLM Auditor] Usage events unavailable ({e}) - polling")
 
-                time.sleep(self.poll_interval)
+            if self._subscriber:
+                print(f"[RLM Auditor] Listening for usage events (heartbeat {self.heartbeat_interval}s)")
+                try:
+                    self._subscriber.listen(
+                        self.on_usage_event,
+                        on_idle=self.heartbeat,
+                        block_ms=self.heartbeat_interval * 1000
+                    )
+                except RuntimeError as e:
+                    print(f"[RLM Auditor] Usage events lost ({e}) - polling")
+                    self._subscriber = None
+
+            if self.is_running and not self._subscriber:
+                print(f"[RLM Auditor] Poll interval: {self.poll_interval}s")
+                while self.is_running:
+                    self.heartbeat()
+                    time.sleep(self.poll_interval)
 
         except KeyboardInterrupt:
             print("\n[RLM Auditor] Stopped by user")
         finally:
             self.is_running = False
+            self.timeseries.save()
             report = self.generate_report()
             print(f"\n[RLM Report] {json.dumps(report, indent=2)}")
 
@@ -259,12 +360,14 @@ class RLMAuditor:
 def main():
     parser = argparse.ArgumentParser(description="RLM Budget Auditor")
     parser.add_argument("--project", "-p", required=True, help="Project path")
-    parser.add_argument("--interval", "-i", type=int, default=60, help="Poll interval (seconds)")
+    parser.add_argument("--interval", "-i", type=int, default=60, help="Poll interval without Redis (seconds)")
+    parser.add_argument("--heartbeat", type=int, default=300, help="Heartbeat interval (seconds)")
     args = parser.parse_args()
 
     auditor = RLMAuditor(
         project_path=args.project,
-        poll_interval=args.interval
+        poll_interval=args.interval,
+        heartbeat_interval=args.heartbeat
     )
     auditor.run()
 
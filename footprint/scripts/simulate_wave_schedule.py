@@ -0,0 +1,97 @@
+"""
+Wave Schedule Simulator
+
+Replays story durations through the WaveScheduler dispatch policy
+(dependencies, file conflicts, critical-path-first) and compares the
+wave's makespan against sequential dispatch of one story at a time.
+With --workers, each agent queue has that many workers and dispatched
+stories wait in their queue for a free one; otherwise every story gets an
+agent as soon as it is dispatched.
+
+Durations come from --durations (a JSON object {story_id: seconds}, or
+exported task results with story_id/duration_seconds); stories without a
+recorded duration use estimate_duration() (tokens or story points).
+
+Usage:
+    python simulate_wave_schedule.py
+    python simulate_wave_schedule.py --wave-dir ../stories/wave8 --max-parallel 2
+    python simulate_wave_schedule.py --workers fe=1,be=2,qa=1
+    python simulate_wave_schedule.py --durations durations.json --schedule
+"""
+
+import os
+import sys
+import json
+import argparse
+from typing import Dict
+
+# Add parent to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.story_scheduler import StoryDAG, StoryCycleError, simulate_schedule, load_durations
+
+
+def parse_workers(spec: str) -> Dict[str, int]:
+    """"fe=1,be=2,qa=1" -> {"fe": 1, "be": 2, "qa": 1}"""
+    workers = {}
+    for item in spec.split(","):
+        domain, _, count = item.partition("=")
+        if not domain.strip() or not count.strip().isdigit() or int(count) < 1:
+            raise argparse.ArgumentTypeError(f"expected queue=count, got {item!r}")
+        workers[domain.strip()] = int(count)
+    return workers
+
+
+def main():
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "stories")
+    parser = argparse.ArgumentParser(description="Wave Schedule Simulator")
+    parser.add_argument("--stories-dir", default=default_dir, help="Directory of wave directories")
+    parser.add_argument("--wave-dir", help="Simulate a single wave directory")
+    parser.add_argument("--durations", help="Historical durations JSON")
+    parser.add_argument("--max-parallel", type=int, default=None, help="Max stories in flight")
+    parser.add_argument("--workers", type=parse_workers, default=None,
+                        help="Agents per queue, e.g. fe=1,be=2,qa=1 (default: unlimited)")
+    parser.add_argument("--schedule", action="store_true", help="Include per-story start/end")
+    args = parser.parse_args()
+
+    durations = load_durations(args.durations) if args.durations else {}
+    if args.wave_dir:
+        wave_dirs = [args.wave_dir]
+    else:
+        wave_dirs = [
+            os.path.join(args.stories_dir, name)
+            for name in sorted(os.listdir(args.stories_dir))
+            if os.path.isdir(os.path.join(args.stories_dir, name))
+        ]
+
+    report = {}
+    total_makespan = total_sequential = 0.0
+    for wave_dir in wave_dirs:
+        wave = os.path.basename(os.path.normpath(wave_dir))
+        try:
+            dag = StoryDAG.from_wave_dir(wave_dir, durations)
+        except StoryCycleError as e:
+            report[wave] = {"error": str(e)}
+            continue
+        if not dag.nodes:
+            continue
+        result = simulate_schedule(dag, durations, max_parallel=args.max_parallel, workers=args.workers)
+        if not args.schedule:
+            result.pop("schedule")
+        result["conflict_pairs"] = sum(len(n.conflicts) for n in dag.nodes.values()) // 2
+        report[wave] = result
+        total_makespan += result["makespan_seconds"]
+        total_sequential += result["sequential_seconds"]
+
+    report["total"] = {
+        "makespan_seconds": round(total_makespan, 3),
+        "sequential_seconds": round(total_sequential, 3),
+        "speedup": round(total_sequential / total_makespan, 2) if total_makespan else None,
+    }
+    workers = ",".join(f"{d}={n}" for d, n in args.workers.items()) if args.workers else "unlimited"
+    print(f"[Simulator] {len(wave_dirs)} wave(s), max parallel {args.max_parallel or 'unlimited'}, workers {workers}")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
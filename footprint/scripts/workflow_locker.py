@@ -19,12 +19,22 @@ import json
 import time
 import hashlib
 import argparse
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
 # Add parent to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Shared parsed-JSON cache and locked P.json store (fall back to reading and
+# rewriting P.json directly)
+try:
+    from tools.json_cache import get_json_cache
+    from tools.p_store import get_p_store
+except ImportError:
+    get_json_cache = None
+    get_p_store = None
+
 # Gate definitions (LOCKED SEQUENCE)
 GATES = [
     "Gate 0: Research",
@@ -61,17 +71,39 @@ class WorkflowLocker:
         self.claude_dir = os.path.join(project_path, ".claude")
         self.p_json_path = os.path.join(self.claude_dir, "P.json")
         self.lock_file_path = os.path.join(self.claude_dir, "WORKFLOW.lock")
+        self.store = get_p_store(project_path) if get_p_store is not None else None
 
         # Ensure .claude directory exists (only if project path exists)
         if os.path.exists(project_path):
             os.makedirs(self.claude_dir, exist_ok=True)
 
-    def _load_p_json(self) -> Dict[str, Any]:
-        """Load P.json or return default."""
-        if os.path.exists(self.p_json_path):
+    def _load_p_json(self, for_update: bool = False) -> Dict[str, Any]:
+        """
+        Load P.json or return default.
+
+        Reads are served from the JSON cache (re-parsed only when P.json
+        changes) and must not be modified; for_update returns a private
+        copy of wave_state for callers that write it back.
+        """
+        if self.store is not None and not for_update:
             try:
-                with open(self.p_json_path) as f:
-                    return json.load(f)
+                data = self.store.read()
+                if data is not None:
+                    return data
+            except (json.JSONDecodeError, IOError):
+                pass
+        elif os.path.exists(self.p_json_path):
+            try:
+                if get_json_cache is not None:
+                    data = get_json_cache().load(
+                        self.p_json_path,
+                        copy_sections=("wave_state",) if for_update else None
+                    )
+                    if data is not None:
+                        return data
+                else:
+                    with open(self.p_json_path) as f:
+                        return json.load(f)
             except (json.JSONDecodeError, IOError):
                 pass
         return {"wave_state": {"current_wave": 1, "current_gate": 0, "gate_history": []}}
@@ -80,6 +112,28 @@ class WorkflowLocker:
         """Save P.json."""
         with open(self.p_json_path, "w") as f:
             json.dump(data, f, indent=2)
+        if get_json_cache is not None:
+            get_json_cache().put(self.p_json_path, data)
+
+    @contextmanager
+    def _update_p_json(self):
+        """
+        Read-modify-write P.json. Modify the yielded dict's wave_state.
+
+        With the P.json store this holds the P.json lock throughout and
+        writes only the changed fields, so gate updates from concurrent
+        processes are not lost.
+        """
+        if self.store is None:
+            data = self._load_p_json(for_update=True)
+            yield data
+            self._save_p_json(data)
+            return
+
+        with self.store.transaction(sections=("wave_state",)) as data:
+            if not data:
+                data.update(self._load_p_json(for_update=True))
+            yield data
 
     def get_current_gate(self) -> int:
         """Get current gate number from P.json."""
@@ -93,11 +147,10 @@ class WorkflowLocker:
         Args:
             gate_num: Gate number to set
         """
-        p_data = self._load_p_json()
-        if "wave_state" not in p_data:
-            p_data["wave_state"] = {}
-        p_data["wave_state"]["current_gate"] = gate_num
-        self._save_p_json(p_data)
+        with self._update_p_json() as p_data:
+            if "wave_state" not in p_data:
+                p_data["wave_state"] = {}
+            p_data["wave_state"]["current_gate"] = gate_num
 
     def _create_lock_hash(self, gates: List[str], timestamp: float) -> str:
         """
@@ -238,12 +291,6 @@ class WorkflowLocker:
 
     def _record_gate_transition(self, from_gate: int, to_gate: int):
         """Record gate transition in history."""
-        p_data = self._load_p_json()
-        if "wave_state" not in p_data:
-            p_data["wave_state"] = {}
-        if "gate_history" not in p_data["wave_state"]:
-            p_data["wave_state"]["gate_history"] = []
-
         transition = {
             "from_gate": from_gate,
             "to_gate": to_gate,
@@ -251,8 +298,12 @@ class WorkflowLocker:
             "timestamp": datetime.now().isoformat(),
             "status": "passed"
         }
-        p_data["wave_state"]["gate_history"].append(transition)
-        self._save_p_json(p_data)
+        with self._update_p_json() as p_data:
+            if "wave_state" not in p_data:
+                p_data["wave_state"] = {}
+            if "gate_history" not in p_data["wave_state"]:
+                p_data["wave_state"]["gate_history"] = []
+            p_data["wave_state"]["gate_history"].append(transition)
 
     def get_gate_history(self) -> List[Dict[str, Any]]:
         """Get gate transition history."""
@@ -276,19 +327,18 @@ class WorkflowLocker:
             }
 
         # Reset gate to 0
-        p_data = self._load_p_json()
-        previous_gate = p_data.get("wave_state", {}).get("current_gate", 0)
-        if "wave_state" not in p_data:
-            p_data["wave_state"] = {}
-        p_data["wave_state"]["current_gate"] = 0
-        if "gate_history" not in p_data["wave_state"]:
-            p_data["wave_state"]["gate_history"] = []
-        p_data["wave_state"]["gate_history"].append({
-            "action": "RESET",
-            "timestamp": datetime.now().isoformat(),
-            "previous_gate": previous_gate
-        })
-        self._save_p_json(p_data)
+        with self._update_p_json() as p_data:
+            previous_gate = p_data.get("wave_state", {}).get("current_gate", 0)
+            if "wave_state" not in p_data:
+                p_data["wave_state"] = {}
+            p_data["wave_state"]["current_gate"] = 0
+            if "gate_history" not in p_data["wave_state"]:
+                p_data["wave_state"]["gate_history"] = []
+            p_data["wave_state"]["gate_history"].append({
+                "action": "RESET",
+                "timestamp": datetime.now().isoformat(),
+                "previous_gate": previous_gate
+            })
 
         return {
             "success": True,
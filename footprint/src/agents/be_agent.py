@@ -17,6 +17,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from src.agent_worker import AgentWorker
 from src.task_queue import DomainQueue, AgentTask
+from src.safety.cancellation import cancellation_scope, invoke_cancellable, TaskCancelledError
+from src.safety.usage_events import publish_usage
+from src.safety.token_counter import count_tokens
+from src.safety.budget_ledger import BudgetLedgerDenied, reserved_call
 
 # Claude integration
 try:
@@ -93,9 +97,10 @@ class BEAgent(AgentWorker):
 
         # Initialize Claude for coding
         self.llm = None
+        self.model_id = os.getenv("ANTHROPIC_MODEL_DEV", "claude-sonnet-4-20250514")
         if CLAUDE_AVAILABLE and os.getenv("ANTHROPIC_API_KEY"):
             self.llm = ChatAnthropic(
-                model=os.getenv("ANTHROPIC_MODEL_DEV", "claude-sonnet-4-20250514"),
+                model=self.model_id,
                 temperature=0.3,
                 max_tokens=8192
             )
@@ -116,11 +121,14 @@ class BEAgent(AgentWorker):
         self.log(f"Target files: {files}")
 
         if self.llm:
-            return self._code_with_claude(requirements, files, project_path, task.story_id)
+            # The scheduler sets payload["model"] when the budget forecast downgrades
+            model_id = task.payload.get("model") or self.model_id
+            return self._code_with_claude(requirements, files, project_path, task.story_id, model_id)
         else:
             return self._placeholder_code(files, task.story_id)
 
-    def _code_with_claude(self, requirements: str, files: list, project_path: str, story_id: str) -> dict:
+    def _code_with_claude(self, requirements: str, files: list, project_path: str, story_id: str,
+                          model_id: str = "") -> dict:
         """Use Claude to generate backend code"""
         self.log("Generating backend code with Claude...")
 
@@ -140,24 +148,35 @@ Include all necessary imports, types, and validation.
 Ensure proper error handling and security.
 """
 
+        model_id = model_id or self.model_id
+        llm = self.llm if model_id == self.model_id else self.llm.model_copy(update={"model": model_id})
+
         try:
             messages = [
                 SystemMessage(content=BE_SYSTEM_PROMPT),
                 HumanMessage(content=prompt)
             ]
 
-            response = self.llm.invoke(messages)
-            code = response.content
-
-            # Extract token usage from response metadata
-            tokens = 0
-            cost_usd = 0.0
-            if hasattr(response, 'usage_metadata') and response.usage_metadata:
-                input_tokens = response.usage_metadata.get('input_tokens', 0)
-                output_tokens = response.usage_metadata.get('output_tokens', 0)
-                tokens = input_tokens + output_tokens
-                # Claude Sonnet pricing: $3/M input, $15/M output
-                cost_usd = (input_tokens * 0.000003) + (output_tokens * 0.000015)
+            # Reserved in the budget ledger (when enabled) until the call settles
+            with reserved_call(
+                model_id,
+                count_tokens(BE_SYSTEM_PROMPT + prompt, model_id),
+                llm.max_tokens,
+                story_id=story_id,
+                provider="claude"
+            ) as spend:
+                with cancellation_scope(story_id, story_id=story_id, domain="be"):
+                    response = invoke_cancellable(llm, messages)
+                code = response.content
+
+                # Extract token usage from response metadata
+                tokens = 0
+                cost_usd = 0.0
+                if hasattr(response, 'usage_metadata') and response.usage_metadata:
+                    usage = publish_usage(story_id, "be", model_id, response.usage_metadata)
+                    tokens = usage.tokens
+                    cost_usd = usage.cost_usd
+                    spend.settle(cost_usd, tokens)
 
             # Extract file paths from code blocks
             import re
@@ -179,6 +198,22 @@ Ensure proper error handling and security.
                 "cost_usd": cost_usd
             }
 
+        except BudgetLedgerDenied as e:
+            self.log(str(e), "warning")
+            return {
+                "status": "failed",
+                "error": str(e),
+                "code": ""
+            }
+
+        except TaskCancelledError as e:
+            self.log(f"Cancelled: {e.reason}", "warning")
+            return {
+                "status": "cancelled",
+                "error": e.reason,
+                "code": ""
+            }
+
         except Exception as e:
             self.log(f"Claude error: {e}", "error")
             return {
@@ -17,6 +17,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from src.agent_worker import AgentWorker
 from src.task_queue import DomainQueue, AgentTask
+from src.safety.cancellation import cancellation_scope, invoke_cancellable, TaskCancelledError
+from src.context_packer import pack_code, build_query, CONTEXT_BUDGETS
 
 # Claude integration
 try:
@@ -71,9 +73,10 @@ class CTOAgent(AgentWorker):
 
         # Initialize Claude for review
         self.llm = None
+        self.model_id = os.getenv("ANTHROPIC_MODEL_CTO", "claude-sonnet-4-20250514")
         if CLAUDE_AVAILABLE and os.getenv("ANTHROPIC_API_KEY"):
             self.llm = ChatAnthropic(
-                model=os.getenv("ANTHROPIC_MODEL_CTO", "claude-sonnet-4-20250514"),
+                model=self.model_id,
                 temperature=0.2,
                 max_tokens=4096
             )
@@ -102,6 +105,14 @@ class CTOAgent(AgentWorker):
         """Use Claude to review architecture"""
         self.log("Performing architecture review with Claude...")
 
+        # Keep the code most relevant to the plan and files within budget
+        packed = pack_code(
+            code, build_query(plan, files), CONTEXT_BUDGETS["cto_review"],
+            model=self.model_id, focus_files=files
+        )
+        if packed.omitted:
+            self.log(f"Packed review context: {packed.original_tokens} -> {packed.tokens} tokens")
+
         prompt = f"""Story ID: {story_id}
 
 Implementation Plan:
@@ -111,7 +122,7 @@ Files Modified: {files}
 
 Code to Review:
 ```
-{code[:8000]}  # Truncate for token limits
+{packed.text}
 ```
 
 Review this code for architecture, security, and quality.
@@ -124,7 +135,8 @@ Return your response as valid JSON matching the required format.
                 HumanMessage(content=prompt)
             ]
 
-            response = self.llm.invoke(messages)
+            with cancellation_scope(story_id, story_id=story_id, domain="cto"):
+                response = invoke_cancellable(self.llm, messages)
             content = response.content
 
             # Extract JSON from response
@@ -151,6 +163,14 @@ Return your response as valid JSON matching the required format.
                 "issues": review.get("issues", [])
             }
 
+        except TaskCancelledError as e:
+            self.log(f"Cancelled: {e.reason}", "warning")
+            return {
+                "status": "cancelled",
+                "error": e.reason,
+                "approved": False
+            }
+
         except Exception as e:
             self.log(f"Claude error: {e}", "error")
             return {
@@ -17,6 +17,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from src.agent_worker import AgentWorker
 from src.task_queue import DomainQueue, AgentTask
+from src.safety.cancellation import cancellation_scope, invoke_cancellable, TaskCancelledError
 
 # Claude integration
 try:
@@ -113,7 +114,8 @@ Return your response as valid JSON matching the required format.
                 HumanMessage(content=prompt)
             ]
 
-            response = self.llm.invoke(messages)
+            with cancellation_scope(story_id, story_id=story_id, domain="pm"):
+                response = invoke_cancellable(self.llm, messages)
             content = response.content
 
             # Extract JSON from response
@@ -138,6 +140,14 @@ Return your response as valid JSON matching the required format.
                 "be_files": [f for t in plan.get("tasks", []) if t.get("domain") == "be" for f in t.get("files", [])]
             }
 
+        except TaskCancelledError as e:
+            self.log(f"Cancelled: {e.reason}", "warning")
+            return {
+                "status": "cancelled",
+                "error": e.reason,
+                "plan": {}
+            }
+
         except Exception as e:
             self.log(f"Claude error: {e}", "error")
             return {
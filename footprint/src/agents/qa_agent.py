@@ -17,6 +17,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from src.agent_worker import AgentWorker
 from src.task_queue import DomainQueue, AgentTask
+from src.safety.cancellation import cancellation_scope, invoke_cancellable, TaskCancelledError
+from src.context_packer import pack_code, build_query, CONTEXT_BUDGETS
 
 # Claude integration
 try:
@@ -93,9 +95,10 @@ class QAAgent(AgentWorker):
 
         # Initialize Claude for QA
         self.llm = None
+        self.model_id = os.getenv("ANTHROPIC_MODEL_QA", "claude-sonnet-4-20250514")
         if CLAUDE_AVAILABLE and os.getenv("ANTHROPIC_API_KEY"):
             self.llm = ChatAnthropic(
-                model=os.getenv("ANTHROPIC_MODEL_QA", "claude-sonnet-4-20250514"),
+                model=self.model_id,
                 temperature=0.1,  # Low temp for consistent evaluation
                 max_tokens=4096
             )
@@ -128,6 +131,14 @@ class QAAgent(AgentWorker):
 
         criteria_str = "\n".join([f"- {c}" for c in acceptance_criteria]) if acceptance_criteria else "Derive from requirements"
 
+        # Keep the code most relevant to requirements and criteria within budget
+        packed = pack_code(
+            code, build_query(requirements, acceptance_criteria, files), CONTEXT_BUDGETS["qa_review"],
+            model=self.model_id, focus_files=files
+        )
+        if packed.omitted:
+            self.log(f"Packed QA context: {packed.original_tokens} -> {packed.tokens} tokens")
+
         prompt = f"""Story ID: {story_id}
 
 Requirements:
@@ -140,7 +151,7 @@ Files Modified: {files}
 
 Code to Review:
 ```
-{code[:10000]}  # Truncate for token limits
+{packed.text}
 ```
 
 Perform thorough QA validation.
@@ -153,7 +164,8 @@ Return your response as valid JSON matching the required format.
                 HumanMessage(content=prompt)
             ]
 
-            response = self.llm.invoke(messages)
+            with cancellation_scope(story_id, story_id=story_id, domain="qa"):
+                response = invoke_cancellable(self.llm, messages)
             content = response.content
 
             # Extract JSON from response
@@ -212,6 +224,14 @@ Return your response as valid JSON matching the required format.
                 "blocking_issues": blocking
             }
 
+        except TaskCancelledError as e:
+            self.log(f"Cancelled: {e.reason}", "warning")
+            return {
+                "status": "cancelled",
+                "error": e.reason,
+                "passed": False
+            }
+
         except Exception as e:
             self.log(f"Claude error: {e}", "error")
             return {
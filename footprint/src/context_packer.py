@@ -0,0 +1,346 @@
+"""
+WAVE v2 Context Packer
+
+Fits code into a per-model token budget by relevance instead of truncating
+at a fixed character offset.
+
+Code is split into chunks at top-level definitions, scored against the task
+with BM25 plus boosts for the story's target files and review-risk terms,
+then added greedily by score until the budget is full. Kept code chunks are emitted in their original
+order, with an elision marker where chunks were dropped, so the model still
+sees a coherent file.
+
+Usage:
+    from src.context_packer import pack_code, build_query
+
+    packed = pack_code(code, build_query(requirements, files),
+                       budget_tokens=CONTEXT_BUDGETS["cto_review"],
+                       model=model_id, focus_files=files)
+    prompt = f"Code to Review:\\n{packed.text}"
+"""
+
+import re
+import math
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .safety.token_counter import count_tokens
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Token budgets for the context block of each prompt: the median token
+# count of the character caps they replace, measured on this repo's
+# TypeScript, so packing costs what truncation did
+CONTEXT_BUDGETS = {
+    "cto_review": 3300,   # CTOAgent (was code[:8000])
+    "qa_review": 4100,    # QAAgent (was code[:10000])
+    "qa_node": 1250,      # multi_llm QA node (was code[:3000])
+    "cto_master": 850,    # multi_llm CTO master (was code[:2000])
+}
+
+# Terms that make a chunk worth a reviewer's attention regardless of the task
+REVIEW_RISK_TERMS = frozenset({
+    "password", "secret", "token", "auth", "session", "cookie", "admin",
+    "sql", "query", "exec", "eval", "innerhtml", "dangerouslysetinnerhtml",
+    "fetch", "delete", "upload", "payment", "stripe", "webhook", "env",
+})
+
+# Chunking
+MAX_CHUNK_LINES = 40
+
+_FENCE_OPEN_RE = re.compile(r"^```[\w+-]*:([^\s`]+)")
+_FENCE_CLOSE_RE = re.compile(r"^```\s*$")
+_TOP_LEVEL_RE = re.compile(
+    r"^(export\s|async\s|def\s|class\s|function\s|const\s|let\s|interface\s|type\s|@)"
+)
+_IDENT_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*")
+_CAMEL_RE = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])")
+
+_STOPWORDS = frozenset({
+    "the", "and", "for", "with", "from", "this", "that", "return", "const",
+    "import", "export", "function", "def", "class", "self", "none", "true",
+    "false", "null", "undefined", "let", "var", "new", "async", "await",
+})
+
+# BM25 parameters
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+# Score multiplier for chunks in one of the story's target files
+_FOCUS_FILE_BOOST = 2.0
+_RISK_TERM_WEIGHT = 0.5
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TYPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class ContextChunk:
+    """A unit of context that is kept or dropped as a whole."""
+    text: str
+    source: str = ""  # File path
+    order: int = 0  # Position in the original content
+    lines: int = 0
+    pinned: bool = False  # Always kept (file fences, headers)
+    tokens: int = 0
+    score: float = 0.0
+
+
+@dataclass
+class PackedContext:
+    """Result of packing."""
+    text: str
+    tokens: int
+    budget_tokens: int
+    original_tokens: int
+    included: List[ContextChunk] = field(default_factory=list)
+    omitted: List[ContextChunk] = field(default_factory=list)
+
+    @property
+    def savings(self) -> float:
+        """Fraction of the original tokens left out."""
+        if not self.original_tokens:
+            return 0.0
+        return 1 - self.tokens / self.original_tokens
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TERMS AND SCORING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def extract_terms(text: str) -> List[str]:
+    """Lowercased identifier parts (camelCase and snake_case split)."""
+    terms = []
+    for ident in _IDENT_RE.findall(text or ""):
+        parts = _CAMEL_RE.findall(ident) or [ident]
+        for part in parts:
+            part = part.lower()
+            if len(part) >= 3 and part not in _STOPWORDS:
+                terms.append(part)
+        if len(parts) > 1 and len(ident) >= 3:
+            terms.append(ident.lower())
+    return terms
+
+
+def build_query(*parts: Any) -> str:
+    """Join task descriptors (requirements, file lists, criteria) into a query."""
+    out = []
+    for part in parts:
+        if not part:
+            continue
+        if isinstance(part, (list, tuple, set)):
+            out.extend(str(p) for p in part)
+        elif isinstance(part, dict):
+            out.append(json.dumps(part, default=str))
+        else:
+            out.append(str(part))
+    return "\n".join(out)
+
+
+def score_chunks(
+    chunks: List[ContextChunk],
+    query: str,
+    focus_files: Optional[Iterable[str]] = None,
+    boost_terms: Optional[Iterable[str]] = None
+) -> None:
+    """
+    Score chunks in place: BM25 against the query, times a boost for
+    focus files, plus a small bonus per distinct boost term present.
+    """
+    query_terms = set(extract_terms(query))
+    boost = set(boost_terms or ())
+    focus = [f for f in (focus_files or []) if f]
+
+    chunk_terms = [Counter(extract_terms(c.text)) for c in chunks]
+    n = len(chunks) or 1
+    avg_len = sum(sum(t.values()) for t in chunk_terms) / n or 1.0
+
+    df: Counter = Counter()
+    for terms in chunk_terms:
+        df.update(set(terms) & query_terms)
+
+    for chunk, terms in zip(chunks, chunk_terms):
+        length = sum(terms.values())
+        score = 0.0
+        for term in query_terms:
+            tf = terms.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf * (_BM25_K1 + 1) / (
+                tf + _BM25_K1 * (1 - _BM25_B + _BM25_B * length / avg_len)
+            )
+        if boost:
+            score += _RISK_TERM_WEIGHT * len(boost.intersection(terms))
+        if chunk.source and any(chunk.source.endswith(f) or f.endswith(chunk.source) for f in focus):
+            score = (score + 1.0) * _FOCUS_FILE_BOOST
+        chunk.score = score
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CHUNKING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def split_code_chunks(code: str, max_lines: int = MAX_CHUNK_LINES) -> List[ContextChunk]:
+    """
+    Split code into chunks at top-level definitions.
+
+    Fence lines of the ```lang:path blocks the dev agents emit become pinned
+    chunks so the packed output keeps its file structure; each chunk's
+    source is the file it belongs to.
+    """
+    chunks: List[ContextChunk] = []
+    current: List[str] = []
+    source = ""
+
+    def flush():
+        if current:
+            chunks.append(ContextChunk(
+                text="\n".join(current), source=source,
+                order=len(chunks), lines=len(current)
+            ))
+            current.clear()
+
+    for line in (code or "").split("\n"):
+        fence = _FENCE_OPEN_RE.match(line)
+        if fence or _FENCE_CLOSE_RE.match(line):
+            flush()
+            if fence:
+                source = fence.group(1)
+            chunks.append(ContextChunk(text=line, source=source, order=len(chunks), lines=1, pinned=True))
+            if not fence:
+                source = ""
+            continue
+
+        starts_definition = bool(_TOP_LEVEL_RE.match(line))
+        if current and (starts_definition or len(current) >= max_lines):
+            # Keep decorators/comments directly above a definition with it
+            carry = []
+            if starts_definition:
+                while current and current[-1].strip().startswith(("@", "#", "//", "/*", "*")):
+                    carry.insert(0, current.pop())
+            flush()
+            current.extend(carry)
+        current.append(line)
+
+    flush()
+    return chunks
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PACKING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _select(chunks: List[ContextChunk], budget: int) -> Tuple[List[ContextChunk], List[ContextChunk]]:
+    """
+    Greedily by score (ties: earlier first). A file's pinned fence lines
+    are charged with its first kept chunk, so files with nothing kept cost
+    nothing; pinned chunks outside any file are always kept.
+    """
+    fences: Dict[str, List[ContextChunk]] = {}
+    for chunk in chunks:
+        if chunk.pinned:
+            fences.setdefault(chunk.source, []).append(chunk)
+    included = fences.pop("", [])
+    used = sum(c.tokens for c in included)
+    omitted = []
+    for chunk in sorted((c for c in chunks if not c.pinned), key=lambda c: (-c.score, c.order)):
+        extra = fences.get(chunk.source, [])
+        cost = chunk.tokens + sum(c.tokens for c in extra)
+        if used + cost <= budget:
+            included.append(chunk)
+            included.extend(extra)
+            fences.pop(chunk.source, None)
+            used += cost
+        else:
+            omitted.append(chunk)
+    for unopened in fences.values():
+        omitted.extend(unopened)
+    included.sort(key=lambda c: c.order)
+    return included, omitted
+
+
+def _render_code(chunks: List[ContextChunk], included: List[ContextChunk]) -> str:
+    kept = {c.order for c in included}
+    out: List[str] = []
+    skipped = 0
+    for chunk in chunks:
+        if chunk.order in kept:
+            if skipped:
+                out.append(f"... [{skipped} lines omitted]")
+                skipped = 0
+            out.append(chunk.text)
+        else:
+            skipped += chunk.lines
+    if skipped:
+        out.append(f"... [{skipped} lines omitted]")
+    return "\n".join(out)
+
+
+def pack_code(
+    code: str,
+    query: str,
+    budget_tokens: int,
+    model: str = "default",
+    focus_files: Optional[Iterable[str]] = None,
+    boost_terms: Optional[Iterable[str]] = REVIEW_RISK_TERMS
+) -> PackedContext:
+    """
+    Pack code into a token budget by relevance to the task.
+
+    Args:
+        code: Code (optionally ```lang:path fenced blocks)
+        query: Task description (see build_query)
+        budget_tokens: Token budget for the packed code
+        model: Model ID (selects the tokenizer)
+        focus_files: The story's target files (boosted)
+        boost_terms: Terms that raise a chunk's score (default: review risks)
+
+    Returns:
+        PackedContext (the code unchanged if it already fits)
+    """
+    original_tokens = count_tokens(code, model)
+    if original_tokens <= budget_tokens:
+        return PackedContext(code or "", original_tokens, budget_tokens, original_tokens)
+
+    chunks = split_code_chunks(code)
+    for chunk in chunks:
+        chunk.tokens = count_tokens(chunk.text, model) + 1  # + newline
+    score_chunks(chunks, query, focus_files, boost_terms)
+
+    # Reserve room for elision markers, then drop the weakest chunk until
+    # the rendered text fits (markers are only known after selection)
+    marker_tokens = count_tokens("... [999 lines omitted]", model) + 1
+    budget = budget_tokens
+    while True:
+        included, omitted = _select(chunks, max(0, budget - marker_tokens * 4))
+        text = _render_code(chunks, included)
+        tokens = count_tokens(text, model)
+        if tokens <= budget_tokens or not any(not c.pinned for c in included):
+            break
+        budget -= tokens - budget_tokens
+
+    return PackedContext(text, tokens, budget_tokens, original_tokens, included, omitted)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "CONTEXT_BUDGETS",
+    "REVIEW_RISK_TERMS",
+    "ContextChunk",
+    "PackedContext",
+    "extract_terms",
+    "build_query",
+    "score_chunks",
+    "split_code_chunks",
+    "pack_code",
+]
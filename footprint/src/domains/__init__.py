@@ -16,6 +16,11 @@ from .domain_graph import (
     create_initial_domain_state,
     SUPPORTED_DOMAINS,
 )
+from .graph_registry import (
+    DomainGraphRegistry,
+    get_domain_graph_registry,
+    warm_domain_graphs,
+)
 from .domain_nodes import (
     domain_cto_node,
     domain_pm_node,
@@ -23,11 +28,21 @@ from .domain_nodes import (
     domain_qa_node,
 )
 from .domain_router import (
+    DomainRouter,
+    DomainMatch,
+    get_domain_router,
     analyze_story_domains,
     route_to_domain,
     get_primary_domain,
     DOMAIN_PATTERNS,
 )
+from .domain_coordinator import (
+    MultiDomainCoordinator,
+    MultiDomainResult,
+    detect_file_conflicts,
+    merge_domain_states,
+    run_multi_domain,
+)
 # Phase 8: Parallel Dev Agents
 from .dev_agent_state import (
     DevAgentState,
@@ -38,6 +53,8 @@ from .dev_agent_state import (
 )
 from .dev_merger import (
     merge_dev_results,
+    detect_dev_conflicts,
+    parse_diff_hunks,
     aggregate_dev_files,
     aggregate_dev_tests,
 )
@@ -54,16 +71,28 @@ __all__ = [
     "compile_domain_subgraph",
     "create_initial_domain_state",
     "SUPPORTED_DOMAINS",
+    "DomainGraphRegistry",
+    "get_domain_graph_registry",
+    "warm_domain_graphs",
     # Nodes
     "domain_cto_node",
     "domain_pm_node",
     "domain_dev_node",
     "domain_qa_node",
     # Routing
+    "DomainRouter",
+    "DomainMatch",
+    "get_domain_router",
     "analyze_story_domains",
     "route_to_domain",
     "get_primary_domain",
     "DOMAIN_PATTERNS",
+    # Coordination
+    "MultiDomainCoordinator",
+    "MultiDomainResult",
+    "detect_file_conflicts",
+    "merge_domain_states",
+    "run_multi_domain",
     # Phase 8: Dev Agent State
     "DevAgentState",
     "DevAgentResult",
@@ -72,6 +101,8 @@ __all__ = [
     "create_domain_dev_state",
     # Phase 8: Dev Merger
     "merge_dev_results",
+    "detect_dev_conflicts",
+    "parse_diff_hunks",
     "aggregate_dev_files",
     "aggregate_dev_tests",
     # Phase 8: Parallel Dev Graph
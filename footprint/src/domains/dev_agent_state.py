@@ -9,7 +9,8 @@ Defines state types for:
 - Domain-level dev coordination (DomainDevState)
 """
 
-from typing import TypedDict, List, Dict, Any, Optional
+import operator
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
 
 
 class DevAgentState(TypedDict):
@@ -33,7 +34,12 @@ class DevAgentState(TypedDict):
 
 
 class DevAgentResult(TypedDict):
-    """Result from a single dev agent execution"""
+    """
+    Result from a single dev agent execution.
+
+    May also carry "diffs" ({path: unified diff}) or "hunks"
+    ({path: [[first_line, last_line]]}) for hunk-level conflict detection.
+    """
     agent_type: str
     files_modified: List[str]
     tests_written: List[str]
@@ -53,12 +59,13 @@ class DomainDevState(TypedDict):
     # Assignments to execute
     dev_assignments: List[str]  # ["frontend", "backend"]
 
-    # Results from each dev
-    dev_results: List[DevAgentResult]
+    # Results from each dev (parallel branches append, the reducer concatenates)
+    dev_results: Annotated[List[DevAgentResult], operator.add]
 
     # Merged results
     merged_files: List[str]
     merged_tests: List[str]
+    dev_conflicts: List[Dict[str, Any]]  # Same file, overlapping hunks
 
 
 def create_dev_agent_state(
@@ -109,6 +116,7 @@ def create_domain_dev_state(
         dev_results=[],
         merged_files=[],
         merged_tests=[],
+        dev_conflicts=[],
     )
 
 
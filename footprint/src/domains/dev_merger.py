@@ -5,10 +5,16 @@ Merge results from parallel frontend/backend developer execution.
 Based on Grok's Parallel Domain Execution Recommendations
 
 Aggregates files and tests from multiple dev agents into
-unified domain results.
+unified domain results, and detects files changed by more than one agent.
+Where results carry diffs (or hunk ranges), only overlapping hunks are
+reported as conflicts; edits to different parts of a file merge cleanly.
 """
 
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+# Unified diff hunk header: @@ -start[,count] +start[,count] @@
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@", re.MULTILINE)
 
 
 def aggregate_dev_files(dev_results: List[Dict[str, Any]]) -> List[str]:
@@ -57,6 +63,81 @@ def aggregate_dev_tests(dev_results: List[Dict[str, Any]]) -> List[str]:
     return all_tests
 
 
+def parse_diff_hunks(diff: str) -> List[Tuple[int, int]]:
+    """
+    Line ranges of the original file touched by a unified diff.
+
+    Args:
+        diff: Unified diff text for one file
+
+    Returns:
+        List of (first_line, last_line) ranges, inclusive. Pure insertions
+        are a one-line range at the insertion point.
+    """
+    hunks = []
+    for match in HUNK_HEADER.finditer(diff or ""):
+        start = int(match.group(1))
+        count = int(match.group(2)) if match.group(2) is not None else 1
+        hunks.append((start, start + max(count, 1) - 1))
+    return hunks
+
+
+def _result_hunks(result: Dict[str, Any], path: str) -> Optional[List[Tuple[int, int]]]:
+    """Hunks a dev result changed in a file, or None if it has no diff info."""
+    hunks = (result.get("hunks") or {}).get(path)
+    if hunks is not None:
+        return [(int(start), int(end)) for start, end in hunks]
+    diff = (result.get("diffs") or {}).get(path)
+    if diff is not None:
+        return parse_diff_hunks(diff)
+    return None
+
+
+def detect_dev_conflicts(dev_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Find files modified by more than one dev agent, with overlapping hunks.
+
+    Dev results may carry "diffs" ({path: unified diff}) or "hunks"
+    ({path: [[first_line, last_line], ...]}). Two agents conflict on a file
+    if their hunks overlap or touch; without diff info for either side, any
+    shared file is reported (hunks unknown).
+
+    Args:
+        dev_results: List of results from dev agents
+
+    Returns:
+        One conflict dict per (file, agent pair): file, agents, hunks
+        (overlapping ranges per agent, or None if unknown)
+    """
+    touched: Dict[str, List[int]] = {}
+    for i, result in enumerate(dev_results):
+        for path in result.get("files_modified", []):
+            if i not in touched.setdefault(path, []):
+                touched[path].append(i)
+
+    conflicts = []
+    for path, indexes in touched.items():
+        for a_pos, a in enumerate(indexes):
+            for b in indexes[a_pos + 1:]:
+                a_result, b_result = dev_results[a], dev_results[b]
+                agents = [a_result.get("agent_type", str(a)), b_result.get("agent_type", str(b))]
+                a_hunks = _result_hunks(a_result, path)
+                b_hunks = _result_hunks(b_result, path)
+                if a_hunks is None or b_hunks is None:
+                    conflicts.append({"file": path, "agents": agents, "hunks": None})
+                    continue
+                overlaps = [
+                    {agents[0]: list(ha), agents[1]: list(hb)}
+                    for ha in a_hunks
+                    for hb in b_hunks
+                    if ha[0] <= hb[1] + 1 and hb[0] <= ha[1] + 1
+                ]
+                if overlaps:
+                    conflicts.append({"file": path, "agents": agents, "hunks": overlaps})
+
+    return conflicts
+
+
 def merge_dev_results(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Merge results from all dev agents into unified domain results.
@@ -65,12 +146,13 @@ def merge_dev_results(state: Dict[str, Any]) -> Dict[str, Any]:
     - All files modified
     - All tests written
     - Success/failure status
+    - Conflicting edits (same file, overlapping hunks)
 
     Args:
         state: Domain dev state with dev_results
 
     Returns:
-        Dict with merged_files and merged_tests
+        Dict with merged_files, merged_tests and dev_conflicts
     """
     dev_results = state.get("dev_results", [])
 
@@ -84,16 +166,23 @@ def merge_dev_results(state: Dict[str, Any]) -> Dict[str, Any]:
     # Collect any errors
     errors = [r.get("error") for r in dev_results if r.get("error")]
 
+    conflicts = detect_dev_conflicts(dev_results)
+    if conflicts:
+        print(f"[DevMerger] Conflicting edits: {[c['file'] for c in conflicts]}")
+
     return {
         "merged_files": merged_files,
         "merged_tests": merged_tests,
         "all_devs_success": all_success,
         "dev_errors": errors,
+        "dev_conflicts": conflicts,
     }
 
 
 __all__ = [
     "merge_dev_results",
+    "detect_dev_conflicts",
+    "parse_diff_hunks",
     "aggregate_dev_files",
     "aggregate_dev_tests",
 ]
@@ -0,0 +1,288 @@
+"""
+Domain Coordinator Module
+Runs the sub-graphs of a multi-domain story concurrently.
+
+Based on Grok's Hierarchical Supervisor Pattern:
+- analyze_story_domains() detects every domain a story touches
+- Each domain sub-graph (from the shared registry) runs with its own
+  DomainState, at most max_concurrency at a time
+- Results are merged into one story result, and files modified by more
+  than one domain are reported as conflicts
+
+Cross-cutting stories (e.g. auth + payments + ui) take as long as their
+slowest domain instead of the sum of all domains.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import contextvars
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .domain_graph import DomainState, create_initial_domain_state
+from .domain_router import analyze_story_domains, route_to_domain
+
+
+# Max domain sub-graphs running at once per story
+DEFAULT_MAX_DOMAIN_CONCURRENCY = int(os.getenv("WAVE_MAX_DOMAIN_CONCURRENCY", "4"))
+
+
+@dataclass
+class MultiDomainResult:
+    """Merged outcome of a story's domain sub-graphs."""
+    task: str
+    parent_run_id: str
+    domains: List[str]
+    states: Dict[str, DomainState] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    durations: Dict[str, float] = field(default_factory=dict)
+    files_modified: List[str] = field(default_factory=list)
+    tests_passed: bool = False
+    cto_approved: bool = False
+    conflicts: Dict[str, List[str]] = field(default_factory=dict)
+    duration_seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return not self.errors and not self.conflicts and self.tests_passed and self.cto_approved
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task": self.task,
+            "parent_run_id": self.parent_run_id,
+            "domains": self.domains,
+            "files_modified": self.files_modified,
+            "tests_passed": self.tests_passed,
+            "cto_approved": self.cto_approved,
+            "conflicts": self.conflicts,
+            "errors": self.errors,
+            "durations_ms": {d: round(s * 1000, 3) for d, s in self.durations.items()},
+            "duration_ms": round(self.duration_seconds * 1000, 3),
+            "success": self.success,
+        }
+
+
+def _normalize_path(path: str) -> str:
+    path = os.path.normpath(path.strip())
+    return path[2:] if path.startswith("./") else path
+
+
+def detect_file_conflicts(states: Dict[str, DomainState]) -> Dict[str, List[str]]:
+    """
+    Find files modified by more than one domain.
+
+    Args:
+        states: Final DomainState per domain
+
+    Returns:
+        Dict of file path -> domains that modified it (conflicts only)
+    """
+    owners: Dict[str, List[str]] = {}
+    for domain, state in states.items():
+        for path in state.get("files_modified", []) or []:
+            domains = owners.setdefault(_normalize_path(path), [])
+            if domain not in domains:
+                domains.append(domain)
+    return {path: domains for path, domains in owners.items() if len(domains) > 1}
+
+
+def merge_domain_states(states: Dict[str, DomainState], errors: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Merge domain sub-graph results into story-level results.
+
+    A story passes tests / CTO review only if every domain did; a domain
+    that failed counts as not passed.
+
+    Args:
+        states: Final DomainState per domain
+        errors: Error per domain whose sub-graph raised
+
+    Returns:
+        Dict with files_modified, tests_passed, cto_approved and conflicts
+    """
+    errors = errors or {}
+    files_modified = []
+    seen = set()
+    for state in states.values():
+        for path in state.get("files_modified", []) or []:
+            normalized = _normalize_path(path)
+            if normalized not in seen:
+                seen.add(normalized)
+                files_modified.append(normalized)
+
+    ran = bool(states) and not errors
+    return {
+        "files_modified": files_modified,
+        "tests_passed": ran and all(s.get("tests_passed", False) for s in states.values()),
+        "cto_approved": ran and all(s.get("cto_approved", False) for s in states.values()),
+        "conflicts": detect_file_conflicts(states),
+    }
+
+
+class MultiDomainCoordinator:
+    """
+    Runs a story's domain sub-graphs concurrently with bounded concurrency.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_DOMAIN_CONCURRENCY, checkpointer=None):
+        """
+        Args:
+            max_concurrency: Max domain sub-graphs running at once
+            checkpointer: Optional checkpointer for the domain sub-graphs
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.checkpointer = checkpointer
+
+    def _config(self, parent_run_id: str, domain: str, config: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if self.checkpointer is None:
+            return config
+        # Each domain checkpoints under its own thread
+        config = dict(config or {})
+        configurable = dict(config.get("configurable", {}))
+        configurable["thread_id"] = f"{parent_run_id}:{domain}"
+        config["configurable"] = configurable
+        return config
+
+    def _prepare(self, task: str, domains: Optional[List[str]], parent_run_id: Optional[str]) -> MultiDomainResult:
+        domains = list(dict.fromkeys(domains if domains is not None else analyze_story_domains(task)))
+        return MultiDomainResult(
+            task=task,
+            parent_run_id=parent_run_id or uuid.uuid4().hex,
+            domains=domains
+        )
+
+    def _finish(self, result: MultiDomainResult, started: float) -> MultiDomainResult:
+        merged = merge_domain_states(result.states, result.errors)
+        result.files_modified = merged["files_modified"]
+        result.tests_passed = merged["tests_passed"]
+        result.cto_approved = merged["cto_approved"]
+        result.conflicts = merged["conflicts"]
+        result.duration_seconds = time.perf_counter() - started
+        if result.conflicts:
+            print(f"[DomainCoordinator] File conflicts between domains: {result.conflicts}")
+        return result
+
+    def run(
+        self,
+        task: str,
+        domains: Optional[List[str]] = None,
+        parent_run_id: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None
+    ) -> MultiDomainResult:
+        """
+        Run the domain sub-graphs for a task and merge their results.
+
+        Args:
+            task: Task or story description
+            domains: Domains to run (default: analyze_story_domains(task))
+            parent_run_id: ID of the parent workflow run
+            config: LangGraph run config passed to each sub-graph
+
+        Returns:
+            MultiDomainResult with per-domain states and merged results
+
+        Raises:
+            ValueError: If a domain is not supported (before any sub-graph runs)
+        """
+        started = time.perf_counter()
+        result = self._prepare(task, domains, parent_run_id)
+        if not result.domains:
+            return self._finish(result, started)
+
+        # Compile (or fetch) every sub-graph before starting any of them
+        graphs = {d: route_to_domain(d, checkpointer=self.checkpointer) for d in result.domains}
+
+        def run_domain(domain: str) -> DomainState:
+            domain_started = time.perf_counter()
+            try:
+                state = create_initial_domain_state(domain, result.parent_run_id, task)
+                return graphs[domain].invoke(state, self._config(result.parent_run_id, domain, config))
+            finally:
+                result.durations[domain] = time.perf_counter() - domain_started
+
+        workers = min(self.max_concurrency, len(result.domains))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="domain") as executor:
+            # Each run gets a copy of the caller's context, so its
+            # cancellation scope (and other context) applies in the workers
+            futures = {
+                domain: executor.submit(contextvars.copy_context().run, run_domain, domain)
+                for domain in result.domains
+            }
+            for domain, future in futures.items():
+                try:
+                    result.states[domain] = future.result()
+                except Exception as e:
+                    result.errors[domain] = str(e)
+
+        return self._finish(result, started)
+
+    async def arun(
+        self,
+        task: str,
+        domains: Optional[List[str]] = None,
+        parent_run_id: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None
+    ) -> MultiDomainResult:
+        """Async run(): sub-graphs are awaited with ainvoke() under a semaphore."""
+        started = time.perf_counter()
+        result = self._prepare(task, domains, parent_run_id)
+        if not result.domains:
+            return self._finish(result, started)
+
+        graphs = {d: route_to_domain(d, checkpointer=self.checkpointer) for d in result.domains}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_domain(domain: str) -> None:
+            async with semaphore:
+                domain_started = time.perf_counter()
+                try:
+                    state = create_initial_domain_state(domain, result.parent_run_id, task)
+                    result.states[domain] = await graphs[domain].ainvoke(
+                        state, self._config(result.parent_run_id, domain, config)
+                    )
+                except Exception as e:
+                    result.errors[domain] = str(e)
+                finally:
+                    result.durations[domain] = time.perf_counter() - domain_started
+
+        await asyncio.gather(*(run_domain(d) for d in result.domains))
+        # Keep states in domain order
+        result.states = {d: result.states[d] for d in result.domains if d in result.states}
+        return self._finish(result, started)
+
+
+def run_multi_domain(
+    task: str,
+    domains: Optional[List[str]] = None,
+    max_concurrency: int = DEFAULT_MAX_DOMAIN_CONCURRENCY,
+    checkpointer=None,
+    parent_run_id: Optional[str] = None,
+) -> MultiDomainResult:
+    """
+    Run every domain a task touches concurrently and merge the results.
+
+    Args:
+        task: Task or story description
+        domains: Domains to run (default: detected from task)
+        max_concurrency: Max domain sub-graphs running at once
+        checkpointer: Optional checkpointer for state persistence
+        parent_run_id: ID of the parent workflow run
+
+    Returns:
+        MultiDomainResult
+    """
+    coordinator = MultiDomainCoordinator(max_concurrency, checkpointer=checkpointer)
+    return coordinator.run(task, domains=domains, parent_run_id=parent_run_id)
+
+
+__all__ = [
+    "DEFAULT_MAX_DOMAIN_CONCURRENCY",
+    "MultiDomainResult",
+    "MultiDomainCoordinator",
+    "detect_file_conflicts",
+    "merge_domain_states",
+    "run_multi_domain",
+]
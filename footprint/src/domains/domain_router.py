@@ -6,13 +6,22 @@ Based on Grok's Hierarchical Supervisor Pattern:
 - Analyze story/task to detect which domains are involved
 - Route execution to appropriate domain sub-graphs
 - Coordinate multi-domain tasks
+
+Detection runs one compiled regex per domain (its patterns as named
+groups) over the text, counts weighted hits per domain and ranks domains by
+score. Domains are scanned separately so a word one domain's pattern
+consumes (the "page" of "account page") still counts for another domain.
 """
 
-from typing import List
+import os
 import re
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 from langgraph.graph.state import CompiledStateGraph
 
-from .domain_graph import SUPPORTED_DOMAINS, compile_domain_subgraph
+from .domain_graph import SUPPORTED_DOMAINS
+from .graph_registry import get_domain_graph_registry
 
 
 # Domain keyword patterns for detection
@@ -103,39 +112,233 @@ DOMAIN_PATTERNS = {
 }
 
 
+# Pattern weights (default 1.0): specific technology terms count more than
+# words that show up in stories of every domain
+DOMAIN_PATTERN_WEIGHTS = {
+    r"\boauth\b": 2.0,
+    r"\bjwt\b": 2.0,
+    r"\bsign[- ]?(?:in|up|out)\b": 1.5,
+    r"\bstripe\b": 2.0,
+    r"\bpaypal\b": 2.0,
+    r"\bcheckout\b": 1.5,
+    r"\brefund\b": 1.5,
+    r"\bavatar\b": 1.5,
+    r"\bgraphql\b": 2.0,
+    r"\bwebhook[s]?\b": 1.5,
+    r"\bmigration[s]?\b": 1.5,
+    r"\bprisma\b": 2.0,
+    r"\bsupabase\b": 2.0,
+    r"\bsql\b": 1.5,
+    r"\btoken[s]?\b": 0.5,
+    r"\brole[s]?\b": 0.5,
+    r"\bprice[s]?\b": 0.5,
+    r"\bsettings\b": 0.5,
+    r"\broute[s]?\b": 0.5,
+    r"\brequest[s]?\b": 0.5,
+    r"\bresponse[s]?\b": 0.5,
+    r"\bpage[s]?\b": 0.5,
+    r"\bform[s]?\b": 0.5,
+    r"\bstyle[s]?\b": 0.5,
+    r"\blayout\b": 0.5,
+    r"\bmodel[s]?\b": 0.5,
+    r"\btable[s]?\b": 0.5,
+    r"\bquery\b": 0.5,
+}
+
+
+@dataclass
+class DomainMatch:
+    """A detected domain with its weighted score."""
+    domain: str
+    score: float
+    confidence: float  # Share of the text's total weighted hits (0-1)
+    hits: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "domain": self.domain,
+            "score": round(self.score, 3),
+            "confidence": round(self.confidence, 3),
+            "hits": self.hits,
+        }
+
+
+def _compile_alternation(tagged: List[Tuple[str, str]]) -> "re.Pattern":
+    """
+    Join (group, pattern) pairs into one case-insensitive regex.
+
+    Patterns of the form \\b<letter>... share one leading \\b and are bucketed
+    by that first letter, so at each word start the engine only tries the
+    patterns that can match there instead of every alternative.
+    """
+    buckets: Dict[str, List[str]] = {}
+    others = []
+    for group, pattern in tagged:
+        body = pattern[2:] if pattern.startswith(r"\b") else None
+        if body and body[0].isalpha() and body[1:2] not in ("?", "*", "+", "{"):
+            buckets.setdefault(body[0].lower(), []).append(f"(?P<{group}>{body[1:]})")
+        else:
+            others.append(f"(?P<{group}>{pattern})")
+
+    word_start = [f"{letter}(?:{'|'.join(alts)})" for letter, alts in sorted(buckets.items())]
+    parts = []
+    if word_start:
+        parts.append(r"\b(?:" + "|".join(word_start) + ")")
+    parts.extend(others)
+    return re.compile("|".join(parts) or r"(?!)", re.IGNORECASE)
+
+
+class DomainRouter:
+    """
+    Compiled domain detector.
+
+    Each domain's patterns are joined into one regex of named groups, so a
+    text is scanned once per domain; each match's group name maps back to
+    its weight. A domain is detected exactly when one of its patterns
+    matches (as with re.search per pattern); hits of overlapping patterns
+    within a domain count once.
+    """
+
+    def __init__(
+        self,
+        patterns: Optional[Dict[str, List[str]]] = None,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        self.patterns = patterns or DOMAIN_PATTERNS
+        weights = DOMAIN_PATTERN_WEIGHTS if weights is None else weights
+        self.domains = list(self.patterns)
+
+        self._groups: Dict[str, float] = {}
+        self._regexes: List[Tuple[str, "re.Pattern"]] = []
+        for d, (domain, domain_patterns) in enumerate(self.patterns.items()):
+            tagged = []
+            for p, pattern in enumerate(domain_patterns):
+                group = f"d{d}_{p}"
+                self._groups[group] = weights.get(pattern, 1.0)
+                tagged.append((group, pattern))
+            self._regexes.append((domain, _compile_alternation(tagged)))
+
+    def score(self, text: str) -> Dict[str, Tuple[float, int]]:
+        """Weighted score and hit count per domain with at least one hit."""
+        scores: Dict[str, Tuple[float, int]] = {}
+        if not text:
+            return scores
+        groups = self._groups
+        for domain, regex in self._regexes:
+            total, hits = 0.0, 0
+            for match in regex.finditer(text):
+                total += groups[match.lastgroup]
+                hits += 1
+            if hits:
+                scores[domain] = (total, hits)
+        return scores
+
+    def rank(self, text: str, min_score: float = 0.0) -> List[DomainMatch]:
+        """
+        Domains detected in text, most relevant first.
+
+        Args:
+            text: Task or story text
+            min_score: Drop domains scoring at or below this
+
+        Returns:
+            DomainMatch list sorted by score (ties keep DOMAIN_PATTERNS order)
+        """
+        scores = self.score(text)
+        total = sum(score for score, _ in scores.values()) or 1.0
+        matches = [
+            DomainMatch(domain, score, score / total, hits)
+            for domain, (score, hits) in scores.items()
+            if score > min_score
+        ]
+        order = {domain: i for i, domain in enumerate(self.domains)}
+        matches.sort(key=lambda m: (-m.score, order[m.domain]))
+        return matches
+
+    def route_story(self, story: Dict[str, Any], min_score: float = 0.0) -> List[DomainMatch]:
+        """Rank domains for a story dict (title, description, objective, AC)."""
+        return self.rank(story_text(story), min_score)
+
+    def route_wave(self, wave_dir: str, min_score: float = 0.0) -> Dict[str, List[DomainMatch]]:
+        """
+        Route every story JSON in a wave directory.
+
+        Args:
+            wave_dir: Directory of story files (e.g. stories/wave3)
+            min_score: Drop domains scoring at or below this
+
+        Returns:
+            Dict of story_id (file stem if missing) -> ranked DomainMatch list
+        """
+        routes = {}
+        for name in sorted(os.listdir(wave_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(wave_dir, name)) as f:
+                    story = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"[DomainRouter] Skipping {name}: {e}")
+                continue
+            story_id = story.get("story_id") or story.get("id") or name[:-len(".json")]
+            routes[story_id] = self.route_story(story, min_score)
+        return routes
+
+
+def story_text(story: Dict[str, Any]) -> str:
+    """Routing text for a story: title, description, objective and AC."""
+    parts = [story.get("title", ""), story.get("description", "")]
+    objective = story.get("objective")
+    if isinstance(objective, dict):
+        parts.extend(str(v) for v in objective.values())
+    elif objective:
+        parts.append(str(objective))
+    for criterion in story.get("acceptance_criteria", []) or []:
+        if isinstance(criterion, dict):
+            parts.append(str(criterion.get("description") or criterion.get("title") or ""))
+        else:
+            parts.append(str(criterion))
+    return "\n".join(p for p in parts if p)
+
+
+# Global singleton
+_domain_router: Optional[DomainRouter] = None
+
+
+def get_domain_router() -> DomainRouter:
+    """Get or create global domain router instance"""
+    global _domain_router
+    if _domain_router is None:
+        _domain_router = DomainRouter()
+    return _domain_router
+
+
 def analyze_story_domains(task: str) -> List[str]:
     """
     Analyze a task/story description to detect relevant domains.
 
-    Uses keyword pattern matching to identify which domains
-    are involved in the task.
+    Uses keyword pattern matching (one compiled pass, weighted hit counts)
+    to identify which domains are involved in the task.
 
     Args:
         task: Task or story description text
 
     Returns:
-        List of detected domain names (e.g., ["auth", "payments"])
+        List of detected domain names, most relevant first
+        (e.g., ["payments", "auth"])
     """
     if not task:
         return []
-
-    task_lower = task.lower()
-    detected_domains = []
-
-    for domain, patterns in DOMAIN_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, task_lower, re.IGNORECASE):
-                if domain not in detected_domains:
-                    detected_domains.append(domain)
-                break  # Found match for this domain, move to next
-
-    return detected_domains
+    return [match.domain for match in get_domain_router().rank(task)]
 
 
 def route_to_domain(domain: str, checkpointer=None) -> CompiledStateGraph:
     """
     Get a compiled domain sub-graph for execution.
 
+    Graphs come from the shared registry, so each (domain, checkpointer)
+    pair is compiled once per process.
+
     Args:
         domain: Domain name to route to
         checkpointer: Optional checkpointer for state persistence
@@ -149,12 +352,12 @@ def route_to_domain(domain: str, checkpointer=None) -> CompiledStateGraph:
     if domain not in SUPPORTED_DOMAINS:
         raise ValueError(f"Unsupported domain: {domain}. Must be one of {SUPPORTED_DOMAINS}")
 
-    return compile_domain_subgraph(domain, checkpointer=checkpointer)
+    return get_domain_graph_registry().get(domain, checkpointer=checkpointer)
 
 
 def get_primary_domain(task: str) -> str:
     """
-    Get the primary (first detected) domain for a task.
+    Get the primary (highest scoring) domain for a task.
 
     Args:
         task: Task description
@@ -167,8 +370,13 @@ def get_primary_domain(task: str) -> str:
 
 
 __all__ = [
+    "DomainMatch",
+    "DomainRouter",
+    "get_domain_router",
+    "story_text",
     "analyze_story_domains",
     "route_to_domain",
     "get_primary_domain",
     "DOMAIN_PATTERNS",
+    "DOMAIN_PATTERN_WEIGHTS",
 ]
@@ -0,0 +1,148 @@
+"""
+Domain Graph Registry Module
+Compiled domain sub-graphs built once and shared across stories.
+
+Compiling a domain sub-graph (building the StateGraph, validating it and
+compiling its channels) costs far more than looking one up, and the result
+is immutable: a compiled graph keeps no per-run state outside its
+checkpointer, so one instance can serve every story and thread.
+
+Graphs are keyed by domain and checkpointer identity, since a graph is
+bound to the checkpointer it was compiled with.
+"""
+
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from langgraph.graph.state import CompiledStateGraph
+
+from .domain_graph import SUPPORTED_DOMAINS, compile_domain_subgraph
+
+
+class DomainGraphRegistry:
+    """
+    Thread-safe cache of compiled domain sub-graphs.
+    """
+
+    def __init__(self):
+        # (domain, id(checkpointer)) -> graph. The compiled graph holds a
+        # reference to its checkpointer, so the id cannot be reused while
+        # the entry exists.
+        self._graphs: Dict[Tuple[str, int], CompiledStateGraph] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.compile_seconds = 0.0
+
+    def get(self, domain: str, checkpointer=None) -> CompiledStateGraph:
+        """
+        Get the compiled sub-graph for a domain, compiling it on first use.
+
+        Args:
+            domain: Domain name
+            checkpointer: Optional checkpointer the graph is compiled with
+
+        Returns:
+            Shared compiled domain sub-graph
+
+        Raises:
+            ValueError: If domain is not supported
+        """
+        key = (domain, id(checkpointer))
+        graph = self._graphs.get(key)
+        if graph is not None:
+            self.hits += 1
+            return graph
+
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is None:
+                start = time.perf_counter()
+                graph = compile_domain_subgraph(domain, checkpointer=checkpointer)
+                self.compile_seconds += time.perf_counter() - start
+                self.misses += 1
+                self._graphs[key] = graph
+            else:
+                self.hits += 1
+        return graph
+
+    def warm(self, domains: Optional[List[str]] = None, checkpointer=None) -> float:
+        """
+        Compile sub-graphs ahead of the first story (call at startup).
+
+        Args:
+            domains: Domains to compile (default: all supported)
+            checkpointer: Checkpointer the graphs will be used with
+
+        Returns:
+            Seconds spent compiling
+        """
+        start = time.perf_counter()
+        for domain in domains or SUPPORTED_DOMAINS:
+            self.get(domain, checkpointer=checkpointer)
+        elapsed = time.perf_counter() - start
+        print(f"[DomainGraphs] Warmed {len(domains or SUPPORTED_DOMAINS)} domain graphs in {elapsed * 1000:.1f}ms")
+        return elapsed
+
+    def evict(self, checkpointer=None) -> int:
+        """
+        Drop the graphs compiled with a checkpointer (e.g. when it is closed).
+
+        Returns:
+            Number of graphs dropped
+        """
+        with self._lock:
+            keys = [key for key in self._graphs if key[1] == id(checkpointer)]
+            for key in keys:
+                del self._graphs[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+            self.hits = self.misses = 0
+            self.compile_seconds = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "graphs": len(self._graphs),
+            "hits": self.hits,
+            "misses": self.misses,
+            "compile_ms": round(self.compile_seconds * 1000, 3),
+        }
+
+
+# Global singleton
+_registry: Optional[DomainGraphRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_domain_graph_registry() -> DomainGraphRegistry:
+    """Get or create global domain graph registry instance"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = DomainGraphRegistry()
+    return _registry
+
+
+def warm_domain_graphs(domains: Optional[List[str]] = None, checkpointer=None) -> float:
+    """
+    Compile domain sub-graphs into the global registry at startup.
+
+    Args:
+        domains: Domains to compile (default: all supported)
+        checkpointer: Checkpointer the graphs will be used with
+
+    Returns:
+        Seconds spent compiling
+    """
+    return get_domain_graph_registry().warm(domains, checkpointer=checkpointer)
+
+
+__all__ = [
+    "DomainGraphRegistry",
+    "get_domain_graph_registry",
+    "warm_domain_graphs",
+]
@@ -6,10 +6,16 @@ Based on Grok's Parallel Domain Execution Recommendations
 
 Architecture:
   START → [fe_dev || be_dev] → merge_results → END
+
+fe_dev and be_dev are dispatched with Send() in the same superstep, so they
+run concurrently and a story takes max(fe, be) instead of fe + be. Each
+returns its own result; the operator.add reducer on dev_results collects
+both before merge_results runs.
 """
 
-from typing import Optional
-from langgraph.graph import StateGraph, END
+from typing import List, Optional
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph.state import CompiledStateGraph
 
@@ -27,20 +33,43 @@ if project_root not in sys.path:
 from nodes.dev_agents import fe_dev_node, be_dev_node
 
 
+# Dev node for each assignment in DomainDevState.dev_assignments
+DEV_ASSIGNMENT_NODES = {
+    "frontend": "fe_dev",
+    "backend": "be_dev",
+}
+
+
 def fe_dev_wrapper(state: DomainDevState) -> dict:
-    """Wrapper for fe_dev_node that updates dev_results."""
-    result = fe_dev_node(state)
-    existing_results = list(state.get("dev_results", []))
-    existing_results.append(result)
-    return {"dev_results": existing_results}
+    """Wrapper for fe_dev_node that adds its result to dev_results."""
+    return {"dev_results": [fe_dev_node(state)]}
 
 
 def be_dev_wrapper(state: DomainDevState) -> dict:
-    """Wrapper for be_dev_node that updates dev_results."""
-    result = be_dev_node(state)
-    existing_results = list(state.get("dev_results", []))
-    existing_results.append(result)
-    return {"dev_results": existing_results}
+    """Wrapper for be_dev_node that adds its result to dev_results."""
+    return {"dev_results": [be_dev_node(state)]}
+
+
+def dispatch_dev_assignments(state: DomainDevState) -> List[Send]:
+    """
+    Fan out to one dev node per assignment.
+
+    Args:
+        state: Domain dev state (dev_assignments defaults to both devs)
+
+    Returns:
+        Send per dev node, all run in the same superstep
+    """
+    assignments = state.get("dev_assignments") or list(DEV_ASSIGNMENT_NODES)
+    nodes = []
+    for assignment in assignments:
+        node = DEV_ASSIGNMENT_NODES.get(assignment)
+        if node and node not in nodes:
+            nodes.append(node)
+    if not nodes:
+        # Nothing to develop - merge (empty) results directly
+        return [Send("merge_results", state)]
+    return [Send(node, state) for node in nodes]
 
 
 def create_parallel_dev_graph() -> StateGraph:
@@ -48,13 +77,9 @@ def create_parallel_dev_graph() -> StateGraph:
     Create the parallel dev execution StateGraph.
 
     Graph structure:
-    1. fe_dev: Execute frontend development
-    2. be_dev: Execute backend development (parallel with fe_dev)
-    3. merge_results: Aggregate results from both devs
-
-    Note: True parallelism would use LangGraph's Send() or .map() pattern.
-    This simplified version runs sequentially but structures the graph
-    for parallel semantics.
+    1. dispatch: Send() to fe_dev and/or be_dev per dev_assignments
+    2. fe_dev / be_dev: Execute frontend and backend development concurrently
+    3. merge_results: Aggregate results once both devs have finished
 
     Returns:
         StateGraph configured for parallel dev execution
@@ -67,15 +92,16 @@ def create_parallel_dev_graph() -> StateGraph:
     graph.add_node("be_dev", be_dev_wrapper)
     graph.add_node("merge_results", merge_dev_results)
 
-    # Set entry point - both devs start from entry
-    graph.set_entry_point("fe_dev")
+    # Fan out: both devs start in the same superstep
+    graph.add_conditional_edges(
+        START,
+        dispatch_dev_assignments,
+        ["fe_dev", "be_dev", "merge_results"]
+    )
 
-    # Add edges
-    # fe_dev → be_dev (sequential for simplicity, would be parallel with Send())
-    graph.add_edge("fe_dev", "be_dev")
-    # be_dev → merge_results
+    # Fan in: merge_results runs in the next superstep, after both devs
+    graph.add_edge("fe_dev", "merge_results")
     graph.add_edge("be_dev", "merge_results")
-    # merge_results → END
     graph.add_edge("merge_results", END)
 
     return graph
@@ -102,6 +128,8 @@ def compile_parallel_dev_graph(
 
 
 __all__ = [
+    "DEV_ASSIGNMENT_NODES",
+    "dispatch_dev_assignments",
     "create_parallel_dev_graph",
     "compile_parallel_dev_graph",
 ]
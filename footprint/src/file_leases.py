@@ -0,0 +1,378 @@
+"""
+WAVE File Leases - Redis-backed file locks for parallel dev agents
+
+Agents (or whole stories) take leases on the files they are about to write,
+so two agents never edit the same file at the same time, across processes
+and hosts. Work that does not share files runs in parallel instead of being
+serialized defensively.
+
+Locks are hierarchical, with intent locks on parent directories:
+- write (X) on each file the agent modifies
+- intent (IX) on every ancestor directory of those files
+- a directory can itself be write-leased (e.g. "app/admin" for a story that
+  creates files under it), which conflicts with any lease inside it
+
+Compatibility: IX/IX is compatible; X conflicts with X and IX on the same
+path. So two agents can work in the same directory, but not on the same
+file, and not inside a directory someone holds exclusively.
+
+All paths of a request are acquired atomically (WATCH/MULTI), so there is
+no partial holding and no lock-ordering deadlock. Leases expire after a TTL
+(renew() extends them), so a crashed agent cannot hold files forever.
+
+Usage:
+    leases = get_file_lease_manager()
+    with leases.lease("UA-01", ["app/(app)/account/page.tsx", "lib/auth.ts"]):
+        ...  # edit files
+"""
+
+import os
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Hash per path: holder -> {"mode", "expires"}
+LEASE_KEY = "wave:lease:{path}"
+
+# Set per holder: paths it holds (for release/renew)
+HOLDER_KEY = "wave:lease-holder:{holder}"
+
+# Lease lifetime without renewal
+LEASE_TTL_SECONDS = int(os.getenv("WAVE_FILE_LEASE_TTL", "900"))
+
+WRITE = "X"
+INTENT = "IX"
+
+# Mode compatibility (requested, held)
+_COMPATIBLE = {
+    (INTENT, INTENT): True,
+    (INTENT, WRITE): False,
+    (WRITE, INTENT): False,
+    (WRITE, WRITE): False,
+}
+
+_MAX_RETRIES = 20
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DATA TYPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class LeaseResult:
+    """Outcome of a lease request."""
+    holder: str
+    granted: bool
+    paths: List[str] = field(default_factory=list)
+    # Conflicting path -> holders blocking it
+    conflicts: Dict[str, List[str]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "holder": self.holder,
+            "granted": self.granted,
+            "paths": self.paths,
+            "conflicts": self.conflicts,
+        }
+
+
+class FileLeaseConflict(RuntimeError):
+    """Raised when files are leased by another agent."""
+    def __init__(self, result: LeaseResult):
+        self.result = result
+        blocked = ", ".join(f"{path} ({', '.join(h)})" for path, h in result.conflicts.items())
+        super().__init__(f"Files leased by other agents: {blocked}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HELPER FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def normalize_lease_path(path: str) -> str:
+    """Repo-relative path with forward slashes and no ./ prefix."""
+    path = os.path.normpath(path.strip()).replace(os.sep, "/")
+    path = path[2:] if path.startswith("./") else path
+    return path.rstrip("/")
+
+
+def lease_modes(paths: Iterable[str]) -> Dict[str, str]:
+    """
+    Lock modes needed to write paths: X on each path, IX on its ancestors.
+
+    Args:
+        paths: Files (or directories) to write
+
+    Returns:
+        Dict of path -> mode
+    """
+    modes: Dict[str, str] = {}
+    for path in paths:
+        path = normalize_lease_path(path)
+        if not path or path == ".":
+            continue
+        modes[path] = WRITE
+        parent = os.path.dirname(path)
+        while parent:
+            modes.setdefault(parent, INTENT)
+            parent = os.path.dirname(parent)
+    return modes
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LEASE MANAGER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FileLeaseManager:
+    """
+    Hierarchical file leases in Redis.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, ttl: int = LEASE_TTL_SECONDS):
+        """
+        Args:
+            redis_url: Redis connection URL (default: from env or localhost)
+            ttl: Lease lifetime in seconds without renew()
+        """
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package not installed. Run: pip install redis")
+
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.redis = redis.from_url(self.redis_url, decode_responses=True)
+        self.ttl = ttl
+
+    def _blockers(self, held: Dict[str, str], holder: str, mode: str, now: float) -> List[str]:
+        blockers = []
+        for other, raw in held.items():
+            if other == holder:
+                continue
+            try:
+                lease = json.loads(raw)
+            except ValueError:
+                continue
+            if lease.get("expires", 0) <= now:
+                continue
+            if not _COMPATIBLE[(mode, lease.get("mode", WRITE))]:
+                blockers.append(other)
+        return blockers
+
+    @staticmethod
+    def _own_mode(held: Dict[str, str], holder: str, now: float) -> Optional[str]:
+        raw = held.get(holder)
+        if not raw:
+            return None
+        lease = json.loads(raw)
+        return lease.get("mode") if lease.get("expires", 0) > now else None
+
+    def try_acquire(self, holder: str, paths: Iterable[str], ttl: Optional[int] = None) -> LeaseResult:
+        """
+        Lease paths for writing, all or nothing.
+
+        Args:
+            holder: Lease owner (agent, task or story ID)
+            paths: Files (or directories) to write
+            ttl: Lease lifetime (default: manager TTL)
+
+        Returns:
+            LeaseResult (granted=False with conflicts if any path is held)
+        """
+        ttl = ttl or self.ttl
+        modes = lease_modes(paths)
+        result = LeaseResult(holder=holder, granted=False, paths=sorted(p for p, m in modes.items() if m == WRITE))
+        if not modes:
+            result.granted = True
+            return result
+
+        keys = {path: LEASE_KEY.format(path=path) for path in modes}
+        holder_key = HOLDER_KEY.format(holder=holder)
+        for _ in range(_MAX_RETRIES):
+            with self.redis.pipeline(transaction=True) as pipe:
+                try:
+                    pipe.watch(*keys.values())
+                    now = time.time()
+                    conflicts = {}
+                    granted = dict(modes)
+                    for path, mode in modes.items():
+                        held = pipe.hgetall(keys[path])
+                        blockers = self._blockers(held, holder, mode, now)
+                        if blockers:
+                            conflicts[path] = blockers
+                        elif self._own_mode(held, holder, now) == WRITE:
+                            # Keep an existing write lease (don't downgrade to intent)
+                            granted[path] = WRITE
+                    if conflicts:
+                        pipe.unwatch()
+                        result.conflicts = conflicts
+                        return result
+
+                    expires = now + ttl
+                    pipe.multi()
+                    for path, mode in granted.items():
+                        pipe.hset(keys[path], holder, json.dumps({"mode": mode, "expires": expires}))
+                        pipe.expire(keys[path], ttl)
+                    pipe.sadd(holder_key, *modes)
+                    pipe.expire(holder_key, ttl)
+                    pipe.execute()
+                    result.granted = True
+                    return result
+                except redis.WatchError:
+                    continue
+        print(f"[FileLeases] {holder}: gave up after {_MAX_RETRIES} contended attempts")
+        return result
+
+    def acquire(
+        self,
+        holder: str,
+        paths: Iterable[str],
+        timeout: float = 0.0,
+        poll_interval: float = 0.25,
+        ttl: Optional[int] = None
+    ) -> LeaseResult:
+        """
+        Lease paths, waiting up to timeout for conflicting leases to go.
+
+        Args:
+            holder: Lease owner
+            paths: Files (or directories) to write
+            timeout: Seconds to wait (0 = single attempt)
+            poll_interval: Retry interval while waiting
+            ttl: Lease lifetime
+
+        Returns:
+            LeaseResult
+        """
+        paths = list(paths)
+        deadline = time.time() + timeout
+        while True:
+            result = self.try_acquire(holder, paths, ttl=ttl)
+            if result.granted or time.time() >= deadline:
+                return result
+            time.sleep(poll_interval)
+
+    def release(self, holder: str, paths: Optional[Iterable[str]] = None) -> int:
+        """
+        Release a holder's leases.
+
+        Args:
+            holder: Lease owner
+            paths: Paths to release (default: all the holder's leases,
+                including the intent locks taken for them)
+
+        Returns:
+            Number of lock entries removed
+        """
+        holder_key = HOLDER_KEY.format(holder=holder)
+        if paths is None:
+            held = list(self.redis.smembers(holder_key))
+        else:
+            # Drop the paths, and intent locks no remaining lease needs
+            released = {normalize_lease_path(p) for p in paths}
+            needed = lease_modes(self.held_by(holder) - released)
+            held = [p for p in self.redis.smembers(holder_key) if p not in needed]
+        if not held:
+            return 0
+
+        pipe = self.redis.pipeline(transaction=True)
+        for path in held:
+            pipe.hdel(LEASE_KEY.format(path=path), holder)
+        pipe.srem(holder_key, *held)
+        return sum(pipe.execute()[:-1])
+
+    def renew(self, holder: str, ttl: Optional[int] = None) -> int:
+        """
+        Extend all of a holder's leases (call periodically during long work).
+
+        Returns:
+            Number of lock entries renewed
+        """
+        ttl = ttl or self.ttl
+        holder_key = HOLDER_KEY.format(holder=holder)
+        expires = time.time() + ttl
+        renewed = 0
+        for path in self.redis.smembers(holder_key):
+            key = LEASE_KEY.format(path=path)
+            raw = self.redis.hget(key, holder)
+            if not raw:
+                continue
+            lease = json.loads(raw)
+            lease["expires"] = expires
+            self.redis.hset(key, holder, json.dumps(lease))
+            self.redis.expire(key, ttl)
+            renewed += 1
+        self.redis.expire(holder_key, ttl)
+        return renewed
+
+    def holders(self, path: str) -> Dict[str, str]:
+        """Live leases on a path: holder -> mode."""
+        now = time.time()
+        leases = {}
+        for holder, raw in self.redis.hgetall(LEASE_KEY.format(path=normalize_lease_path(path))).items():
+            lease = json.loads(raw)
+            if lease.get("expires", 0) > now:
+                leases[holder] = lease.get("mode", WRITE)
+        return leases
+
+    def held_by(self, holder: str) -> Set[str]:
+        """Paths a holder has write leases on."""
+        paths = set()
+        for path in self.redis.smembers(HOLDER_KEY.format(holder=holder)):
+            raw = self.redis.hget(LEASE_KEY.format(path=path), holder)
+            if raw and json.loads(raw).get("mode") == WRITE:
+                paths.add(path)
+        return paths
+
+    @contextmanager
+    def lease(self, holder: str, paths: Iterable[str], timeout: float = 0.0) -> Iterator[LeaseResult]:
+        """
+        Hold leases for the duration of a block.
+
+        Raises:
+            FileLeaseConflict: If the paths could not be leased within timeout
+        """
+        paths = list(paths)
+        result = self.acquire(holder, paths, timeout=timeout)
+        if not result.granted:
+            raise FileLeaseConflict(result)
+        try:
+            yield result
+        finally:
+            self.release(holder, paths)
+
+
+# Global singleton
+_lease_manager: Optional[FileLeaseManager] = None
+
+
+def get_file_lease_manager() -> FileLeaseManager:
+    """Get or create global file lease manager instance"""
+    global _lease_manager
+    if _lease_manager is None:
+        _lease_manager = FileLeaseManager()
+    return _lease_manager
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "LEASE_TTL_SECONDS",
+    "LeaseResult",
+    "FileLeaseConflict",
+    "FileLeaseManager",
+    "get_file_lease_manager",
+    "lease_modes",
+    "normalize_lease_path",
+]
@@ -27,6 +27,11 @@ from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 from .tools.grok_client import GrokClient, GrokResponse
+from .safety.usage_events import publish_usage
+from .safety.budget_ledger import BudgetLedger, DEFAULT_MAX_OUTPUT_TOKENS, reserved_call
+from .safety.token_counter import count_tokens
+from .safety.cancellation import cancellation_scope, invoke_cancellable, run_cancellable
+from .context_packer import pack_code, build_query, CONTEXT_BUDGETS
 
 logger = logging.getLogger(__name__)
 
@@ -71,8 +76,10 @@ class MultiLLMClient:
     Provides consistent interface for both Claude and Grok.
     """
 
-    def __init__(self, config: Optional[LLMConfig] = None):
+    def __init__(self, config: Optional[LLMConfig] = None, ledger: Optional[BudgetLedger] = None):
         self.config = config or LLMConfig()
+        # Budget ledger calls are reserved in (default: global ledger if enabled)
+        self.ledger = ledger
 
         # Initialize Claude
         self.claude = ChatAnthropic(
@@ -90,24 +97,34 @@ class MultiLLMClient:
         prompt: str,
         provider: LLMProvider,
         system_prompt: Optional[str] = None,
-        temperature: float = 0.2
+        temperature: float = 0.2,
+        story_id: str = "",
+        domain: str = ""
     ) -> str:
         """
         Send query to specified provider.
 
+        Each call's usage is published as a usage event for budget monitors,
+        and reserved in the budget ledger when it is enabled.
+
         Args:
             prompt: User prompt
             provider: Which LLM to use
             system_prompt: Optional system prompt
             temperature: Response temperature
+            story_id: Story the call is for (usage attribution)
+            domain: Calling node/domain (usage attribution)
 
         Returns:
             Response content
+
+        Raises:
+            BudgetLedgerDenied: If the call would overshoot a ledger limit
         """
         if provider == LLMProvider.CLAUDE:
-            return self._query_claude(prompt, system_prompt, temperature)
+            return self._query_claude(prompt, system_prompt, temperature, story_id, domain)
         elif provider == LLMProvider.GROK:
-            return self._query_grok(prompt, system_prompt, temperature)
+            return self._query_grok(prompt, system_prompt, temperature, story_id, domain)
         else:
             raise ValueError(f"Unknown provider: {provider}")
 
@@ -115,7 +132,9 @@ class MultiLLMClient:
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
-        temperature: float = 0.2
+        temperature: float = 0.2,
+        story_id: str = "",
+        domain: str = ""
     ) -> str:
         """Query Claude."""
         messages = []
@@ -123,28 +142,60 @@ class MultiLLMClient:
             messages.append(SystemMessage(content=system_prompt))
         messages.append(HumanMessage(content=prompt))
 
-        response = self.claude.invoke(messages)
+        model = self.config.dev_model
+        with reserved_call(
+            model,
+            count_tokens(f"{system_prompt or ''}{prompt}", model),
+            getattr(self.claude, "max_tokens", None) or DEFAULT_MAX_OUTPUT_TOKENS,
+            story_id=story_id,
+            provider=LLMProvider.CLAUDE.value,
+            ledger=self.ledger
+        ) as spend:
+            with cancellation_scope(domain, story_id=story_id, domain=domain):
+                response = invoke_cancellable(self.claude, messages)
+            usage_metadata = getattr(response, "usage_metadata", None)
+            usage = publish_usage(story_id, domain, model, usage_metadata)
+            if usage_metadata:
+                spend.settle(usage.cost_usd, usage.tokens)
         return response.content
 
     def _query_grok(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
-        temperature: float = 0.2
+        temperature: float = 0.2,
+        story_id: str = "",
+        domain: str = ""
     ) -> str:
         """Query Grok."""
-        response = self.grok.query(prompt, system_prompt)
-        if response.success:
-            return response.content
-        else:
-            raise Exception(f"Grok error: {response.error}")
+        model = self.config.validation_model
+        input_tokens = count_tokens(f"{system_prompt or ''}{prompt}", model)
+        with reserved_call(
+            model, input_tokens,
+            story_id=story_id,
+            provider=LLMProvider.GROK.value,
+            ledger=self.ledger
+        ) as spend:
+            with cancellation_scope(domain, story_id=story_id, domain=domain):
+                response = run_cancellable(self.grok.query, prompt, system_prompt)
+            if not response.success:
+                raise Exception(f"Grok error: {response.error}")
+            # GrokResponse carries no usage metadata; count locally
+            usage = publish_usage(story_id, domain, model, {
+                "input_tokens": input_tokens,
+                "output_tokens": count_tokens(response.content or "", model),
+            })
+            spend.settle(usage.cost_usd, usage.tokens)
+        return response.content
 
     def query_with_fallback(
         self,
         prompt: str,
         primary: LLMProvider,
         fallback: LLMProvider,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        story_id: str = "",
+        domain: str = ""
     ) -> tuple[str, LLMProvider]:
         """
         Query with fallback on failure.
@@ -153,11 +204,11 @@ class MultiLLMClient:
             Tuple of (response, provider_used)
         """
         try:
-            response = self.query(prompt, primary, system_prompt)
+            response = self.query(prompt, primary, system_prompt, story_id=story_id, domain=domain)
             return response, primary
         except Exception as e:
             logger.warning(f"{primary} failed: {e}, falling back to {fallback}")
-            response = self.query(prompt, fallback, system_prompt)
+            response = self.query(prompt, fallback, system_prompt, story_id=story_id, domain=domain)
             return response, fallback
 
 
@@ -203,13 +254,21 @@ Check for:
 - Safety and security issues
 - Adherence to requirements"""
 
+        code_context = "No code provided"
+        if code:
+            code_context = pack_code(
+                code, build_query(state.get("requirements", ""), state.get("files", [])),
+                CONTEXT_BUDGETS["cto_master"], model=client.config.validation_model,
+                focus_files=state.get("files", [])
+            ).text
+
         prompt = f"""Review this for FINAL MERGE APPROVAL:
 
 Story ID: {story_id}
 QA Status: {"PASSED" if qa_passed else "NOT PASSED"}
 
 Code Summary:
-{code[:2000] if code else "No code provided"}
+{code_context}
 
 Test Results:
 {test_results[:1000] if test_results else "No test results"}
@@ -226,7 +285,9 @@ Be truthful and rigorous."""
             response = client.query(
                 prompt,
                 LLMProvider.GROK,
-                system_prompt
+                system_prompt,
+                story_id=story_id,
+                domain="cto_master"
             )
 
             # Parse decision
@@ -327,7 +388,9 @@ Be strict and truthful. When in doubt, err on the side of caution."""
                 prompt,
                 LLMProvider.GROK,
                 system_prompt,
-                temperature=0.1  # Very low for deterministic scoring
+                temperature=0.1,  # Very low for deterministic scoring
+                story_id=state.get("story_id", ""),
+                domain="constitutional"
             )
 
             # Parse JSON response
@@ -399,6 +462,12 @@ def create_qa_with_fallback_node(client: MultiLLMClient):
             provider = LLMProvider.CLAUDE
             logger.info(f"[QA] Using Claude (attempt {retry_count + 1})")
 
+        model = client.config.dev_model if provider == LLMProvider.CLAUDE else client.config.validation_model
+        packed_code = pack_code(
+            code, build_query(state.get("requirements", ""), state.get("files", [])),
+            CONTEXT_BUDGETS["qa_node"], model=model, focus_files=state.get("files", [])
+        ).text
+
         system_prompt = """You are a QA Engineer reviewing code.
 You must:
 1. Check for bugs and logic errors
@@ -411,7 +480,7 @@ Be thorough and honest. If the code has issues, say so clearly."""
         prompt = f"""Review this code for quality:
 
 ```
-{code[:3000]}
+{packed_code}
 ```
 
 Provide:
@@ -423,7 +492,10 @@ Provide:
 Return structured assessment."""
 
         try:
-            response = client.query(prompt, provider, system_prompt)
+            response = client.query(
+                prompt, provider, system_prompt,
+                story_id=state.get("story_id", ""), domain="qa"
+            )
 
             # Parse verdict
             passed = "PASS" in response.upper() and "FAIL" not in response.upper()
@@ -515,7 +587,10 @@ Provide:
 Be truthful and realistic."""
 
         try:
-            response = client.query(prompt, LLMProvider.GROK, system_prompt)
+            response = client.query(
+                prompt, LLMProvider.GROK, system_prompt,
+                story_id=state.get("story_id", ""), domain="planning"
+            )
 
             # Check feasibility
             feasible = "HIGH" in response.upper() or "MEDIUM" in response.upper()
@@ -12,6 +12,8 @@ from .constitutional import (
     check_action_safety,
     create_constitutional_node,
     ESTOP,
+    CriticalViolationError,
+    StreamingSafetyScanner,
 )
 
 from .budget import (
@@ -22,6 +24,46 @@ from .budget import (
     create_budget_node,
 )
 
+from .budget_forecast import (
+    BudgetForecaster,
+    BudgetForecast,
+    ForecastAction,
+    get_budget_forecaster,
+    simulate_trace,
+)
+
+from .token_counter import (
+    TokenCounter,
+    IncrementalTokenCounter,
+    get_token_counter,
+    count_tokens,
+)
+
+from .pricing import (
+    ModelPricing,
+    UsageCost,
+    MODEL_PRICING,
+    get_model_pricing,
+    usage_cost,
+)
+
+from .usage_events import (
+    UsageEvent,
+    UsageEventPublisher,
+    UsageEventSubscriber,
+    publish_usage,
+    USAGE_EVENTS_STREAM,
+)
+
+from .budget_ledger import (
+    BudgetLedger,
+    BudgetLedgerDenied,
+    LedgerReservation,
+    LedgerScope,
+    get_budget_ledger,
+    reserved_call,
+)
+
 from .emergency_stop import (
     EmergencyStop,
     EmergencyStopError,
@@ -32,6 +74,30 @@ from .emergency_stop import (
     EMERGENCY_STOP_CHANNEL,
 )
 
+from .stop_watcher import (
+    StopFileWatcher,
+    SharedStopFlag,
+)
+
+from .cancellation import (
+    CancellationToken,
+    TaskCancelledError,
+    cancellation_scope,
+    invoke_cancellable,
+    run_cancellable_task,
+)
+
+from .halt_slo import (
+    HaltAckCollector,
+    HaltReport,
+)
+
+from .audit_log import (
+    SafetyEventStore,
+    get_safety_event_store,
+    SAFETY_EVENT_DB,
+)
+
 __all__ = [
     # Constitutional
     "ConstitutionalChecker",
@@ -42,12 +108,44 @@ __all__ = [
     "check_action_safety",
     "create_constitutional_node",
     "ESTOP",
+    "CriticalViolationError",
+    "StreamingSafetyScanner",
     # Budget
     "BudgetTracker",
     "BudgetAlert",
     "BudgetResult",
     "check_budget",
     "create_budget_node",
+    # Budget Forecasting
+    "BudgetForecaster",
+    "BudgetForecast",
+    "ForecastAction",
+    "get_budget_forecaster",
+    "simulate_trace",
+    # Token Counting
+    "TokenCounter",
+    "IncrementalTokenCounter",
+    "get_token_counter",
+    "count_tokens",
+    # Pricing
+    "ModelPricing",
+    "UsageCost",
+    "MODEL_PRICING",
+    "get_model_pricing",
+    "usage_cost",
+    # Usage Events
+    "UsageEvent",
+    "UsageEventPublisher",
+    "UsageEventSubscriber",
+    "publish_usage",
+    "USAGE_EVENTS_STREAM",
+    # Budget Ledger
+    "BudgetLedger",
+    "LedgerReservation",
+    "LedgerScope",
+    "get_budget_ledger",
+    "BudgetLedgerDenied",
+    "reserved_call",
     # Emergency Stop
     "EmergencyStop",
     "EmergencyStopError",
@@ -56,4 +154,17 @@ __all__ = [
     "require_no_emergency_stop",
     "EMERGENCY_STOP_FILE",
     "EMERGENCY_STOP_CHANNEL",
+    "StopFileWatcher",
+    "SharedStopFlag",
+    "CancellationToken",
+    "TaskCancelledError",
+    "cancellation_scope",
+    "invoke_cancellable",
+    "run_cancellable_task",
+    "HaltAckCollector",
+    "HaltReport",
+    # Audit Log
+    "SafetyEventStore",
+    "get_safety_event_store",
+    "SAFETY_EVENT_DB",
 ]
@@ -0,0 +1,507 @@
+"""
+WAVE v2 Safety Audit Log
+
+Append-only store of safety verdicts and emergency stop events.
+
+Records are buffered in memory and written in batches to a SQLite file
+(indexed on story, principle and time); a partial batch is written after
+flush_interval seconds and at exit. Thousands of runs can then be analyzed
+for false-positive rates and check latency without grepping logs.
+
+Usage:
+    store = SafetyEventStore()
+    store.record_verdict(result, story_id="BE-03", file_path="app/api/x/route.ts")
+    store.flush()
+
+    python audit_log.py summary --since 7d
+    python audit_log.py events --story BE-03 --principle P002
+    python audit_log.py label <verdict_id> false_positive
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import atexit
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SAFETY_EVENT_DB = os.getenv(
+    "WAVE_SAFETY_EVENT_DB",
+    ".claude/logs/safety_events.db"
+)
+
+# Flush when this many rows are buffered...
+DEFAULT_BATCH_SIZE = 200
+
+# ...or when the oldest buffered row is this many seconds old
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS safety_events (
+    verdict_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    story_id TEXT,
+    principle_id TEXT,
+    matched_pattern TEXT,
+    severity REAL,
+    score REAL,
+    recommendation TEXT,
+    escalation_level TEXT,
+    tier TEXT,
+    latency_ms REAL,
+    file_path TEXT,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_safety_events_story ON safety_events (story_id, ts);
+CREATE INDEX IF NOT EXISTS idx_safety_events_principle ON safety_events (principle_id, ts);
+CREATE INDEX IF NOT EXISTS idx_safety_events_ts ON safety_events (ts);
+CREATE INDEX IF NOT EXISTS idx_safety_events_verdict ON safety_events (verdict_id);
+
+CREATE TABLE IF NOT EXISTS safety_labels (
+    verdict_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_safety_labels_verdict ON safety_labels (verdict_id);
+"""
+
+_COLUMNS = (
+    "verdict_id", "ts", "kind", "story_id", "principle_id", "matched_pattern",
+    "severity", "score", "recommendation", "escalation_level", "tier",
+    "latency_ms", "file_path", "detail",
+)
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EVENT STORE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SafetyEventStore:
+    """
+    Buffered, append-only SQLite store for safety events.
+
+    One row is written per violation (or one row with no principle for a
+    clean verdict); all rows of a verdict share a verdict_id.
+    """
+
+    def __init__(
+        self,
+        db_path: str = SAFETY_EVENT_DB,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ):
+        """
+        Initialize the event store.
+
+        Args:
+            db_path: SQLite file path (created if missing)
+            batch_size: Rows buffered before a write
+            flush_interval: Max seconds a row stays buffered
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[tuple] = []
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Flushes a partial batch once it is flush_interval old, so a quiet
+        # process still writes its last verdicts without another append
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            parent = os.path.dirname(self.db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # WRITE METHODS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def record_verdict(
+        self,
+        result: Any,
+        story_id: str = "",
+        file_path: Optional[str] = None,
+        tier: Optional[str] = None,
+        latency_ms: Optional[float] = None
+    ) -> str:
+        """
+        Buffer a SafetyResult.
+
+        Args:
+            result: SafetyResult (tier/latency_ms are read from it if present)
+            story_id: Story the check ran for
+            file_path: File context used for the check
+            tier: Override for the tier that decided the verdict
+            latency_ms: Override for the check latency
+
+        Returns:
+            verdict_id shared by all rows of this verdict
+        """
+        verdict_id = uuid.uuid4().hex
+        ts = time.time()
+        tier = tier or getattr(result, "tier", None)
+        if latency_ms is None:
+            latency_ms = getattr(result, "latency_ms", None)
+
+        common = dict(
+            verdict_id=verdict_id,
+            ts=ts,
+            kind="verdict",
+            story_id=story_id or None,
+            score=result.score,
+            recommendation=result.recommendation,
+            escalation_level=_enum_value(result.escalation_level),
+            tier=tier,
+            latency_ms=latency_ms,
+            file_path=file_path,
+        )
+
+        violations = result.violations or [None]
+        rows = []
+        for violation in violations:
+            row = dict(common)
+            if violation is not None:
+                row.update(
+                    principle_id=violation.principle_id,
+                    matched_pattern=violation.matched_pattern,
+                    severity=violation.severity,
+                )
+            rows.append(row)
+
+        self._append(rows)
+        return verdict_id
+
+    def record_estop(
+        self,
+        reason: str,
+        source: str,
+        action: str = "trigger",
+        story_id: str = ""
+    ) -> str:
+        """
+        Buffer an emergency stop event.
+
+        Args:
+            reason: Why the stop was triggered or cleared
+            source: What triggered it (file, redis, api, safety)
+            action: "trigger" or "clear"
+            story_id: Story in progress, if known
+
+        Returns:
+            Event id
+        """
+        event_id = uuid.uuid4().hex
+        self._append([dict(
+            verdict_id=event_id,
+            ts=time.time(),
+            kind=f"estop_{action}",
+            story_id=story_id or None,
+            tier=source,
+            detail=reason,
+        )])
+        # E-stops are rare and important - never leave them buffered
+        self.flush()
+        return event_id
+
+    def label(self, verdict_id: str, label: str) -> None:
+        """
+        Attach a review label (e.g. "false_positive", "true_positive").
+
+        Labels are appended; the latest label for a verdict wins.
+        """
+        self.flush()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO safety_labels (verdict_id, label, ts) VALUES (?, ?, ?)",
+                (verdict_id, label, time.time())
+            )
+            conn.commit()
+
+    def _append(self, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            if self._oldest is None:
+                self._oldest = time.time()
+            self._buffer.extend(tuple(row.get(c) for c in _COLUMNS) for row in rows)
+            if self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+            due = (
+                len(self._buffer) >= self.batch_size
+                or time.time() - self._oldest >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            if self._timer is threading.current_thread():
+                self._timer = None
+        self.flush()
+
+    def flush(self) -> int:
+        """
+        Write buffered rows in one transaction.
+
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            if not self._buffer:
+                return 0
+            rows, self._buffer, self._oldest = self._buffer, [], None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            try:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        f"INSERT INTO safety_events ({', '.join(_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                        rows
+                    )
+            except sqlite3.Error as e:
+                print(f"[SafetyAudit] Failed to write {len(rows)} events: {e}", file=sys.stderr)
+                return 0
+        return len(rows)
+
+    def close(self) -> None:
+        """Flush and close the database."""
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # QUERY METHODS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def query_events(
+        self,
+        story_id: Optional[str] = None,
+        principle_id: Optional[str] = None,
+        since: Optional[float] = None,
+        kind: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Return recent events, newest first, filtered on indexed columns."""
+        self.flush()
+        clauses, params = [], []
+        for column, value in (("story_id", story_id), ("principle_id", principle_id), ("kind", kind)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM safety_events {where} "
+                f"ORDER BY ts DESC LIMIT ?",
+                (*params, limit)
+            )
+            return [dict(zip(_COLUMNS, row)) for row in cursor.fetchall()]
+
+    def summary(self, since: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Aggregate verdict counts, per-principle false-positive rates and
+        per-tier latency percentiles.
+        """
+        self.flush()
+        since_clause = "AND e.ts >= ?" if since is not None else ""
+        params = (since,) if since is not None else ()
+
+        with self._lock:
+            conn = self._connect()
+            verdicts = conn.execute(
+                f"SELECT recommendation, COUNT(DISTINCT verdict_id) FROM safety_events e "
+                f"WHERE kind = 'verdict' {since_clause} GROUP BY recommendation",
+                params
+            ).fetchall()
+
+            principles = conn.execute(
+                f"""
+                SELECT e.principle_id,
+                       COUNT(DISTINCT e.verdict_id),
+                       COUNT(DISTINCT CASE WHEN l.label = 'false_positive' THEN e.verdict_id END),
+                       COUNT(DISTINCT l.verdict_id)
+                FROM safety_events e
+                LEFT JOIN (
+                    SELECT verdict_id, label FROM safety_labels s
+                    WHERE ts = (SELECT MAX(ts) FROM safety_labels WHERE verdict_id = s.verdict_id)
+                ) l ON l.verdict_id = e.verdict_id
+                WHERE e.kind = 'verdict' AND e.principle_id IS NOT NULL {since_clause}
+                GROUP BY e.principle_id
+                ORDER BY e.principle_id
+                """,
+                params
+            ).fetchall()
+
+            latency_rows = conn.execute(
+                f"SELECT tier, verdict_id, MAX(latency_ms) FROM safety_events e "
+                f"WHERE kind = 'verdict' AND latency_ms IS NOT NULL {since_clause} "
+                f"GROUP BY verdict_id",
+                params
+            ).fetchall()
+
+            estops = conn.execute(
+                f"SELECT COUNT(*) FROM safety_events e WHERE kind = 'estop_trigger' {since_clause}",
+                params
+            ).fetchone()[0]
+
+        by_tier: Dict[str, List[float]] = {}
+        for tier, _, latency in latency_rows:
+            by_tier.setdefault(tier or "unknown", []).append(latency)
+
+        return {
+            "verdicts": {rec or "unknown": count for rec, count in verdicts},
+            "principles": {
+                pid: {
+                    "violations": total,
+                    "labeled": labeled,
+                    "false_positives": fps,
+                    "false_positive_rate": (fps / labeled) if labeled else None,
+                }
+                for pid, total, fps, labeled in principles
+            },
+            "latency_ms": {
+                tier: _percentiles(values) for tier, values in sorted(by_tier.items())
+            },
+            "estop_triggers": estops,
+        }
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GLOBAL STORE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_event_store: Optional[SafetyEventStore] = None
+
+
+def get_safety_event_store() -> SafetyEventStore:
+    """Get or create the global safety event store."""
+    global _event_store
+    if _event_store is None:
+        _event_store = SafetyEventStore()
+    return _event_store
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# QUERY CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _parse_since(value: Optional[str]) -> Optional[float]:
+    """Parse '30m', '12h', '7d' or an ISO timestamp into epoch seconds."""
+    if not value:
+        return None
+    units = {"m": 60, "h": 3600, "d": 86400}
+    if value[-1] in units and value[:-1].isdigit():
+        return time.time() - int(value[:-1]) * units[value[-1]]
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WAVE Safety Audit Log")
+    parser.add_argument("--db", default=SAFETY_EVENT_DB, help="Event database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    summary_cmd = sub.add_parser("summary", help="Verdict counts, FP rates, latency percentiles")
+    summary_cmd.add_argument("--since", help="Window, e.g. 24h, 7d or ISO timestamp")
+
+    events_cmd = sub.add_parser("events", help="List recent events")
+    events_cmd.add_argument("--story", help="Filter by story ID")
+    events_cmd.add_argument("--principle", help="Filter by principle ID (e.g. P002)")
+    events_cmd.add_argument("--kind", help="verdict, estop_trigger or estop_clear")
+    events_cmd.add_argument("--since", help="Window, e.g. 24h, 7d or ISO timestamp")
+    events_cmd.add_argument("--limit", type=int, default=50)
+
+    label_cmd = sub.add_parser("label", help="Label a verdict for FP analysis")
+    label_cmd.add_argument("verdict_id")
+    label_cmd.add_argument("label", choices=["false_positive", "true_positive"])
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"No safety event database at {args.db}")
+        sys.exit(1)
+
+    store = SafetyEventStore(db_path=args.db)
+
+    if args.command == "summary":
+        print(json.dumps(store.summary(_parse_since(args.since)), indent=2))
+    elif args.command == "events":
+        events = store.query_events(
+            story_id=args.story,
+            principle_id=args.principle,
+            since=_parse_since(args.since),
+            kind=args.kind,
+            limit=args.limit
+        )
+        for event in events:
+            event["ts"] = datetime.fromtimestamp(event["ts"]).isoformat()
+        print(json.dumps(events, indent=2))
+    elif args.command == "label":
+        store.label(args.verdict_id, args.label)
+        print(f"Labeled {args.verdict_id} as {args.label}")
+
+    store.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "SAFETY_EVENT_DB",
+    "SafetyEventStore",
+    "get_safety_event_store",
+]
+
+
+if __name__ == "__main__":
+    main()
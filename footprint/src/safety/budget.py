@@ -21,6 +21,10 @@ try:
 except ImportError:
     from graph import WAVEState, EscalationLevel
 
+from .token_counter import count_tokens
+from .pricing import get_model_pricing, usage_cost, UsageCost
+from .budget_forecast import BudgetForecaster, ForecastAction
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # BUDGET TYPES
@@ -73,14 +77,6 @@ class BudgetTracker:
     - Hard limit enforcement
     """
 
-    # Cost per 1K tokens (approximate)
-    COST_PER_1K_TOKENS = {
-        "claude-3-sonnet": 0.003,
-        "claude-3-opus": 0.015,
-        "grok-3": 0.005,
-        "default": 0.005,
-    }
-
     def __init__(
         self,
         warning_threshold: float = 0.75,
@@ -100,35 +96,34 @@ class BudgetTracker:
         self.hard_limit = hard_limit
         self._alerts: list[BudgetAlert] = []
 
-    def estimate_tokens(self, text: str) -> int:
+    def estimate_tokens(self, text: str, model: str = "default") -> int:
         """
-        Estimate token count for text.
+        Count tokens for text with the model's tokenizer.
 
         Args:
-            text: Text to estimate
+            text: Text to count
+            model: Model name (selects the tokenizer)
 
         Returns:
-            Estimated token count
+            Token count (cached by content hash)
         """
-        # Rough estimate: ~4 characters per token
-        return len(text) // 4
+        return count_tokens(text, model)
 
     def estimate_cost(self, tokens: int, model: str = "default") -> float:
         """
-        Estimate cost for token usage.
+        Estimate cost for token usage when the input/output split is unknown.
+
+        Prices every token at the model's input rate; use record_usage()
+        when the provider's usage metadata is available.
 
         Args:
             tokens: Number of tokens
-            model: Model name
+            model: Model ID (see pricing.MODEL_PRICING)
 
         Returns:
             Estimated cost in USD
         """
-        cost_per_1k = self.COST_PER_1K_TOKENS.get(
-            model,
-            self.COST_PER_1K_TOKENS["default"]
-        )
-        return (tokens / 1000) * cost_per_1k
+        return get_model_pricing(model).cost(input_tokens=tokens)
 
     def check_budget(
         self,
@@ -205,33 +200,86 @@ class BudgetTracker:
         new_tokens: int,
         token_limit: int,
         model: str = "default",
-        story_id: str = ""
+        story_id: str = "",
+        current_cost: Optional[float] = None,
+        cost_limit_usd: float = 10.0
     ) -> tuple[int, float, BudgetResult]:
         """
         Track new token usage and check budget.
 
+        Only the new tokens are priced at `model`'s rate; earlier usage keeps
+        the cost it was recorded at.
+
         Args:
             current_tokens: Current token count
             new_tokens: New tokens to add
             token_limit: Maximum allowed tokens
-            model: Model for cost estimation
+            model: Model the new tokens were used with
             story_id: Story identifier
+            current_cost: Cost recorded so far (estimated from current_tokens
+                at `model`'s rate if not given)
+            cost_limit_usd: Maximum allowed cost
 
         Returns:
             Tuple of (new_total, cost, budget_result)
         """
+        if current_cost is None:
+            current_cost = self.estimate_cost(current_tokens, model)
+
         new_total = current_tokens + new_tokens
-        cost = self.estimate_cost(new_total, model)
+        cost = current_cost + self.estimate_cost(new_tokens, model)
 
         result = self.check_budget(
             tokens_used=new_total,
             token_limit=token_limit,
             cost_usd=cost,
+            cost_limit_usd=cost_limit_usd,
             story_id=story_id
         )
 
         return new_total, cost, result
 
+    def record_usage(
+        self,
+        usage_metadata: Optional[dict],
+        model: str,
+        current_tokens: int,
+        current_cost: float,
+        token_limit: int,
+        cost_limit_usd: float = 10.0,
+        story_id: str = ""
+    ) -> tuple[int, float, BudgetResult, UsageCost]:
+        """
+        Record one LLM call from the provider's usage metadata and check budget.
+
+        Cache reads and writes are priced at their own rates.
+
+        Args:
+            usage_metadata: response.usage_metadata (or raw provider usage)
+            model: Exact model ID the call was made with
+            current_tokens: Tokens recorded so far
+            current_cost: Cost recorded so far
+            token_limit: Maximum allowed tokens
+            cost_limit_usd: Maximum allowed cost
+            story_id: Story identifier
+
+        Returns:
+            Tuple of (new_total, new_cost, budget_result, usage)
+        """
+        usage = usage_cost(model, usage_metadata)
+        new_total = current_tokens + usage.total_tokens
+        new_cost = current_cost + usage.cost_usd
+
+        result = self.check_budget(
+            tokens_used=new_total,
+            token_limit=token_limit,
+            cost_usd=new_cost,
+            cost_limit_usd=cost_limit_usd,
+            story_id=story_id
+        )
+
+        return new_total, new_cost, result, usage
+
     def get_alerts(self, level: Optional[BudgetAlertLevel] = None) -> list[BudgetAlert]:
         """Get all alerts, optionally filtered by level."""
         if level:
@@ -270,13 +318,17 @@ def check_budget(
 
 
 def create_budget_node(
-    tracker: Optional[BudgetTracker] = None
+    tracker: Optional[BudgetTracker] = None,
+    forecaster: Optional[BudgetForecaster] = None
 ) -> Callable[[WAVEState], dict]:
     """
     Create a budget checking node for the WAVE graph.
 
     Args:
         tracker: Optional pre-configured tracker
+        forecaster: Optional forecaster; adds budget["forecast"], switches
+            budget["model"] to the next cheaper tier on DOWNGRADE/THROTTLE
+            and escalates to WARNING when spend is projected to hit the limit
 
     Returns:
         Node function for the graph
@@ -312,12 +364,37 @@ def create_budget_node(
         else:
             escalation = safety.get("escalation_level", EscalationLevel.NONE.value)
 
+        forecast = {}
+        if forecaster:
+            story_id = state.get("story_id", "")
+            domain = state.get("domain", "")
+            forecaster.observe_totals(story_id, domain, tokens_used, cost_usd)
+            projection = forecaster.forecast(
+                tokens_used=tokens_used,
+                token_limit=token_limit,
+                cost_usd=cost_usd,
+                cost_limit_usd=cost_limit_usd,
+                story_id=story_id or None,
+                model=budget.get("model"),
+                domain=domain or None
+            )
+            forecast = {"forecast": projection.to_dict()}
+            if projection.recommended_model and projection.recommended_model != budget.get("model"):
+                # Agents dispatched from here on use the cheaper tier
+                forecast["model"] = projection.recommended_model
+                print(f"[Budget] {story_id}: projected {projection.projected_percentage:.0%}, "
+                      f"downgrading {budget.get('model')} -> {projection.recommended_model}")
+            if (projection.action in (ForecastAction.THROTTLE, ForecastAction.HALT)
+                    and escalation == EscalationLevel.NONE.value):
+                escalation = EscalationLevel.WARNING.value
+
         return {
             "budget": {
                 **budget,
                 "percentage": result.percentage,
                 "remaining_tokens": result.remaining_tokens,
                 "remaining_cost": result.remaining_cost,
+                **forecast,
             },
             "safety": {
                 **safety,
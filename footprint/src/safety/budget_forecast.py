@@ -0,0 +1,613 @@
+"""
+WAVE v2 Budget Forecasting
+
+BudgetTracker.check_budget reacts once 75/90/100% is crossed, by which time
+in-flight parallel calls have already overshot. BudgetForecaster projects
+spend from the recent burn rate (per story and per domain) plus the expected
+tokens of queued tasks, and recommends downgrading the model tier or
+throttling dispatch before the limit is reached.
+
+Usage:
+    forecaster = get_budget_forecaster()
+    forecaster.record(story_id, "fe", tokens, cost_usd, model)
+
+    forecast = forecaster.forecast(tokens_used, token_limit, cost_usd,
+                                   cost_limit_usd, queued=pending_tasks)
+    if forecast.action == ForecastAction.THROTTLE:
+        dispatch(pending_tasks[:forecast.dispatch_allowance])
+
+Offline tuning (JSONL trace of UsageSample records):
+    python -m src.safety.budget_forecast trace.jsonl --token-limit 500000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import deque, defaultdict
+from dataclasses import dataclass, field, asdict
+from enum import Enum
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .pricing import get_model_pricing
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Burn rate window and how far ahead in-flight work is projected
+DEFAULT_WINDOW_SECONDS = 300
+DEFAULT_HORIZON_SECONDS = 120
+
+# Projected fraction of budget that triggers each action
+DEFAULT_DOWNGRADE_AT = 0.85
+DEFAULT_THROTTLE_AT = 1.0
+
+# Expected tokens per task before any task of that domain has completed
+DEFAULT_TASK_TOKENS = {
+    "pm": 4_000,
+    "cto": 6_000,
+    "fe": 12_000,
+    "be": 12_000,
+    "qa": 8_000,
+    "default": 8_000,
+}
+
+# Next cheaper tier for each model
+MODEL_DOWNGRADES = {
+    "claude-opus-4-5-20250514": "claude-sonnet-4-20250514",
+    "claude-opus-4-20250514": "claude-sonnet-4-20250514",
+    "claude-3-opus-20240229": "claude-3-5-sonnet-20241022",
+    "claude-sonnet-4-20250514": "claude-3-5-haiku-20241022",
+    "claude-3-5-sonnet-20241022": "claude-3-5-haiku-20241022",
+}
+
+# Rates over shorter spans than this are too noisy to extrapolate
+_MIN_RATE_SPAN_SECONDS = 10.0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FORECAST TYPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ForecastAction(str, Enum):
+    """Recommended dispatch action, in increasing severity."""
+    PROCEED = "proceed"      # Projection under downgrade threshold
+    DOWNGRADE = "downgrade"  # Use the next cheaper model tier
+    THROTTLE = "throttle"    # Dispatch only dispatch_allowance queued tasks
+    HALT = "halt"            # Budget already exhausted
+
+
+@dataclass
+class UsageSample:
+    """One recorded LLM call (also the trace record format)."""
+    timestamp: float
+    tokens: int
+    cost_usd: float = 0.0
+    story_id: str = ""
+    domain: str = ""
+    model: str = ""
+
+
+@dataclass
+class BudgetForecast:
+    """Projected spend and the recommended action."""
+    action: ForecastAction
+    projected_tokens: int
+    projected_cost_usd: float
+    projected_percentage: float
+    token_rate: float  # tokens/second over the window
+    queued_tokens: int
+    dispatch_allowance: int  # Queued tasks that fit under the throttle threshold
+    seconds_to_limit: Optional[float] = None
+    recommended_model: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["action"] = self.action.value
+        return data
+
+
+def downgrade_model(model: Optional[str]) -> Optional[str]:
+    """Next cheaper model tier, or None if there is none."""
+    return MODEL_DOWNGRADES.get(model or "")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BUDGET FORECASTER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class BudgetForecaster:
+    """
+    Projects budget spend from recent burn rate and queued work.
+
+    Keeps a sliding window of usage samples, bucketed globally, per story and
+    per domain, plus a running average of tokens per completed task by domain.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        horizon_seconds: float = DEFAULT_HORIZON_SECONDS,
+        downgrade_at: float = DEFAULT_DOWNGRADE_AT,
+        throttle_at: float = DEFAULT_THROTTLE_AT
+    ):
+        """
+        Initialize forecaster.
+
+        Args:
+            window_seconds: Window for burn-rate measurement
+            horizon_seconds: How far ahead the burn rate is extrapolated
+                (roughly the duration of an in-flight call)
+            downgrade_at: Projected fraction that recommends a cheaper model
+            throttle_at: Projected fraction that throttles dispatch
+        """
+        self.window_seconds = window_seconds
+        self.horizon_seconds = horizon_seconds
+        self.downgrade_at = downgrade_at
+        self.throttle_at = throttle_at
+
+        self._samples: Dict[Tuple[str, str], Deque[UsageSample]] = defaultdict(deque)
+        self._task_tokens: Dict[str, Tuple[int, int]] = {}  # domain -> (count, total)
+        self._observed: Dict[str, Tuple[int, float]] = {}  # story -> last totals
+        self._lock = threading.Lock()
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # RECORDING
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def record(
+        self,
+        story_id: str,
+        domain: str,
+        tokens: int,
+        cost_usd: float = 0.0,
+        model: str = "",
+        timestamp: Optional[float] = None
+    ) -> None:
+        """Record one LLM call."""
+        self.record_sample(UsageSample(
+            timestamp=timestamp if timestamp is not None else time.time(),
+            tokens=tokens,
+            cost_usd=cost_usd,
+            story_id=story_id,
+            domain=domain,
+            model=model
+        ))
+
+    def record_sample(self, sample: UsageSample) -> None:
+        """Record a UsageSample (used when replaying traces)."""
+        keys = [("all", "")]
+        if sample.story_id:
+            keys.append(("story", sample.story_id))
+        if sample.domain:
+            keys.append(("domain", sample.domain))
+        if sample.story_id and sample.domain:
+            keys.append(("story-domain", f"{sample.story_id}:{sample.domain}"))
+
+        with self._lock:
+            for key in keys:
+                window = self._samples[key]
+                window.append(sample)
+                self._evict(window, sample.timestamp)
+
+    def record_task(self, domain: str, tokens: int) -> None:
+        """Record tokens used by a completed task (feeds queued-task estimates)."""
+        with self._lock:
+            count, total = self._task_tokens.get(domain, (0, 0))
+            self._task_tokens[domain] = (count + 1, total + tokens)
+
+    def observe_totals(
+        self,
+        story_id: str,
+        domain: str,
+        tokens_used: int,
+        cost_usd: float,
+        timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Record the delta since the last observed cumulative totals, for
+        callers (like the budget node) that only see running totals. The
+        first observation of a story only sets the baseline.
+        """
+        with self._lock:
+            last = self._observed.get(story_id)
+            self._observed[story_id] = (tokens_used, cost_usd)
+        if last is None:
+            return
+        last_tokens, last_cost = last
+        delta = tokens_used - last_tokens
+        if delta > 0:
+            self.record(story_id, domain, delta, max(0.0, cost_usd - last_cost), timestamp=timestamp)
+
+    def _evict(self, window: Deque[UsageSample], now: float) -> None:
+        cutoff = now - self.window_seconds
+        while window and window[0].timestamp < cutoff:
+            window.popleft()
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # RATES AND ESTIMATES
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def burn_rate(
+        self,
+        story_id: Optional[str] = None,
+        domain: Optional[str] = None,
+        now: Optional[float] = None
+    ) -> Tuple[float, float]:
+        """
+        Tokens/second and USD/second over the window.
+
+        Args:
+            story_id: Restrict to one story
+            domain: Restrict to one domain (of story_id, if given)
+            now: Reference time (default: current time)
+
+        Returns:
+            Tuple of (token_rate, cost_rate)
+        """
+        if story_id and domain:
+            key = ("story-domain", f"{story_id}:{domain}")
+        elif story_id:
+            key = ("story", story_id)
+        elif domain:
+            key = ("domain", domain)
+        else:
+            key = ("all", "")
+
+        now = now if now is not None else time.time()
+        with self._lock:
+            window = self._samples.get(key)
+            if not window:
+                return 0.0, 0.0
+            self._evict(window, now)
+            if not window:
+                return 0.0, 0.0
+            tokens = sum(s.tokens for s in window)
+            cost = sum(s.cost_usd for s in window)
+            first = window[0].timestamp
+
+        span = max(now - first, _MIN_RATE_SPAN_SECONDS)
+        return tokens / span, cost / span
+
+    def expected_task_tokens(self, domain: str) -> int:
+        """Average tokens per completed task for a domain, or the default."""
+        count, total = self._task_tokens.get(domain, (0, 0))
+        if count:
+            return total // count
+        return DEFAULT_TASK_TOKENS.get(domain, DEFAULT_TASK_TOKENS["default"])
+
+    def _queued_estimate(self, task: Any) -> Tuple[int, str]:
+        """(expected tokens, model) for an AgentTask or task dict."""
+        if isinstance(task, dict):
+            domain = task.get("domain", "")
+            payload = task.get("payload", {}) or {}
+        else:
+            domain = getattr(task, "domain", "")
+            payload = getattr(task, "payload", {}) or {}
+        expected = payload.get("expected_tokens") or self.expected_task_tokens(domain)
+        return int(expected), payload.get("model", "")
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # FORECAST
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def forecast(
+        self,
+        tokens_used: int,
+        token_limit: int,
+        cost_usd: float = 0.0,
+        cost_limit_usd: float = 10.0,
+        queued: Optional[Iterable[Any]] = None,
+        story_id: Optional[str] = None,
+        model: Optional[str] = None,
+        now: Optional[float] = None,
+        domain: Optional[str] = None
+    ) -> BudgetForecast:
+        """
+        Project spend and recommend an action.
+
+        Projection = used + burn rate * horizon (in-flight work) + expected
+        tokens of queued tasks. Queued cost uses the task's model pricing
+        (payload["model"]) or the recent cost per token.
+
+        Args:
+            tokens_used: Tokens used so far
+            token_limit: Maximum allowed tokens
+            cost_usd: Cost incurred so far
+            cost_limit_usd: Maximum allowed cost
+            queued: Pending AgentTasks (or dicts with domain/payload), in
+                dispatch order
+            story_id: Use this story's burn rate instead of the global one
+            model: Model about to be used (for recommended_model)
+            now: Reference time (default: current time)
+            domain: Use this domain's burn rate (within story_id, if given)
+
+        Returns:
+            BudgetForecast
+        """
+        token_rate, cost_rate = self.burn_rate(story_id=story_id, domain=domain, now=now)
+        cost_per_token = (cost_rate / token_rate) if token_rate else (
+            get_model_pricing(model).input / 1_000_000
+        )
+
+        in_flight_tokens = token_rate * self.horizon_seconds
+        in_flight_cost = cost_rate * self.horizon_seconds
+
+        token_cap = token_limit * self.throttle_at if token_limit > 0 else float("inf")
+        cost_cap = cost_limit_usd * self.throttle_at if cost_limit_usd > 0 else float("inf")
+
+        queued_tokens = 0
+        queued_cost = 0.0
+        dispatch_allowance = 0
+        fits = True
+        for task in queued or []:
+            expected, task_model = self._queued_estimate(task)
+            task_cost = (
+                get_model_pricing(task_model).input * expected / 1_000_000
+                if task_model else expected * cost_per_token
+            )
+            queued_tokens += expected
+            queued_cost += task_cost
+            if fits and (
+                tokens_used + in_flight_tokens + queued_tokens <= token_cap
+                and cost_usd + in_flight_cost + queued_cost <= cost_cap
+            ):
+                dispatch_allowance += 1
+            else:
+                fits = False
+
+        projected_tokens = int(tokens_used + in_flight_tokens + queued_tokens)
+        projected_cost = cost_usd + in_flight_cost + queued_cost
+        percentage = max(
+            projected_tokens / token_limit if token_limit > 0 else 0,
+            projected_cost / cost_limit_usd if cost_limit_usd > 0 else 0
+        )
+        current = max(
+            tokens_used / token_limit if token_limit > 0 else 0,
+            cost_usd / cost_limit_usd if cost_limit_usd > 0 else 0
+        )
+
+        seconds_to_limit = None
+        if token_rate > 0 and token_limit > 0:
+            seconds_to_limit = max(0.0, (token_limit - tokens_used) / token_rate)
+        if cost_rate > 0 and cost_limit_usd > 0:
+            cost_seconds = max(0.0, (cost_limit_usd - cost_usd) / cost_rate)
+            seconds_to_limit = min(seconds_to_limit, cost_seconds) if seconds_to_limit is not None else cost_seconds
+
+        if current >= 1.0:
+            action = ForecastAction.HALT
+        elif percentage >= self.throttle_at:
+            action = ForecastAction.THROTTLE
+        elif percentage >= self.downgrade_at:
+            action = ForecastAction.DOWNGRADE
+        else:
+            action = ForecastAction.PROCEED
+
+        recommended_model = model
+        if action in (ForecastAction.DOWNGRADE, ForecastAction.THROTTLE):
+            recommended_model = downgrade_model(model) or model
+
+        return BudgetForecast(
+            action=action,
+            projected_tokens=projected_tokens,
+            projected_cost_usd=projected_cost,
+            projected_percentage=percentage,
+            token_rate=token_rate,
+            queued_tokens=queued_tokens,
+            dispatch_allowance=dispatch_allowance,
+            seconds_to_limit=seconds_to_limit,
+            recommended_model=recommended_model
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TRACE SIMULATOR
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class SimulationResult:
+    """Outcome of replaying a usage trace with and without forecasting."""
+    samples: int
+    baseline_tokens: int
+    baseline_cost_usd: float
+    baseline_limit_crossed_at: Optional[float]
+    tokens: int
+    cost_usd: float
+    deferred_samples: int
+    deferred_tokens: int
+    downgraded_samples: int
+    first_downgrade_at: Optional[float] = None
+    first_throttle_at: Optional[float] = None
+    actions: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def lead_time_seconds(self) -> Optional[float]:
+        """How long before the unthrottled run crossed the limit throttling began."""
+        if self.baseline_limit_crossed_at is None or self.first_throttle_at is None:
+            return None
+        return self.baseline_limit_crossed_at - self.first_throttle_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["lead_time_seconds"] = self.lead_time_seconds
+        return data
+
+
+def load_usage_trace(path: str) -> List[UsageSample]:
+    """Load a JSONL trace of UsageSample records, sorted by timestamp."""
+    samples = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                samples.append(UsageSample(**json.loads(line)))
+    samples.sort(key=lambda s: s.timestamp)
+    return samples
+
+
+def simulate_trace(
+    samples: List[UsageSample],
+    token_limit: int,
+    cost_limit_usd: float = 10.0,
+    forecaster: Optional[BudgetForecaster] = None
+) -> SimulationResult:
+    """
+    Replay a usage trace through a forecaster.
+
+    Before each sample the forecaster is consulted as if the call were about
+    to be dispatched: THROTTLE/HALT defer the call (it is dropped from the
+    run), DOWNGRADE re-prices it at the next cheaper tier. The same trace is
+    also summed unthrottled to find when the limit would have been crossed.
+
+    Args:
+        samples: Trace sorted by timestamp
+        token_limit: Token budget
+        cost_limit_usd: Cost budget
+        forecaster: Forecaster to tune (default: BudgetForecaster())
+
+    Returns:
+        SimulationResult
+    """
+    forecaster = forecaster or BudgetForecaster()
+
+    baseline_tokens = 0
+    baseline_cost = 0.0
+    crossed_at = None
+    for sample in samples:
+        baseline_tokens += sample.tokens
+        baseline_cost += sample.cost_usd
+        if crossed_at is None and (
+            baseline_tokens >= token_limit or baseline_cost >= cost_limit_usd
+        ):
+            crossed_at = sample.timestamp
+
+    result = SimulationResult(
+        samples=len(samples),
+        baseline_tokens=baseline_tokens,
+        baseline_cost_usd=baseline_cost,
+        baseline_limit_crossed_at=crossed_at,
+        tokens=0,
+        cost_usd=0.0,
+        deferred_samples=0,
+        deferred_tokens=0,
+        downgraded_samples=0
+    )
+    actions: Dict[str, int] = defaultdict(int)
+
+    for sample in samples:
+        forecast = forecaster.forecast(
+            tokens_used=result.tokens,
+            token_limit=token_limit,
+            cost_usd=result.cost_usd,
+            cost_limit_usd=cost_limit_usd,
+            model=sample.model or None,
+            now=sample.timestamp
+        )
+        actions[forecast.action.value] += 1
+
+        if forecast.action in (ForecastAction.THROTTLE, ForecastAction.HALT):
+            if result.first_throttle_at is None:
+                result.first_throttle_at = sample.timestamp
+            result.deferred_samples += 1
+            result.deferred_tokens += sample.tokens
+            continue
+
+        cost = sample.cost_usd
+        if forecast.action == ForecastAction.DOWNGRADE:
+            if result.first_downgrade_at is None:
+                result.first_downgrade_at = sample.timestamp
+            cheaper = downgrade_model(sample.model)
+            if cheaper:
+                ratio = get_model_pricing(cheaper).input / get_model_pricing(sample.model).input
+                cost *= ratio
+                result.downgraded_samples += 1
+
+        result.tokens += sample.tokens
+        result.cost_usd += cost
+        forecaster.record_sample(UsageSample(
+            timestamp=sample.timestamp,
+            tokens=sample.tokens,
+            cost_usd=cost,
+            story_id=sample.story_id,
+            domain=sample.domain,
+            model=sample.model
+        ))
+
+    result.actions = dict(actions)
+    return result
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HELPER FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Global singleton
+_budget_forecaster: Optional[BudgetForecaster] = None
+
+
+def get_budget_forecaster() -> BudgetForecaster:
+    """Get or create global budget forecaster instance"""
+    global _budget_forecaster
+    if _budget_forecaster is None:
+        _budget_forecaster = BudgetForecaster()
+    return _budget_forecaster
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description="WAVE Budget Forecast Simulator")
+    parser.add_argument("trace", help="JSONL usage trace (UsageSample records)")
+    parser.add_argument("--token-limit", type=int, required=True)
+    parser.add_argument("--cost-limit", type=float, default=10.0)
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW_SECONDS)
+    parser.add_argument("--horizon", type=float, default=DEFAULT_HORIZON_SECONDS)
+    parser.add_argument("--downgrade-at", type=float, default=DEFAULT_DOWNGRADE_AT)
+    parser.add_argument("--throttle-at", type=float, default=DEFAULT_THROTTLE_AT)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.trace):
+        print(f"No trace at {args.trace}")
+        sys.exit(1)
+
+    forecaster = BudgetForecaster(
+        window_seconds=args.window,
+        horizon_seconds=args.horizon,
+        downgrade_at=args.downgrade_at,
+        throttle_at=args.throttle_at
+    )
+    result = simulate_trace(
+        load_usage_trace(args.trace),
+        token_limit=args.token_limit,
+        cost_limit_usd=args.cost_limit,
+        forecaster=forecaster
+    )
+    print(json.dumps(result.to_dict(), indent=2))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "ForecastAction",
+    "UsageSample",
+    "BudgetForecast",
+    "BudgetForecaster",
+    "SimulationResult",
+    "MODEL_DOWNGRADES",
+    "downgrade_model",
+    "get_budget_forecaster",
+    "load_usage_trace",
+    "simulate_trace",
+]
+
+
+if __name__ == "__main__":
+    main()
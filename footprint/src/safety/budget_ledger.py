@@ -0,0 +1,478 @@
+"""
+WAVE v2 Distributed Budget Ledger
+
+Redis-backed spend ledger shared by every agent and workflow.
+
+BudgetTracker only sees the budget numbers in one graph's state. The ledger
+keeps global buckets (per story, wave, day and provider) and uses a
+reserve-then-commit pattern so parallel agents can't overshoot a limit:
+
+    ledger = get_budget_ledger()
+    reservation = ledger.reserve(0.12, 8000, story_id="BE-03", wave=3, provider="claude")
+    if not reservation.granted:
+        return defer_task(reservation.denied_reason)
+    try:
+        response = llm.invoke(messages)
+        ledger.commit(reservation, actual_cost_usd, actual_tokens)
+    except Exception:
+        ledger.release(reservation)
+        raise
+
+Limit checks and reservations run in one Lua script, so the check and the
+increment are atomic across workers.
+
+MultiLLMClient and the dev agents reserve through reserved_call() when
+WAVE_BUDGET_LEDGER=1.
+"""
+
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Any
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from .pricing import usage_cost
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+LEDGER_KEY_PREFIX = "wave:budget"
+LEDGER_RESERVATIONS_KEY = f"{LEDGER_KEY_PREFIX}:reservations"
+
+# Unreleased reservations are reaped after this many seconds
+DEFAULT_RESERVATION_TTL = 300
+
+# Reserve every LLM call made through reserved_call() in the ledger
+LEDGER_ENABLED = os.getenv("WAVE_BUDGET_LEDGER", "").lower() in ("1", "true", "yes")
+
+# Output tokens reserved when a caller does not know its max_tokens
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+
+# Day buckets are kept this long for reporting
+DAY_BUCKET_TTL = 3 * 86400
+
+
+class LedgerScope(str, Enum):
+    """Budget bucket scopes."""
+    STORY = "story"
+    WAVE = "wave"
+    DAY = "day"
+    PROVIDER = "provider"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LUA SCRIPTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# KEYS: bucket keys..., reservation key, reservations zset
+# ARGV: bucket count, cost, tokens, reservation id, expires_at, day ttl
+#
+# The reservation hash has no TTL: it is deleted when the reservation is
+# settled or reaped, so the reaper can always read the amounts to give back.
+_RESERVE_SCRIPT = """
+local n = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local tokens = tonumber(ARGV[3])
+for i = 1, n do
+    local b = redis.call('HMGET', KEYS[i], 'spent_usd', 'reserved_usd', 'limit_usd',
+                         'spent_tokens', 'reserved_tokens', 'limit_tokens')
+    local limit_usd = tonumber(b[3])
+    if limit_usd and tonumber(b[1] or 0) + tonumber(b[2] or 0) + cost > limit_usd then
+        return {0, KEYS[i], 'usd'}
+    end
+    local limit_tokens = tonumber(b[6])
+    if limit_tokens and tonumber(b[4] or 0) + tonumber(b[5] or 0) + tokens > limit_tokens then
+        return {0, KEYS[i], 'tokens'}
+    end
+end
+local buckets = {}
+for i = 1, n do
+    redis.call('HINCRBYFLOAT', KEYS[i], 'reserved_usd', cost)
+    redis.call('HINCRBY', KEYS[i], 'reserved_tokens', tokens)
+    if string.find(KEYS[i], ':day:', 1, true) then
+        redis.call('EXPIRE', KEYS[i], ARGV[6])
+    end
+    buckets[i] = KEYS[i]
+end
+redis.call('HSET', KEYS[n + 1], 'buckets', table.concat(buckets, ','), 'cost', cost, 'tokens', tokens)
+redis.call('ZADD', KEYS[n + 2], ARGV[5], ARGV[4])
+return {1}
+"""
+
+# KEYS: bucket keys..., reservation key, reservations zset
+# ARGV: bucket count, reservation id, actual cost, actual tokens
+# Releases the reservation (if still held) and books the actual spend.
+_SETTLE_SCRIPT = """
+local n = tonumber(ARGV[1])
+local held = redis.call('HMGET', KEYS[n + 1], 'cost', 'tokens')
+local released = 0
+if held[1] then
+    for i = 1, n do
+        redis.call('HINCRBYFLOAT', KEYS[i], 'reserved_usd', -tonumber(held[1]))
+        redis.call('HINCRBY', KEYS[i], 'reserved_tokens', -tonumber(held[2]))
+    end
+    redis.call('DEL', KEYS[n + 1])
+    released = 1
+end
+redis.call('ZREM', KEYS[n + 2], ARGV[2])
+local cost = tonumber(ARGV[3])
+local tokens = tonumber(ARGV[4])
+if cost > 0 or tokens > 0 then
+    for i = 1, n do
+        redis.call('HINCRBYFLOAT', KEYS[i], 'spent_usd', cost)
+        redis.call('HINCRBY', KEYS[i], 'spent_tokens', tokens)
+    end
+end
+return released
+"""
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DATA TYPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class LedgerReservation:
+    """A held budget reservation."""
+    reservation_id: str
+    buckets: List[str]
+    cost_usd: float
+    tokens: int
+    granted: bool
+    denied_bucket: Optional[str] = None
+    denied_reason: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+
+class BudgetLedgerDenied(RuntimeError):
+    """Raised when a call's reservation would overshoot a ledger bucket."""
+    def __init__(self, reservation: LedgerReservation):
+        self.reservation = reservation
+        super().__init__(f"Budget ledger denied call: {reservation.denied_reason}")
+
+
+@dataclass
+class LedgerCall:
+    """Reservation held around one LLM call by reserved_call()."""
+    reservation: Optional[LedgerReservation] = None
+    cost_usd: Optional[float] = None
+    tokens: Optional[int] = None
+
+    def settle(self, cost_usd: float, tokens: int) -> None:
+        """Record the call's actual spend (committed when the block exits)."""
+        self.cost_usd = cost_usd
+        self.tokens = int(tokens)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BUDGET LEDGER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class BudgetLedger:
+    """
+    Global budget ledger for concurrent WAVE agents.
+
+    Each bucket is a Redis hash with spent_usd, reserved_usd, spent_tokens,
+    reserved_tokens and optional limit_usd / limit_tokens fields.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        reservation_ttl: int = DEFAULT_RESERVATION_TTL
+    ):
+        """
+        Initialize budget ledger.
+
+        Args:
+            redis_url: Redis connection URL (default: from env or localhost)
+            reservation_ttl: Seconds before an unsettled reservation is reaped
+        """
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package not installed. Run: pip install redis")
+
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.redis = redis.from_url(self.redis_url, decode_responses=True)
+        self.reservation_ttl = reservation_ttl
+        self._reserve = self.redis.register_script(_RESERVE_SCRIPT)
+        self._settle = self.redis.register_script(_SETTLE_SCRIPT)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # BUCKETS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def bucket_key(scope: LedgerScope, bucket_id: Any) -> str:
+        """Redis key for a bucket."""
+        return f"{LEDGER_KEY_PREFIX}:{LedgerScope(scope).value}:{bucket_id}"
+
+    def buckets_for(
+        self,
+        story_id: Optional[str] = None,
+        wave: Optional[Any] = None,
+        provider: Optional[str] = None,
+        day: Optional[str] = None
+    ) -> List[str]:
+        """
+        Bucket keys a call is charged to.
+
+        The day bucket (UTC date) is always included.
+        """
+        day = day or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        keys = [self.bucket_key(LedgerScope.DAY, day)]
+        if story_id:
+            keys.append(self.bucket_key(LedgerScope.STORY, story_id))
+        if wave is not None and wave != "":
+            keys.append(self.bucket_key(LedgerScope.WAVE, wave))
+        if provider:
+            keys.append(self.bucket_key(LedgerScope.PROVIDER, getattr(provider, "value", provider)))
+        return keys
+
+    def set_limit(
+        self,
+        scope: LedgerScope,
+        bucket_id: Any,
+        cost_usd: Optional[float] = None,
+        tokens: Optional[int] = None
+    ) -> None:
+        """Set (or clear with None) the cost and token limits of a bucket."""
+        key = self.bucket_key(scope, bucket_id)
+        for field_name, value in (("limit_usd", cost_usd), ("limit_tokens", tokens)):
+            if value is None:
+                self.redis.hdel(key, field_name)
+            else:
+                self.redis.hset(key, field_name, value)
+
+    def get_bucket(self, scope: LedgerScope, bucket_id: Any) -> Dict[str, float]:
+        """Current spent/reserved/limit values of a bucket."""
+        data = self.redis.hgetall(self.bucket_key(scope, bucket_id))
+        return {k: float(v) for k, v in data.items()}
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # RESERVE / COMMIT
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def reserve(
+        self,
+        cost_usd: float,
+        tokens: int,
+        story_id: Optional[str] = None,
+        wave: Optional[Any] = None,
+        provider: Optional[str] = None
+    ) -> LedgerReservation:
+        """
+        Reserve estimated spend in every applicable bucket before an LLM call.
+
+        Either all buckets are charged or none is.
+
+        Returns:
+            LedgerReservation (granted=False names the bucket that would overshoot)
+        """
+        self.release_expired()
+
+        reservation_id = uuid.uuid4().hex
+        buckets = self.buckets_for(story_id, wave, provider)
+        reply = self._reserve(
+            keys=[*buckets, self._reservation_key(reservation_id), LEDGER_RESERVATIONS_KEY],
+            args=[
+                len(buckets), cost_usd, int(tokens), reservation_id,
+                time.time() + self.reservation_ttl, DAY_BUCKET_TTL,
+            ]
+        )
+
+        granted = int(reply[0]) == 1
+        return LedgerReservation(
+            reservation_id=reservation_id,
+            buckets=buckets,
+            cost_usd=cost_usd,
+            tokens=int(tokens),
+            granted=granted,
+            denied_bucket=None if granted else reply[1],
+            denied_reason=None if granted else f"{reply[1]} would exceed its {reply[2]} limit",
+        )
+
+    def commit(
+        self,
+        reservation: LedgerReservation,
+        actual_cost_usd: float,
+        actual_tokens: int
+    ) -> None:
+        """Release the reservation and book the actual spend."""
+        self._settle_reservation(reservation, actual_cost_usd, actual_tokens)
+
+    def release(self, reservation: LedgerReservation) -> None:
+        """Release a reservation without spend (call failed or was cancelled)."""
+        self._settle_reservation(reservation, 0.0, 0)
+
+    def record_usage(
+        self,
+        cost_usd: float,
+        tokens: int,
+        story_id: Optional[str] = None,
+        wave: Optional[Any] = None,
+        provider: Optional[str] = None
+    ) -> None:
+        """Book spend that was not reserved up front."""
+        pipe = self.redis.pipeline()
+        for key in self.buckets_for(story_id, wave, provider):
+            pipe.hincrbyfloat(key, "spent_usd", cost_usd)
+            pipe.hincrby(key, "spent_tokens", int(tokens))
+            if ":day:" in key:
+                # Same retention as reserve()
+                pipe.expire(key, DAY_BUCKET_TTL)
+        pipe.execute()
+
+    def release_expired(self, limit: int = 100) -> int:
+        """
+        Reap reservations whose holder never committed or released.
+
+        Returns:
+            Number of reservations released
+        """
+        expired = self.redis.zrangebyscore(
+            LEDGER_RESERVATIONS_KEY, 0, time.time(), start=0, num=limit
+        )
+        released = 0
+        for reservation_id in expired:
+            key = self._reservation_key(reservation_id)
+            buckets = self.redis.hget(key, "buckets")
+            if not buckets:
+                self.redis.zrem(LEDGER_RESERVATIONS_KEY, reservation_id)
+                continue
+            released += int(self._settle(
+                keys=[*buckets.split(","), key, LEDGER_RESERVATIONS_KEY],
+                args=[len(buckets.split(",")), reservation_id, 0, 0]
+            ))
+        return released
+
+    def _settle_reservation(
+        self,
+        reservation: LedgerReservation,
+        cost_usd: float,
+        tokens: int
+    ) -> None:
+        if not reservation.granted:
+            return
+        self._settle(
+            keys=[
+                *reservation.buckets,
+                self._reservation_key(reservation.reservation_id),
+                LEDGER_RESERVATIONS_KEY,
+            ],
+            args=[len(reservation.buckets), reservation.reservation_id, cost_usd, int(tokens)]
+        )
+
+    @staticmethod
+    def _reservation_key(reservation_id: str) -> str:
+        return f"{LEDGER_KEY_PREFIX}:reservation:{reservation_id}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HELPER FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Global singleton
+_budget_ledger: Optional[BudgetLedger] = None
+
+
+def get_budget_ledger() -> BudgetLedger:
+    """Get or create global budget ledger instance"""
+    global _budget_ledger
+    if _budget_ledger is None:
+        _budget_ledger = BudgetLedger()
+    return _budget_ledger
+
+
+@contextmanager
+def reserved_call(
+    model: str,
+    input_tokens: int,
+    max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+    story_id: Optional[str] = None,
+    wave: Optional[Any] = None,
+    provider: Optional[str] = None,
+    ledger: Optional[BudgetLedger] = None
+) -> Iterator[LedgerCall]:
+    """
+    Reserve an LLM call's worst-case spend, then commit what it really cost.
+
+    The reservation is released if the block raises, and committed with the
+    amounts passed to LedgerCall.settle() (or the reserved worst case if the
+    call reported no usage). Without a ledger (WAVE_BUDGET_LEDGER unset) the
+    block runs unreserved; a Redis outage also fails open.
+
+    Args:
+        model: Model ID the call is made with
+        input_tokens: Prompt tokens
+        max_output_tokens: The call's max_tokens
+        story_id: Story bucket
+        wave: Wave bucket
+        provider: Provider bucket
+        ledger: Ledger to use (default: global ledger if enabled)
+
+    Raises:
+        BudgetLedgerDenied: If the reservation would overshoot a bucket limit
+    """
+    if ledger is None and LEDGER_ENABLED:
+        ledger = get_budget_ledger()
+
+    call = LedgerCall()
+    if ledger is not None:
+        estimate = usage_cost(model, {"input_tokens": input_tokens, "output_tokens": max_output_tokens})
+        try:
+            call.reservation = ledger.reserve(
+                estimate.cost_usd, estimate.total_tokens,
+                story_id=story_id, wave=wave, provider=provider
+            )
+        except redis.RedisError as e:
+            print(f"[BudgetLedger] Reservation skipped, Redis unavailable: {e}")
+        if call.reservation is not None and not call.reservation.granted:
+            raise BudgetLedgerDenied(call.reservation)
+
+    try:
+        yield call
+    except BaseException:
+        if call.reservation is not None:
+            try:
+                ledger.release(call.reservation)
+            except redis.RedisError as e:
+                print(f"[BudgetLedger] Release failed (reaped after TTL): {e}")
+        raise
+
+    if call.reservation is not None:
+        reservation = call.reservation
+        try:
+            if call.cost_usd is None:
+                ledger.commit(reservation, reservation.cost_usd, reservation.tokens)
+            else:
+                ledger.commit(reservation, call.cost_usd, call.tokens)
+        except redis.RedisError as e:
+            print(f"[BudgetLedger] Commit failed (reaped after TTL): {e}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "LedgerScope",
+    "LedgerReservation",
+    "LedgerCall",
+    "BudgetLedger",
+    "BudgetLedgerDenied",
+    "get_budget_ledger",
+    "reserved_call",
+    "DEFAULT_RESERVATION_TTL",
+    "LEDGER_ENABLED",
+]
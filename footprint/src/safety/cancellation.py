@@ -0,0 +1,379 @@
+"""
+WAVE v2 Cooperative Cancellation
+
+Links emergency stop to in-flight work so a halt stops spend within a
+second instead of when the current LLM call returns:
+
+- CancellationToken: set once, with a reason; callbacks fire on cancel
+- cancellation_scope(): a token for one unit of work (a task, a graph
+  node), made current for the thread/context and cancelled by
+  EmergencyStop callbacks
+- invoke_cancellable(): runs an LLM call that is aborted when the current
+  token is cancelled. LangChain models are driven through ainvoke() on a
+  background event loop, so cancelling closes the HTTP request; other
+  callables run on a helper thread and their late result is discarded.
+- run_cancellable_task(): worker-side wrapper that releases the task's
+  queue lease instead of submitting a partial result
+
+TaskCancelledError derives from BaseException (like
+asyncio.CancelledError), so the `except Exception` error handling in agents
+and nodes does not turn a halt into a "failed" result or a provider
+fallback.
+
+Usage:
+    with cancellation_scope(task.task_id):
+        response = invoke_cancellable(self.llm, messages)
+"""
+
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Set
+
+from .emergency_stop import EmergencyStop
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXCEPTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TaskCancelledError(BaseException):
+    """Raised inside cancelled work. Partial results must be discarded."""
+    def __init__(self, reason: str = "Cancelled"):
+        self.reason = reason
+        super().__init__(reason)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TOKEN
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class CancellationToken:
+    """
+    One-shot cancellation signal shared by the work it covers.
+    """
+
+    def __init__(self, name: str = "", scopes: FrozenSet[str] = frozenset()):
+        self.name = name
+        self.scopes = scopes
+        self.reason = ""
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "Cancelled") -> None:
+        """Cancel (idempotent) and run callbacks."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback(reason)
+            except Exception:
+                pass
+
+    def add_callback(self, callback: Callable[[str], None]) -> Callable[[], None]:
+        """
+        Call callback(reason) on cancel (immediately if already cancelled).
+
+        Returns:
+            Function that removes the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback(self.reason)
+        return lambda: None
+
+    def _remove_callback(self, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise TaskCancelledError(self.reason)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled or timeout. Returns True if cancelled."""
+        return self._event.wait(timeout)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCOPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_current_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar(
+    "wave_cancellation_token", default=None
+)
+
+# Tokens of work in progress in this process
+_active_tokens: Set[CancellationToken] = set()
+_active_lock = threading.Lock()
+_estop_hooked = False
+
+
+def current_token() -> Optional[CancellationToken]:
+    """Token of the innermost cancellation_scope, if any."""
+    return _current_token.get()
+
+
+def cancel_all(reason: str = "Emergency stop") -> int:
+    """
+    Cancel all work in progress in this process (EmergencyStop callback).
+
+    Returns:
+        Number of tokens cancelled
+    """
+    with _active_lock:
+        tokens = list(_active_tokens)
+    for token in tokens:
+        token.cancel(reason)
+    return len(tokens)
+
+
+def cancel_scope(scope: str, reason: str = "Scoped emergency stop") -> int:
+    """
+    Cancel work covered by a scoped stop (EmergencyStop scope callback).
+
+    Returns:
+        Number of tokens cancelled
+    """
+    with _active_lock:
+        tokens = [t for t in _active_tokens if scope in t.scopes]
+    for token in tokens:
+        token.cancel(reason)
+    return len(tokens)
+
+
+def _hook_emergency_stop() -> None:
+    global _estop_hooked
+    with _active_lock:
+        if _estop_hooked:
+            return
+        _estop_hooked = True
+    EmergencyStop.register_callback(cancel_all)
+    EmergencyStop.register_scope_callback(cancel_scope)
+
+
+@contextmanager
+def cancellation_scope(
+    name: str = "",
+    story_id: Optional[str] = None,
+    domain: Optional[str] = None,
+    wave: Optional[Any] = None
+) -> Iterator[CancellationToken]:
+    """
+    Run a unit of work under a token that an emergency stop cancels.
+
+    Scopes nest: cancelling the enclosing scope's token cancels this one.
+    Passing story_id/domain/wave also cancels it on a scoped stop covering
+    that work.
+
+    Args:
+        name: Label (task ID, node name) for logs
+        story_id: Story the work is for
+        domain: Agent domain
+        wave: Wave number
+
+    Yields:
+        The token (also current_token() inside the scope)
+    """
+    _hook_emergency_stop()
+    token = CancellationToken(name, EmergencyStop.context_scopes(story_id, domain, wave))
+    parent = current_token()
+    unlink = parent.add_callback(token.cancel) if parent is not None else None
+    with _active_lock:
+        _active_tokens.add(token)
+    reset = _current_token.set(token)
+    try:
+        if EmergencyStop._active:
+            token.cancel(EmergencyStop._reason or "Emergency stop")
+        elif not EmergencyStop._active_scopes.isdisjoint(token.scopes):
+            scope = next(iter(EmergencyStop._active_scopes & token.scopes))
+            token.cancel(EmergencyStop._scopes.get(scope) or "Scoped emergency stop")
+        yield token
+    finally:
+        _current_token.reset(reset)
+        with _active_lock:
+            _active_tokens.discard(token)
+        if unlink is not None:
+            unlink()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CANCELLABLE CALLS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def run_cancellable(
+    func: Callable[..., Any],
+    *args: Any,
+    token: Optional[CancellationToken] = None,
+    **kwargs: Any
+) -> Any:
+    """
+    Run a blocking call, returning early with TaskCancelledError on cancel.
+
+    The call itself keeps running on its helper thread until it returns;
+    its result is discarded.
+    """
+    token = token or current_token()
+    if token is None:
+        return func(*args, **kwargs)
+    token.raise_if_cancelled()
+
+    done = threading.Event()
+    outcome: Dict[str, Any] = {}
+
+    def target():
+        try:
+            outcome["result"] = func(*args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    remove = token.add_callback(lambda reason: done.set())
+    try:
+        threading.Thread(target=target, name=f"cancellable-{token.name}", daemon=True).start()
+        done.wait()
+    finally:
+        remove()
+
+    token.raise_if_cancelled()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+# Event loop for ainvoke() calls. One long-lived loop, because async HTTP
+# clients cached on the model are bound to the loop that created them.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="cancellable-llm", daemon=True).start()
+        return _loop
+
+
+def invoke_cancellable(
+    llm: Any,
+    messages: Any,
+    token: Optional[CancellationToken] = None,
+    **kwargs: Any
+) -> Any:
+    """
+    llm.invoke(messages) that is aborted when the token is cancelled.
+
+    On emergency stop (which cancels the tokens of open cancellation scopes)
+    the call is abandoned mid-response: LangChain models have their HTTP
+    request closed, other callables finish on a helper thread, and any
+    partial output is discarded - the caller gets TaskCancelledError, never
+    a truncated response.
+
+    Args:
+        llm: LangChain chat model (or anything with invoke())
+        messages: Messages for invoke()
+        token: Token (default: current_token(); plain invoke() if none)
+
+    Raises:
+        TaskCancelledError: Cancelled before or during the call
+    """
+    token = token or current_token()
+    if token is None:
+        return llm.invoke(messages, **kwargs)
+    if not hasattr(llm, "ainvoke"):
+        return run_cancellable(llm.invoke, messages, token=token, **kwargs)
+    token.raise_if_cancelled()
+
+    future = asyncio.run_coroutine_threadsafe(llm.ainvoke(messages, **kwargs), _background_loop())
+    done = threading.Event()
+    future.add_done_callback(lambda f: done.set())
+    remove = token.add_callback(lambda reason: done.set())
+    try:
+        done.wait()
+    finally:
+        remove()
+
+    if token.cancelled:
+        # Cancels the request task on the loop, closing the HTTP connection
+        future.cancel()
+        raise TaskCancelledError(token.reason)
+    return future.result()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# WORKER INTEGRATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def run_cancellable_task(
+    task: Any,
+    handler: Callable[[Any], Dict[str, Any]],
+    queue: Any = None,
+    domain_queue: Any = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Run a worker's task handler under a cancellation scope.
+
+    On cancellation - TaskCancelledError, or a handler that caught it and
+    returned status "cancelled" - the partial result is dropped and the task
+    is put back on its queue (TaskQueue.release) for another worker after
+    resume.
+
+    Args:
+        task: AgentTask
+        handler: process_task
+        queue: TaskQueue holding the task's lease
+        domain_queue: DomainQueue the task came from
+
+    Returns:
+        Handler result, or None if cancelled
+    """
+    with cancellation_scope(
+        getattr(task, "task_id", ""),
+        story_id=getattr(task, "story_id", None),
+        domain=getattr(task, "domain", None)
+    ) as token:
+        try:
+            result = handler(task)
+            if not token.cancelled and (result or {}).get("status") != "cancelled":
+                return result
+            reason = token.reason or (result or {}).get("error", "Cancelled")
+        except TaskCancelledError as e:
+            reason = e.reason
+
+    if queue is not None and domain_queue is not None:
+        queue.release(domain_queue, task, reason=reason)
+    print(f"[Cancellation] Task {token.name} cancelled: {reason}")
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "TaskCancelledError",
+    "CancellationToken",
+    "cancellation_scope",
+    "current_token",
+    "cancel_all",
+    "cancel_scope",
+    "run_cancellable",
+    "invoke_cancellable",
+    "run_cancellable_task",
+]
@@ -7,10 +7,15 @@ Uses Grok for truthful, strict safety assessment.
 
 import os
 import re
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Dict, Iterable, Iterator
 
 # Import state types
 import sys
@@ -23,6 +28,12 @@ try:
 except ImportError:
     from graph import WAVEState, EscalationLevel
 
+try:
+    from .audit_log import SafetyEventStore, get_safety_event_store
+except ImportError:
+    SafetyEventStore = None
+    get_safety_event_store = None
+
 # Try to import Grok client
 try:
     from src.multi_llm import MultiLLMClient, LLMProvider
@@ -88,6 +99,34 @@ SERVER_SIDE_SAFE_PATTERNS = [
 ]
 
 
+# P002 patterns that are skipped for server-side code
+SERVER_SIDE_SKIP_PATTERNS = {
+    r"API_KEY",
+    r"SECRET",
+    r"PASSWORD",
+    r"PRIVATE_KEY",
+    r"AWS_ACCESS",
+    r"credentials",
+    r"token\s*=",
+}
+
+
+# Both pattern lists are compiled once into a single alternation so each
+# path or content blob is classified in one regex pass.
+_SERVER_SIDE_FILE_RE = re.compile(
+    "|".join(f"(?:{p})" for p in SERVER_SIDE_FILE_PATTERNS)
+)
+
+# Max distinct paths kept in the per-path verdict cache
+SERVER_SIDE_FILE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=SERVER_SIDE_FILE_CACHE_SIZE)
+def _classify_server_side_path(normalized: str) -> bool:
+    """Cached single-pass verdict for a normalized path."""
+    return _SERVER_SIDE_FILE_RE.search(normalized) is not None
+
+
 def is_server_side_file(file_path: str) -> bool:
     """
     Check if a file path indicates server-side code.
@@ -102,13 +141,27 @@ def is_server_side_file(file_path: str) -> bool:
         return False
 
     # Normalize path separators
-    normalized = file_path.replace("\\", "/")
+    return _classify_server_side_path(file_path.replace("\\", "/"))
 
-    for pattern in SERVER_SIDE_FILE_PATTERNS:
-        if re.search(pattern, normalized):
-            return True
 
-    return False
+def classify_server_side_files(file_paths: Iterable[str]) -> Dict[str, bool]:
+    """
+    Classify a whole set of files (e.g. state["files_modified"]) in one call.
+
+    Verdicts are cached per path, so repeated checks of the same story
+    cost a dict lookup per file.
+
+    Args:
+        file_paths: File paths to classify (non-strings are ignored)
+
+    Returns:
+        Dict mapping each path to True if server-side, False otherwise
+    """
+    return {
+        path: is_server_side_file(path)
+        for path in file_paths
+        if isinstance(path, str) and path
+    }
 
 
 # Content patterns that indicate server-side code
@@ -126,6 +179,11 @@ SERVER_SIDE_CONTENT_PATTERNS = [
     r"app/api/.*route\.ts",            # API route path in content
 ]
 
+_SERVER_SIDE_CONTENT_RE = re.compile(
+    "|".join(f"(?:{p})" for p in SERVER_SIDE_CONTENT_PATTERNS),
+    re.IGNORECASE
+)
+
 
 def is_server_side_content(content: str) -> bool:
     """
@@ -143,11 +201,7 @@ def is_server_side_content(content: str) -> bool:
     if not content:
         return False
 
-    for pattern in SERVER_SIDE_CONTENT_PATTERNS:
-        if re.search(pattern, content, re.IGNORECASE):
-            return True
-
-    return False
+    return _SERVER_SIDE_CONTENT_RE.search(content) is not None
 
 
 # Core WAVE safety principles
@@ -251,6 +305,88 @@ AMBIGUOUS_KEYWORDS = [
 ]
 
 
+# All keywords compiled into one word-boundary-aware alternation (longest
+# first, so "or maybe" wins over "maybe"); multi-word keywords allow any
+# whitespace between words.
+_AMBIGUOUS_KEYWORD_RE = re.compile(
+    r"\b(?:" + "|".join(
+        r"\s+".join(re.escape(word) for word in keyword.split())
+        for keyword in sorted(AMBIGUOUS_KEYWORDS, key=len, reverse=True)
+    ) + r")\b",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class AmbiguityScan:
+    """Ambiguous keyword hits in a requirements text."""
+    hits: List[tuple] = field(default_factory=list)  # (keyword, start, end)
+    word_count: int = 0
+
+    @property
+    def ambiguous(self) -> bool:
+        return bool(self.hits)
+
+    @property
+    def density(self) -> float:
+        """Ambiguous keywords per 100 words."""
+        return (len(self.hits) / self.word_count * 100) if self.word_count else 0.0
+
+    @property
+    def keywords(self) -> List[str]:
+        """Distinct keywords hit, in first-seen order."""
+        return list(dict.fromkeys(keyword for keyword, _, _ in self.hits))
+
+
+def scan_ambiguity(text: str) -> AmbiguityScan:
+    """
+    Find ambiguous keywords in one pass over the text.
+
+    Args:
+        text: Requirements or story text
+
+    Returns:
+        AmbiguityScan with hit positions and density
+    """
+    if not text:
+        return AmbiguityScan()
+    hits = [
+        (" ".join(match.group(0).lower().split()), match.start(), match.end())
+        for match in _AMBIGUOUS_KEYWORD_RE.finditer(text)
+    ]
+    return AmbiguityScan(hits=hits, word_count=len(text.split()))
+
+
+def _story_requirements_text(story: dict) -> str:
+    """Flatten the requirement-bearing fields of a story JSON."""
+    parts = [story.get("title", ""), story.get("description", "")]
+    objective = story.get("objective") or story.get("story_data", {}).get("objective") or {}
+    if isinstance(objective, dict):
+        parts.extend(str(v) for v in objective.values())
+    for criterion in story.get("acceptance_criteria", []):
+        if isinstance(criterion, dict):
+            parts.append(criterion.get("description", ""))
+        else:
+            parts.append(str(criterion))
+    return "\n".join(p for p in parts if p)
+
+
+def prescreen_stories(stories: Iterable[dict]) -> Dict[str, AmbiguityScan]:
+    """
+    P006 triage for a whole wave at story-ingest time.
+
+    Args:
+        stories: Story dicts (Schema V4)
+
+    Returns:
+        Dict mapping story_id to its AmbiguityScan
+    """
+    return {
+        story.get("story_id", f"story-{index}"): scan_ambiguity(_story_requirements_text(story))
+        for index, story in enumerate(stories)
+    }
+
+
 def should_escalate_p006(result: dict) -> bool:
     """
     Determine if P006 (Escalate Uncertainty) should trigger.
@@ -268,6 +404,7 @@ def should_escalate_p006(result: dict) -> bool:
         result: Dict containing decision context with possible keys:
             - confidence_score: Float 0-1 indicating confidence
             - requirements: String with task requirements
+            - ambiguity: Precomputed AmbiguityScan (skips rescanning requirements)
             - options: List of available options
             - selected: Selected option (or None)
             - decision: Decision status string
@@ -281,10 +418,11 @@ def should_escalate_p006(result: dict) -> bool:
         return True
 
     # Trigger 2: Ambiguous keywords in requirements
-    requirements = result.get('requirements', '').lower()
-    for keyword in AMBIGUOUS_KEYWORDS:
-        if keyword.lower() in requirements:
-            return True
+    ambiguity = result.get('ambiguity')
+    if ambiguity is None:
+        ambiguity = scan_ambiguity(result.get('requirements', ''))
+    if ambiguity.ambiguous:
+        return True
 
     # Trigger 3: Multiple options without selection
     options = result.get('options', [])
@@ -316,6 +454,7 @@ class SafetyViolation:
     description: str
     matched_pattern: Optional[str] = None
     context: Optional[str] = None
+    file_path: Optional[str] = None  # Set by per-file checks for attribution
 
 
 @dataclass
@@ -327,12 +466,24 @@ class SafetyResult:
     recommendation: str = "ALLOW"  # ALLOW, WARN, BLOCK
     escalation_level: EscalationLevel = EscalationLevel.NONE
     checked_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    tier: str = ""  # Which tier decided: pattern, grok, stream
+    latency_ms: float = 0.0
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONSTITUTIONAL CHECKER
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Change sets with at least this many files are scanned in a process pool
+PARALLEL_MIN_FILES = 8
+
+# Max concurrent Grok escalations for one change set
+DEFAULT_GROK_CONCURRENCY = 4
+
+# Record verdicts in the global safety event store by default (0 disables)
+SAFETY_EVENTS_ENABLED = os.getenv("WAVE_SAFETY_EVENTS", "1").lower() not in ("0", "false", "no")
+
+
 class ConstitutionalChecker:
     """
     Constitutional AI safety checker.
@@ -344,11 +495,25 @@ class ConstitutionalChecker:
         self,
         principles: List[SafetyPrinciple] = None,
         use_grok: bool = True,
-        strict_mode: bool = True
+        strict_mode: bool = True,
+        event_store: Optional["SafetyEventStore"] = None,
+        record_events: bool = SAFETY_EVENTS_ENABLED
     ):
+        """
+        Args:
+            principles: Principles to check (default: WAVE_PRINCIPLES)
+            use_grok: Escalate ambiguous hits to Grok
+            strict_mode: Block on any critical violation
+            event_store: Store verdicts are recorded in (default: the
+                global safety event store)
+            record_events: False to record no verdicts
+        """
         self.principles = principles or WAVE_PRINCIPLES
         self.use_grok = use_grok and GROK_AVAILABLE
         self.strict_mode = strict_mode
+        if event_store is None and record_events and get_safety_event_store is not None:
+            event_store = get_safety_event_store()
+        self.event_store = event_store if record_events else None
         self._client = None
 
     def _get_client(self) -> Optional["MultiLLMClient"]:
@@ -380,21 +545,10 @@ class ConstitutionalChecker:
             is_server_side_file(file_path) if file_path else False
         ) or is_server_side_content(content)
 
-        # Patterns to skip for server-side files (P002 security patterns)
-        server_side_skip_patterns = {
-            r"API_KEY",
-            r"SECRET",
-            r"PASSWORD",
-            r"PRIVATE_KEY",
-            r"AWS_ACCESS",
-            r"credentials",
-            r"token\s*=",
-        }
-
         for principle in self.principles:
             for pattern in principle.patterns:
                 # Skip certain patterns for server-side code
-                if is_server_side and pattern in server_side_skip_patterns:
+                if is_server_side and pattern in SERVER_SIDE_SKIP_PATTERNS:
                     continue
 
                 if re.search(pattern, content, re.IGNORECASE):
@@ -540,7 +694,8 @@ REASON: Brief explanation
         self,
         content: str,
         context: str = "",
-        file_path: Optional[str] = None
+        file_path: Optional[str] = None,
+        story_id: str = ""
     ) -> SafetyResult:
         """
         Full safety check combining pattern matching and LLM analysis.
@@ -549,10 +704,30 @@ REASON: Brief explanation
             content: Content to check
             context: Additional context
             file_path: Optional file path for context-aware checking
+            story_id: Optional story ID for the audit log
 
         Returns:
             Complete SafetyResult
         """
+        start = time.perf_counter()
+        result = self._evaluate(content, context, file_path)
+        result.latency_ms = (time.perf_counter() - start) * 1000
+
+        if self.event_store is not None:
+            try:
+                self.event_store.record_verdict(result, story_id=story_id, file_path=file_path)
+            except Exception:
+                pass
+
+        return result
+
+    def _evaluate(
+        self,
+        content: str,
+        context: str,
+        file_path: Optional[str]
+    ) -> SafetyResult:
+        """Run the pattern tier, then Grok if patterns are clean."""
         # First, quick pattern check (with file context)
         pattern_violations = self.check_patterns(content, file_path)
 
@@ -563,12 +738,14 @@ REASON: Brief explanation
                 score=0.0,
                 violations=pattern_violations,
                 recommendation="BLOCK",
-                escalation_level=EscalationLevel.E_STOP
+                escalation_level=EscalationLevel.E_STOP,
+                tier="pattern"
             )
 
         # Use Grok for nuanced analysis
         if self.use_grok and not pattern_violations:
             grok_result = self.check_with_grok(content, context)
+            grok_result.tier = "grok"
             return grok_result
 
         # Return pattern-based result
@@ -580,16 +757,475 @@ REASON: Brief explanation
                 score=score,
                 violations=pattern_violations,
                 recommendation="WARN" if score > 0.3 else "BLOCK",
-                escalation_level=self._get_escalation_level(score, pattern_violations)
+                escalation_level=self._get_escalation_level(score, pattern_violations),
+                tier="pattern"
             )
 
         return SafetyResult(
             safe=True,
             score=1.0,
             recommendation="ALLOW",
-            escalation_level=EscalationLevel.NONE
+            escalation_level=EscalationLevel.NONE,
+            tier="pattern"
         )
 
+    def check_files(
+        self,
+        files: Dict[str, str],
+        context: str = "",
+        story_id: str = "",
+        extra_content: str = "",
+        max_workers: Optional[int] = None,
+        grok_concurrency: int = DEFAULT_GROK_CONCURRENCY,
+        parallel_min_files: int = PARALLEL_MIN_FILES
+    ) -> SafetyResult:
+        """
+        Check a change set file by file and aggregate into one SafetyResult.
+
+        Pattern scans fan out to a process pool once the change set has at
+        least parallel_min_files files (regex work escapes the GIL); the pool
+        is created once per process and reused. Files
+        whose patterns are clean are escalated to Grok concurrently, capped
+        at grok_concurrency in-flight calls. Grok is skipped entirely when
+        any file has a critical pattern violation, as in check().
+
+        Args:
+            files: Mapping of file path to content
+            context: Additional context for Grok
+            story_id: Optional story ID for the audit log
+            extra_content: Non-file content (plan, messages) checked without a path
+            max_workers: Process pool size (default: CPU count)
+            grok_concurrency: Max concurrent Grok escalations
+            parallel_min_files: Below this many files, scan in-process
+
+        Returns:
+            Aggregated SafetyResult; each violation carries its file_path
+        """
+        start = time.perf_counter()
+
+        items = [(self.principles, path, content) for path, content in files.items() if content]
+        if extra_content:
+            items.append((self.principles, None, extra_content))
+
+        scanned: Dict[Optional[str], List[SafetyViolation]] = {}
+        if len(items) >= parallel_min_files:
+            try:
+                pool = _get_pattern_pool(max_workers)
+                for path, violations in pool.map(_scan_file_patterns, items):
+                    scanned[path] = violations
+            except (OSError, BrokenProcessPool):
+                _drop_pattern_pool(max_workers)
+                scanned.clear()
+        if len(scanned) != len(items):
+            for item in items:
+                path, violations = _scan_file_patterns(item)
+                scanned[path] = violations
+
+        results: Dict[Optional[str], SafetyResult] = {}
+        critical = any(v.severity >= 1.0 for vs in scanned.values() for v in vs)
+        grok_paths = []
+        for path, violations in scanned.items():
+            if violations or critical or not self.use_grok:
+                results[path] = self._pattern_result(violations)
+            else:
+                grok_paths.append(path)
+
+        if grok_paths:
+            contents = {path: content for _, path, content in items}
+            with ThreadPoolExecutor(max_workers=max(1, grok_concurrency)) as pool:
+                futures = {
+                    path: pool.submit(self.check_with_grok, contents[path], context)
+                    for path in grok_paths
+                }
+                for path, future in futures.items():
+                    result = future.result()
+                    for violation in result.violations:
+                        violation.file_path = path
+                    results[path] = result
+
+        result = self._aggregate(list(results.values()))
+        result.tier = "parallel"
+        result.latency_ms = (time.perf_counter() - start) * 1000
+
+        if self.event_store is not None:
+            try:
+                self.event_store.record_verdict(result, story_id=story_id)
+            except Exception:
+                pass
+
+        return result
+
+    def _pattern_result(self, violations: List[SafetyViolation]) -> SafetyResult:
+        """Score pattern violations the same way _evaluate() does."""
+        if not violations:
+            return SafetyResult(safe=True, score=1.0, recommendation="ALLOW", tier="pattern")
+        max_severity = max(v.severity for v in violations)
+        if max_severity >= 1.0:
+            return SafetyResult(
+                safe=False,
+                score=0.0,
+                violations=violations,
+                recommendation="BLOCK",
+                escalation_level=EscalationLevel.E_STOP,
+                tier="pattern"
+            )
+        score = 1.0 - max_severity
+        return SafetyResult(
+            safe=score > 0.5,
+            score=score,
+            violations=violations,
+            recommendation="WARN" if score > 0.3 else "BLOCK",
+            escalation_level=self._get_escalation_level(score, violations),
+            tier="pattern"
+        )
+
+    def _aggregate(self, results: List[SafetyResult]) -> SafetyResult:
+        """Combine per-file results: worst score, recommendation and escalation win."""
+        if not results:
+            return SafetyResult(safe=True, score=1.0, recommendation="ALLOW")
+
+        recommendation_rank = ["ALLOW", "WARN", "BLOCK"]
+        escalation_rank = [
+            EscalationLevel.NONE,
+            EscalationLevel.WARNING,
+            EscalationLevel.CRITICAL,
+            EscalationLevel.E_STOP,
+        ]
+        return SafetyResult(
+            safe=all(r.safe for r in results),
+            score=min(r.score for r in results),
+            violations=[v for r in results for v in r.violations],
+            recommendation=max(
+                (r.recommendation for r in results),
+                key=lambda rec: recommendation_rank.index(rec) if rec in recommendation_rank else 0
+            ),
+            escalation_level=max(
+                (r.escalation_level for r in results),
+                key=lambda level: escalation_rank.index(level) if level in escalation_rank else 0
+            )
+        )
+
+    def stream_scanner(
+        self,
+        file_path: Optional[str] = None,
+        on_critical: Optional[Callable[["CriticalViolationError"], None]] = None
+    ) -> "StreamingSafetyScanner":
+        """
+        Create an incremental scanner for streamed LLM output.
+
+        Args:
+            file_path: Optional file path for context-aware checking
+            on_critical: Optional callback fired before the critical signal is raised
+
+        Returns:
+            StreamingSafetyScanner bound to this checker's principles
+        """
+        return StreamingSafetyScanner(
+            principles=self.principles,
+            file_path=file_path,
+            on_critical=on_critical
+        )
+
+    def scan_stream(
+        self,
+        chunks: Iterable[str],
+        file_path: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Pass streamed chunks through while scanning them.
+
+        Usage:
+            for chunk in checker.scan_stream(llm.stream(messages)):
+                output.append(chunk)
+
+        The source stream is closed as soon as a critical violation is
+        found, which aborts the in-flight LLM call.
+
+        Args:
+            chunks: Iterable of text chunks (or message chunks with .content)
+            file_path: Optional file path for context-aware checking
+
+        Yields:
+            The original chunks, unchanged
+
+        Raises:
+            CriticalViolationError: On the first critical violation
+        """
+        scanner = self.stream_scanner(file_path)
+        try:
+            for chunk in chunks:
+                text = chunk.content if hasattr(chunk, "content") else chunk
+                scanner.feed(text if isinstance(text, str) else str(text))
+                yield chunk
+            scanner.finish()
+        except CriticalViolationError:
+            close = getattr(chunks, "close", None)
+            if close:
+                try:
+                    close()
+                except Exception:
+                    pass
+            raise
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STREAMING SCANNER (Abort generation mid-stream)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Characters of previous chunks kept so patterns can match across boundaries
+STREAM_OVERLAP_CHARS = 256
+
+# Characters to wait for server-side markers before reporting P002 hits
+STREAM_SERVER_SIDE_PROBE_CHARS = 2048
+
+
+class CriticalViolationError(Exception):
+    """Raised when a streamed response hits a critical (severity 1.0) violation."""
+    def __init__(self, violation: SafetyViolation, result: SafetyResult):
+        self.violation = violation
+        self.result = result
+        super().__init__(f"{violation.principle_id}: {violation.principle_name}")
+
+
+class StreamingSafetyScanner:
+    """
+    Incremental pattern scanner for streamed LLM output.
+
+    Keeps a tail of previous chunks so patterns spanning chunk boundaries
+    still match. Reports each principle at most once, like check_patterns().
+
+    P002 patterns that are skipped for server-side code are held back until
+    the stream is known not to be server-side (file path, content markers,
+    or STREAM_SERVER_SIDE_PROBE_CHARS seen without a marker).
+
+    Usage:
+        scanner = checker.stream_scanner(file_path)
+        for chunk in llm.stream(messages):
+            scanner.feed(chunk.content)  # raises CriticalViolationError
+        result = scanner.finish()
+    """
+
+    def __init__(
+        self,
+        principles: List[SafetyPrinciple] = None,
+        file_path: Optional[str] = None,
+        on_critical: Optional[Callable[[CriticalViolationError], None]] = None,
+        overlap_chars: int = STREAM_OVERLAP_CHARS,
+        probe_chars: int = STREAM_SERVER_SIDE_PROBE_CHARS
+    ):
+        self.principles = principles or WAVE_PRINCIPLES
+        self.on_critical = on_critical
+        self.overlap_chars = overlap_chars
+        self.probe_chars = probe_chars
+
+        self._compiled = [
+            (principle, [(p, re.compile(p, re.IGNORECASE)) for p in principle.patterns])
+            for principle in self.principles
+        ]
+
+        self._server_side = is_server_side_file(file_path) if file_path else False
+        self._tail = ""
+        self._head = ""
+        self._chars_seen = 0
+        self._reported: set = set()
+        self._pending: Dict[str, SafetyViolation] = {}
+        self.violations: List[SafetyViolation] = []
+        self.critical: Optional[CriticalViolationError] = None
+
+    @property
+    def aborted(self) -> bool:
+        """True once a critical violation has been signalled."""
+        return self.critical is not None
+
+    def feed(self, chunk: str) -> List[SafetyViolation]:
+        """
+        Scan the next chunk of streamed text.
+
+        Args:
+            chunk: Newly received text
+
+        Returns:
+            Violations first detected in this chunk
+
+        Raises:
+            CriticalViolationError: On the first critical violation
+        """
+        if self.critical:
+            raise self.critical
+        if not chunk:
+            return []
+
+        window = self._tail + chunk
+        self._chars_seen += len(chunk)
+        if len(self._head) < 200:
+            self._head = (self._head + chunk)[:200]
+
+        if not self._server_side and is_server_side_content(window):
+            self._server_side = True
+            self._pending.clear()
+
+        new_violations = []
+        for principle, patterns in self._compiled:
+            if principle.id in self._reported:
+                continue
+            for pattern, regex in patterns:
+                if not regex.search(window):
+                    continue
+                if pattern in SERVER_SIDE_SKIP_PATTERNS:
+                    if self._server_side:
+                        continue
+                    if self._chars_seen < self.probe_chars:
+                        # Deferred hit - keep checking the principle's other
+                        # (non-skippable) patterns, e.g. \.env
+                        self._pending.setdefault(principle.id, self._violation(principle, pattern))
+                        continue
+                new_violations.append(self._violation(principle, pattern))
+                break
+
+        if not self._server_side and self._chars_seen >= self.probe_chars:
+            new_violations.extend(self._release_pending())
+
+        self._tail = window[-self.overlap_chars:]
+        self._record(new_violations)
+        return new_violations
+
+    def finish(self) -> SafetyResult:
+        """
+        Close the stream and return the pattern-based result.
+
+        Raises:
+            CriticalViolationError: If held-back hits turn out to be critical
+        """
+        if not self.critical and not self._server_side:
+            self._record(self._release_pending())
+        return self._result()
+
+    def _violation(self, principle: SafetyPrinciple, pattern: str) -> SafetyViolation:
+        return SafetyViolation(
+            principle_id=principle.id,
+            principle_name=principle.name,
+            category=principle.category,
+            severity=principle.severity,
+            description=principle.description,
+            matched_pattern=pattern,
+            context=self._head
+        )
+
+    def _release_pending(self) -> List[SafetyViolation]:
+        released = [v for pid, v in self._pending.items() if pid not in self._reported]
+        self._pending.clear()
+        return released
+
+    def _record(self, violations: List[SafetyViolation]) -> None:
+        for violation in violations:
+            self._reported.add(violation.principle_id)
+            self.violations.append(violation)
+
+        critical = next((v for v in violations if v.severity >= 1.0), None)
+        if critical and not self.critical:
+            self.critical = CriticalViolationError(critical, self._result())
+            if self.on_critical:
+                try:
+                    self.on_critical(self.critical)
+                except Exception:
+                    pass
+            raise self.critical
+
+    def _result(self) -> SafetyResult:
+        """Build a SafetyResult with the same scoring as ConstitutionalChecker.check()."""
+        if not self.violations:
+            return SafetyResult(safe=True, score=1.0, recommendation="ALLOW", tier="stream")
+        max_severity = max(v.severity for v in self.violations)
+        if max_severity >= 1.0:
+            return SafetyResult(
+                safe=False,
+                score=0.0,
+                violations=list(self.violations),
+                recommendation="BLOCK",
+                escalation_level=EscalationLevel.E_STOP,
+                tier="stream"
+            )
+        score = 1.0 - max_severity
+        return SafetyResult(
+            safe=score > 0.5,
+            score=score,
+            violations=list(self.violations),
+            recommendation="WARN" if score > 0.3 else "BLOCK",
+            escalation_level=EscalationLevel.CRITICAL if score < 0.3 else EscalationLevel.WARNING,
+            tier="stream"
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PARALLEL FILE CHECKING (Large change sets)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Agent output marks files as ```lang:path/to/file
+_FILE_BLOCK_RE = re.compile(r"```[\w+-]*:([^\s`]+)[^\n]*\n(.*?)```", re.DOTALL)
+
+# Pattern-scan process pools, by max_workers (created on first use)
+_pattern_pools: Dict[Optional[int], ProcessPoolExecutor] = {}
+_pattern_pools_lock = threading.Lock()
+
+
+def _get_pattern_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    with _pattern_pools_lock:
+        pool = _pattern_pools.get(max_workers)
+        if pool is None:
+            pool = _pattern_pools[max_workers] = ProcessPoolExecutor(max_workers=max_workers)
+        return pool
+
+
+def _drop_pattern_pool(max_workers: Optional[int] = None) -> None:
+    """Discard a broken pool; the next check creates a new one."""
+    with _pattern_pools_lock:
+        pool = _pattern_pools.pop(max_workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def _scan_file_patterns(item: tuple) -> tuple:
+    """Process-pool worker: pattern-scan one file and tag violations with its path."""
+    principles, file_path, content = item
+    checker = ConstitutionalChecker(principles=principles, use_grok=False, record_events=False)
+    violations = checker.check_patterns(content, file_path)
+    for violation in violations:
+        violation.file_path = file_path
+    return file_path, violations
+
+
+def split_code_by_file(code: str) -> Dict[str, str]:
+    """
+    Split agent code output into per-file contents.
+
+    Recognizes the ```lang:path fenced blocks the dev agents emit.
+    Repeated blocks for the same path are concatenated.
+
+    Args:
+        code: Combined code output
+
+    Returns:
+        Dict mapping file path to content (empty if no file blocks)
+    """
+    files: Dict[str, str] = {}
+    for path, body in _FILE_BLOCK_RE.findall(code or ""):
+        files[path] = f"{files[path]}\n{body}" if path in files else body
+    return files
+
+
+def code_outside_files(code: str) -> str:
+    """
+    Agent code output with the ```lang:path file blocks removed (shell
+    blocks, prose and anything else not attributed to a file).
+
+    Args:
+        code: Combined code output
+
+    Returns:
+        Remaining content, stripped
+    """
+    return _FILE_BLOCK_RE.sub("", code or "").strip()
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # HELPER FUNCTIONS
@@ -618,18 +1254,24 @@ def check_action_safety(
 
 
 def create_constitutional_node(
-    checker: Optional[ConstitutionalChecker] = None
+    checker: Optional[ConstitutionalChecker] = None,
+    parallel_min_files: Optional[int] = PARALLEL_MIN_FILES,
+    record_events: bool = SAFETY_EVENTS_ENABLED
 ) -> Callable[[WAVEState], dict]:
     """
     Create a constitutional checking node for the WAVE graph.
 
     Args:
         checker: Optional pre-configured checker
+        parallel_min_files: Check per file (in parallel) when the code
+            splits into at least this many files; None disables
+        record_events: Record the node's verdicts in the global safety
+            event store (ignored when checker is given)
 
     Returns:
         Node function for the graph
     """
-    _checker = checker or ConstitutionalChecker()
+    _checker = checker or ConstitutionalChecker(record_events=record_events)
 
     def constitutional_node(state: WAVEState) -> dict:
         """Check state for safety violations."""
@@ -643,9 +1285,15 @@ def create_constitutional_node(
 
         if current_file:
             file_path = current_file
-        elif files_modified and len(files_modified) > 0:
-            # Use the most recently modified file
-            file_path = files_modified[-1] if isinstance(files_modified[-1], str) else None
+        elif files_modified:
+            # Classify every modified file; any client-side file means the
+            # combined content must be checked with client-side strictness
+            verdicts = classify_server_side_files(files_modified)
+            client_side = [path for path, server_side in verdicts.items() if not server_side]
+            if client_side:
+                file_path = client_side[0]
+            elif verdicts:
+                file_path = next(iter(verdicts))
 
         if state.get("code"):
             content_to_check.append(f"Code:\n{state['code']}")
@@ -672,15 +1320,41 @@ def create_constitutional_node(
                 }
             }
 
-        # Check all content (with file context for server-side awareness)
-        full_content = "\n\n".join(content_to_check)
         context = f"Story: {state.get('story_id', 'unknown')}"
 
-        result = _checker.check(full_content, context, file_path)
+        # Large change sets: check each file with its own context, in parallel
+        code = state.get("code", "")
+        file_contents = state.get("file_contents")
+        if file_contents:
+            # Files come from state: the code output is checked as well
+            rest = code
+        else:
+            file_contents = split_code_by_file(code)
+            rest = code_outside_files(code)
+        if parallel_min_files is not None and len(file_contents) >= parallel_min_files:
+            non_code = [c for c in content_to_check if not c.startswith("Code:\n")]
+            if rest:
+                non_code.insert(0, f"Code:\n{rest}")
+            result = _checker.check_files(
+                file_contents,
+                context,
+                story_id=state.get("story_id", ""),
+                extra_content="\n\n".join(non_code),
+                parallel_min_files=parallel_min_files
+            )
+        else:
+            # Check all content (with file context for server-side awareness)
+            full_content = "\n\n".join(content_to_check)
+            result = _checker.check(
+                full_content,
+                context,
+                file_path,
+                story_id=state.get("story_id", "")
+            )
 
         # Build safety state update
         violations = [
-            f"{v.principle_id}: {v.principle_name}"
+            f"{v.principle_id}: {v.principle_name}" + (f" ({v.file_path})" if v.file_path else "")
             for v in result.violations
         ]
 
@@ -750,14 +1424,30 @@ __all__ = [
     "check_action_safety",
     "create_constitutional_node",
     "ESTOP",
+    # Streaming scanner
+    "CriticalViolationError",
+    "StreamingSafetyScanner",
+    "STREAM_OVERLAP_CHARS",
+    "STREAM_SERVER_SIDE_PROBE_CHARS",
+    # Parallel file checking
+    "PARALLEL_MIN_FILES",
+    "DEFAULT_GROK_CONCURRENCY",
+    "split_code_by_file",
+    "code_outside_files",
     # P006 Explicit Triggers (Enhancement 3)
     "AMBIGUOUS_KEYWORDS",
     "CONFIDENCE_THRESHOLD",
     "should_escalate_p006",
+    "AmbiguityScan",
+    "scan_ambiguity",
+    "prescreen_stories",
     # Server-side whitelist (Fix for process.env false positives)
     "SERVER_SIDE_FILE_PATTERNS",
     "SERVER_SIDE_SAFE_PATTERNS",
     "SERVER_SIDE_CONTENT_PATTERNS",
+    "SERVER_SIDE_SKIP_PATTERNS",
+    "SERVER_SIDE_FILE_CACHE_SIZE",
     "is_server_side_file",
+    "classify_server_side_files",
     "is_server_side_content",
 ]
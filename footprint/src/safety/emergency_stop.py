@@ -15,10 +15,13 @@ import os
 import sys
 import json
 import time
+import uuid
+import socket
 import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Callable, Dict, Any
+from functools import lru_cache
+from typing import Optional, Callable, Dict, Any, FrozenSet
 from dataclasses import dataclass, field
 
 # Redis client
@@ -28,6 +31,15 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
+# Watcher mode: cached stop flags instead of a stat() per check
+from .stop_watcher import SharedStopFlag, StopFileWatcher, DEFAULT_POLL_INTERVAL
+
+# Safety audit log (optional)
+try:
+    from .audit_log import get_safety_event_store
+except ImportError:
+    get_safety_event_store = None
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONSTANTS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -41,9 +53,25 @@ EMERGENCY_STOP_FILE = os.getenv(
 # Redis channel for broadcast
 EMERGENCY_STOP_CHANNEL = "wave:emergency"
 
+# Halt acknowledgements: workers publish to the channel and record in the
+# per-halt hash (for collectors that reconnect)
+EMERGENCY_ACK_CHANNEL = "wave:emergency:ack"
+EMERGENCY_ACKS_KEY = "wave:emergency:acks:{halt_id}"
+
+# Scoped stops: hash of scope ("story:BE-03", "domain:fe", "wave:3") -> JSON
+EMERGENCY_SCOPES_KEY = "wave:emergency:scopes"
+SCOPE_KINDS = ("wave", "domain", "story")
+
+# Subscribed workers: hash of worker_id -> last heartbeat timestamp
+EMERGENCY_WORKERS_KEY = "wave:emergency:workers"
+WORKER_HEARTBEAT_SECONDS = 10
+
 # Maximum time to halt all agents
 HALT_TIMEOUT_SECONDS = 5
 
+# Start the stop-file watcher for every EmergencyStop in this process
+ESTOP_WATCH_ENABLED = os.getenv("WAVE_ESTOP_WATCH", "").lower() in ("1", "true", "yes")
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # EXCEPTIONS
@@ -95,6 +123,54 @@ def get_redis_client() -> Optional["redis.Redis"]:
         return None
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCOPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def make_scope(kind: str, value: Any) -> str:
+    """
+    Scope key for a scoped stop.
+
+    Args:
+        kind: "wave", "domain" or "story"
+        value: Wave number, domain name or story ID
+
+    Raises:
+        ValueError: Unknown kind
+    """
+    if kind not in SCOPE_KINDS:
+        raise ValueError(f"Unknown stop scope kind: {kind} (expected one of {SCOPE_KINDS})")
+    return f"{kind}:{value}"
+
+
+def _validate_scope(scope: str) -> str:
+    kind, _, value = scope.partition(":")
+    if kind not in SCOPE_KINDS or not value:
+        raise ValueError(f"Invalid stop scope: {scope!r} (expected kind:value, kind in {SCOPE_KINDS})")
+    return scope
+
+
+@lru_cache(maxsize=4096)
+def scope_keys(
+    story_id: Optional[str] = None,
+    domain: Optional[str] = None,
+    wave: Optional[Any] = None
+) -> FrozenSet[str]:
+    """
+    Every scope that covers a unit of work (its wave, domain and story).
+
+    Cached per context, so check() is one set-disjointness test.
+    """
+    keys = []
+    if wave is not None and wave != "":
+        keys.append(f"wave:{wave}")
+    if domain:
+        keys.append(f"domain:{domain}")
+    if story_id:
+        keys.append(f"story:{story_id}")
+    return frozenset(keys)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # EMERGENCY STOP SYSTEM
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -115,6 +191,15 @@ class EmergencyStop:
 
         # To clear:
         es.clear()
+
+        # Scoped stop (quarantine one story; other work keeps flowing):
+        es.trigger_scope("story:BE-03", "Repeated safety violations")
+        if es.check(story_id=task.story_id, domain="be", wave=3):
+            ...
+        es.clear_scope("story:BE-03")
+
+    With the watcher running (start_watcher() or WAVE_ESTOP_WATCH=1),
+    check() reads cached flags only - no stat() of the stop file per call.
     """
 
     # Class-level state (shared across instances)
@@ -123,12 +208,22 @@ class EmergencyStop:
     _event: Optional[EmergencyStopEvent] = None
     _lock = threading.Lock()
     _callbacks: list[Callable[[str], None]] = []
+    _watcher: Optional[StopFileWatcher] = None
+    _shared_flag: Optional[SharedStopFlag] = None
+
+    # Scoped stops: scope -> reason, swapped (never mutated) so readers
+    # need no lock; _active_scopes is its key set for check()
+    _scopes: Dict[str, str] = {}
+    _active_scopes: FrozenSet[str] = frozenset()
+    _story_context: Dict[str, tuple] = {}
+    _scope_callbacks: list[Callable[[str, str], None]] = []
 
     def __init__(
         self,
         redis_client: Optional["redis.Redis"] = None,
         halt_timeout: int = HALT_TIMEOUT_SECONDS,
-        auto_subscribe: bool = False
+        auto_subscribe: bool = False,
+        watch: bool = ESTOP_WATCH_ENABLED
     ):
         """
         Initialize Emergency Stop system.
@@ -137,35 +232,72 @@ class EmergencyStop:
             redis_client: Optional Redis client (auto-created if None)
             halt_timeout: Max seconds to halt all agents
             auto_subscribe: Whether to auto-subscribe to Redis channel
+            watch: Start the stop-file watcher (process-wide)
         """
         self._redis = redis_client
         self.halt_timeout = halt_timeout
         self._subscribed = False
         self._subscriber_thread: Optional[threading.Thread] = None
+        self.worker_id: Optional[str] = None
 
         if auto_subscribe:
             self.subscribe()
+        if watch:
+            EmergencyStop.start_watcher()
 
     # ═══════════════════════════════════════════════════════════════════════════
     # CHECK METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
-    def check(self) -> bool:
+    def check(
+        self,
+        story_id: Optional[str] = None,
+        domain: Optional[str] = None,
+        wave: Optional[Any] = None
+    ) -> bool:
         """
         Check if emergency stop is active.
 
         Checks:
         1. Class-level state (fastest)
-        2. File-based trigger
-        3. Redis (if subscribed)
+        2. Scoped stops covering the given story/domain/wave (a story's
+           wave and domain come from register_story() when not passed)
+        3. File-based trigger - the watcher's cached flags when it is
+           running, otherwise a stat() of the stop file
+        4. Redis (if subscribed)
+
+        Args:
+            story_id: Story being worked on
+            domain: Agent domain
+            wave: Wave number
 
         Returns:
-            True if emergency stop is active
+            True if emergency stop is active (globally or for this work)
         """
         # Fast path: check class state
         if EmergencyStop._active:
             return True
 
+        if EmergencyStop._active_scopes and (story_id or domain or wave is not None):
+            if self._scope_match(story_id, domain, wave):
+                return True
+
+        # Watcher mode: memory reads only while nothing is raised
+        watcher = EmergencyStop._watcher
+        if watcher is not None:
+            flag = EmergencyStop._shared_flag
+            if watcher.exists or (flag is not None and flag.is_set()):
+                # The flag and cached state are hints (the flag is raised
+                # before the file event arrives); the stop file decides
+                generation = flag.generation if flag is not None else 0
+                if self.check_file():
+                    return True
+                # Stop file removed by hand: drop the stale flag, unless it
+                # was raised again meanwhile
+                if flag is not None and flag.is_set() and flag.generation == generation:
+                    flag.clear()
+            return False
+
         # Check file-based trigger
         if self.check_file():
             return True
@@ -208,28 +340,76 @@ class EmergencyStop:
 
         return False
 
+    def _scope_match(
+        self,
+        story_id: Optional[str],
+        domain: Optional[str],
+        wave: Optional[Any]
+    ) -> Optional[str]:
+        """First active scope covering the work, or None."""
+        keys = EmergencyStop.context_scopes(story_id, domain, wave)
+        active = EmergencyStop._active_scopes
+        if active.isdisjoint(keys):
+            return None
+        return next(iter(keys & active))
+
+    @classmethod
+    def context_scopes(
+        cls,
+        story_id: Optional[str] = None,
+        domain: Optional[str] = None,
+        wave: Optional[Any] = None
+    ) -> FrozenSet[str]:
+        """Scopes covering the work, filling a story's wave/domain from register_story()."""
+        if story_id and (domain is None or wave is None):
+            known = cls._story_context.get(story_id)
+            if known:
+                wave = known[0] if wave is None else wave
+                domain = known[1] if domain is None else domain
+        return scope_keys(story_id, domain, wave)
+
+    @classmethod
+    def register_story(cls, story_id: str, wave: Optional[Any] = None, domain: Optional[str] = None) -> None:
+        """Record a story's wave/domain so check(story_id=...) matches their stops."""
+        cls._story_context = {**cls._story_context, story_id: (wave, domain)}
+
     # ═══════════════════════════════════════════════════════════════════════════
     # TRIGGER METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
-    def trigger(self, reason: str = "Manual trigger", source: str = "api") -> None:
+    def trigger(
+        self,
+        reason: str = "Manual trigger",
+        source: str = "api",
+        halt_id: Optional[str] = None
+    ) -> str:
         """
         Trigger emergency stop.
 
         Args:
             reason: Why the stop was triggered
             source: What triggered it (file, redis, api, safety)
+            halt_id: ID workers acknowledge the halt with (generated if None)
+
+        Returns:
+            The halt ID
         """
+        halt_id = halt_id or uuid.uuid4().hex
         self._activate(reason, source)
 
-        # Create stop file
+        # Create stop file and raise the host-wide shared flag
         self._create_stop_file(reason)
+        flag = EmergencyStop._get_shared_flag()
+        if flag is not None:
+            flag.set()
 
         # Broadcast to Redis
-        self.broadcast_halt(reason)
+        self.broadcast_halt(reason, halt_id=halt_id)
 
         # Log event
         self._log_event(f"EMERGENCY_STOP triggered: {reason} (source: {source})")
+        self._audit_event(reason, source, "trigger")
+        return halt_id
 
     def _activate(self, reason: str, source: str) -> None:
         """Activate emergency stop state."""
@@ -258,17 +438,25 @@ class EmergencyStop:
         except Exception as e:
             self._log_event(f"Failed to create stop file: {e}")
 
-    def broadcast_halt(self, reason: str) -> None:
-        """Broadcast halt signal via Redis pub/sub."""
+    def broadcast_halt(self, reason: str, halt_id: Optional[str] = None) -> Optional[str]:
+        """
+        Broadcast halt signal via Redis pub/sub.
+
+        Returns:
+            The halt ID subscribed workers acknowledge, or None if Redis is
+            unavailable
+        """
         if not self._redis:
             self._redis = get_redis_client()
 
         if not self._redis:
-            return
+            return None
 
+        halt_id = halt_id or uuid.uuid4().hex
         try:
             message = json.dumps({
                 "action": "HALT",
+                "halt_id": halt_id,
                 "reason": reason,
                 "timestamp": time.time()
             })
@@ -284,6 +472,7 @@ class EmergencyStop:
             )
         except Exception as e:
             self._log_event(f"Failed to broadcast halt: {e}")
+        return halt_id
 
     # ═══════════════════════════════════════════════════════════════════════════
     # CLEAR METHODS
@@ -301,6 +490,10 @@ class EmergencyStop:
             EmergencyStop._active = False
             EmergencyStop._reason = ""
 
+        flag = EmergencyStop._get_shared_flag()
+        if flag is not None:
+            flag.clear()
+
         # Remove stop file
         stop_file = Path(EMERGENCY_STOP_FILE)
         if stop_file.exists():
@@ -321,13 +514,131 @@ class EmergencyStop:
                 pass
 
         self._log_event("EMERGENCY_STOP cleared")
+        self._audit_event("Cleared", "api", "clear")
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # SCOPED STOP METHODS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def trigger_scope(self, scope: str, reason: str = "Manual trigger", source: str = "api") -> None:
+        """
+        Stop only the work covered by a scope.
+
+        Args:
+            scope: "story:<id>", "domain:<name>" or "wave:<n>" (see make_scope)
+            reason: Why the scope was stopped
+            source: What triggered it (file, redis, api, safety)
+
+        Raises:
+            ValueError: Invalid scope
+        """
+        _validate_scope(scope)
+        EmergencyStop._set_scope(scope, reason)
+
+        if not self._redis:
+            self._redis = get_redis_client()
+        if self._redis:
+            try:
+                self._redis.hset(EMERGENCY_SCOPES_KEY, scope, json.dumps({
+                    "reason": reason,
+                    "source": source,
+                    "timestamp": time.time()
+                }))
+                self._redis.publish(EMERGENCY_STOP_CHANNEL, json.dumps({
+                    "action": "SCOPE_HALT",
+                    "scope": scope,
+                    "reason": reason,
+                    "timestamp": time.time()
+                }))
+            except Exception as e:
+                self._log_event(f"Failed to broadcast scoped halt: {e}")
+
+        self._log_event(f"EMERGENCY_STOP scoped to {scope}: {reason} (source: {source})")
+        self._audit_event(f"[{scope}] {reason}", source, "trigger")
+
+    def clear_scope(self, scope: str) -> None:
+        """Resume work covered by a scope."""
+        EmergencyStop._set_scope(scope, None)
+
+        if not self._redis:
+            self._redis = get_redis_client()
+        if self._redis:
+            try:
+                self._redis.hdel(EMERGENCY_SCOPES_KEY, scope)
+                self._redis.publish(EMERGENCY_STOP_CHANNEL, json.dumps({
+                    "action": "SCOPE_RESUME",
+                    "scope": scope,
+                    "timestamp": time.time()
+                }))
+            except Exception:
+                pass
+
+        self._log_event(f"EMERGENCY_STOP scope {scope} cleared")
+        self._audit_event(f"[{scope}] Cleared", "api", "clear")
+
+    @classmethod
+    def active_scopes(cls) -> Dict[str, str]:
+        """Active scoped stops (scope -> reason)."""
+        return dict(cls._scopes)
+
+    @classmethod
+    def register_scope_callback(cls, callback: Callable[[str, str], None]) -> None:
+        """Register callback(scope, reason), called when a scope is stopped."""
+        cls._scope_callbacks.append(callback)
+
+    @classmethod
+    def _set_scope(cls, scope: str, reason: Optional[str]) -> None:
+        """Add (reason) or remove (None) a scope, swapping in new sets."""
+        with cls._lock:
+            scopes = dict(cls._scopes)
+            added = reason is not None and scope not in scopes
+            if reason is None:
+                scopes.pop(scope, None)
+            else:
+                scopes[scope] = reason
+            cls._scopes = scopes
+            cls._active_scopes = frozenset(scopes)
+
+        if added:
+            for callback in cls._scope_callbacks:
+                try:
+                    callback(scope, reason)
+                except Exception:
+                    pass
+
+    def _sync_scopes(self) -> None:
+        """Load active scopes from Redis (startup and missed messages)."""
+        try:
+            stored = self._redis.hgetall(EMERGENCY_SCOPES_KEY)
+        except Exception:
+            return
+        remote = {}
+        for scope, raw in stored.items():
+            try:
+                remote[scope] = json.loads(raw).get("reason", "Scoped stop")
+            except (ValueError, AttributeError):
+                remote[scope] = "Scoped stop"
+        for scope in set(EmergencyStop._scopes) - set(remote):
+            EmergencyStop._set_scope(scope, None)
+        for scope, reason in remote.items():
+            if EmergencyStop._scopes.get(scope) != reason:
+                EmergencyStop._set_scope(scope, reason)
 
     # ═══════════════════════════════════════════════════════════════════════════
     # SUBSCRIBE METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
-    def subscribe(self) -> None:
-        """Subscribe to Redis emergency stop channel."""
+    def subscribe(self, worker_id: Optional[str] = None) -> None:
+        """
+        Subscribe to Redis emergency stop channel.
+
+        The worker registers itself (with a heartbeat) so halt collectors
+        know whom to expect, and acknowledges every HALT once its stop
+        callbacks have run.
+
+        Args:
+            worker_id: ID used in acks (default: hostname-pid)
+        """
         if self._subscribed:
             return
 
@@ -337,25 +648,43 @@ class EmergencyStop:
         if not self._redis:
             return
 
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
         def listener():
             try:
-                pubsub = self._redis.pubsub()
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
                 pubsub.subscribe(EMERGENCY_STOP_CHANNEL)
-
-                for message in pubsub.listen():
-                    if message["type"] == "message":
-                        try:
-                            data = json.loads(message["data"])
-                            if data.get("action") == "HALT":
-                                self._activate(
-                                    data.get("reason", "Redis broadcast"),
-                                    "redis"
-                                )
-                            elif data.get("action") == "RESUME":
-                                with EmergencyStop._lock:
-                                    EmergencyStop._active = False
-                        except Exception:
-                            pass
+                self._sync_scopes()
+                self._heartbeat()
+                last_heartbeat = time.time()
+
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if time.time() - last_heartbeat >= WORKER_HEARTBEAT_SECONDS:
+                        self._heartbeat()
+                        last_heartbeat = time.time()
+                    if not message or message["type"] != "message":
+                        continue
+                    try:
+                        received_at = time.time()
+                        data = json.loads(message["data"])
+                        if data.get("action") == "HALT":
+                            self._activate(
+                                data.get("reason", "Redis broadcast"),
+                                "redis"
+                            )
+                            self._ack_halt(data, received_at)
+                        elif data.get("action") == "RESUME":
+                            with EmergencyStop._lock:
+                                EmergencyStop._active = False
+                        elif data.get("action") == "SCOPE_HALT":
+                            EmergencyStop._set_scope(
+                                data["scope"], data.get("reason", "Redis broadcast")
+                            )
+                        elif data.get("action") == "SCOPE_RESUME":
+                            EmergencyStop._set_scope(data["scope"], None)
+                    except Exception:
+                        pass
             except Exception:
                 pass
 
@@ -363,13 +692,48 @@ class EmergencyStop:
         self._subscriber_thread.start()
         self._subscribed = True
 
+    def _heartbeat(self) -> None:
+        """Register this worker as live for halt collectors; resync scopes."""
+        try:
+            self._redis.hset(EMERGENCY_WORKERS_KEY, self.worker_id, time.time())
+        except Exception:
+            pass
+        self._sync_scopes()
+
+    def _ack_halt(self, data: Dict[str, Any], received_at: float) -> None:
+        """Acknowledge a HALT after the stop callbacks have run."""
+        halt_id = data.get("halt_id")
+        if not halt_id:
+            return
+        ack = json.dumps({
+            "halt_id": halt_id,
+            "worker_id": self.worker_id,
+            "received_at": received_at,
+            "halted_at": time.time(),
+        })
+        try:
+            key = EMERGENCY_ACKS_KEY.format(halt_id=halt_id)
+            self._redis.hset(key, self.worker_id, ack)
+            self._redis.expire(key, 3600)
+            self._redis.publish(EMERGENCY_ACK_CHANNEL, ack)
+        except Exception as e:
+            self._log_event(f"Failed to acknowledge halt {halt_id}: {e}")
+
     # ═══════════════════════════════════════════════════════════════════════════
     # STATUS METHODS
     # ═══════════════════════════════════════════════════════════════════════════
 
-    def get_reason(self) -> str:
-        """Get the reason for emergency stop."""
-        return EmergencyStop._reason
+    def get_reason(
+        self,
+        story_id: Optional[str] = None,
+        domain: Optional[str] = None,
+        wave: Optional[Any] = None
+    ) -> str:
+        """Get the reason for emergency stop (or for the scope stopping this work)."""
+        if EmergencyStop._active or not (story_id or domain or wave is not None):
+            return EmergencyStop._reason
+        scope = self._scope_match(story_id, domain, wave)
+        return EmergencyStop._scopes.get(scope, "") if scope else ""
 
     def is_active(self) -> bool:
         """Check if emergency stop is currently active."""
@@ -383,8 +747,69 @@ class EmergencyStop:
             "triggered_at": EmergencyStop._event.triggered_at if EmergencyStop._event else None,
             "source": EmergencyStop._event.source if EmergencyStop._event else None,
             "file_exists": Path(EMERGENCY_STOP_FILE).exists(),
+            "watcher": EmergencyStop._watcher.mode if EmergencyStop._watcher else None,
+            "scopes": dict(EmergencyStop._scopes),
         }
 
+    # ═══════════════════════════════════════════════════════════════════════════
+    # WATCHER METHODS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    @classmethod
+    def start_watcher(
+        cls,
+        mode: str = "auto",
+        poll_interval: float = DEFAULT_POLL_INTERVAL
+    ) -> StopFileWatcher:
+        """
+        Watch the stop file in the background so check() needs no syscalls.
+
+        Args:
+            mode: "inotify", "poll", or "auto" (inotify when available)
+            poll_interval: Seconds between checks in poll mode
+
+        Returns:
+            The running watcher (shared by the process)
+        """
+        with cls._lock:
+            if cls._watcher is not None:
+                return cls._watcher
+            cls._get_shared_flag()
+            watcher = StopFileWatcher(
+                EMERGENCY_STOP_FILE,
+                on_change=cls._on_file_change,
+                mode=mode,
+                poll_interval=poll_interval
+            )
+            cls._watcher = watcher.start()
+
+        if watcher.exists:
+            cls._on_file_change(True)
+        return watcher
+
+    @classmethod
+    def stop_watcher(cls) -> None:
+        """Stop the watcher; check() goes back to stat()ing the stop file."""
+        with cls._lock:
+            watcher, cls._watcher = cls._watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+    @classmethod
+    def _on_file_change(cls, exists: bool) -> None:
+        # Only appearance activates; clearing stays an explicit clear()/RESUME
+        if exists and not cls._active:
+            cls(watch=False).check_file()
+
+    @classmethod
+    def _get_shared_flag(cls) -> Optional[SharedStopFlag]:
+        if cls._shared_flag is None:
+            try:
+                cls._shared_flag = SharedStopFlag(EMERGENCY_STOP_FILE)
+            except (OSError, ValueError):
+                return None
+        return cls._shared_flag
+
     # ═══════════════════════════════════════════════════════════════════════════
     # CALLBACK METHODS
     # ═══════════════════════════════════════════════════════════════════════════
@@ -427,6 +852,16 @@ class EmergencyStop:
             pass
 
 
+    def _audit_event(self, reason: str, source: str, action: str) -> None:
+        """Record the event in the queryable safety audit log."""
+        if get_safety_event_store is None:
+            return
+        try:
+            get_safety_event_store().record_estop(reason, source, action)
+        except Exception:
+            pass
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # AGENT INTEGRATION
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -467,6 +902,14 @@ def require_no_emergency_stop(func: Callable) -> Callable:
 __all__ = [
     "EMERGENCY_STOP_FILE",
     "EMERGENCY_STOP_CHANNEL",
+    "EMERGENCY_ACK_CHANNEL",
+    "EMERGENCY_ACKS_KEY",
+    "EMERGENCY_WORKERS_KEY",
+    "EMERGENCY_SCOPES_KEY",
+    "SCOPE_KINDS",
+    "make_scope",
+    "scope_keys",
+    "ESTOP_WATCH_ENABLED",
     "EmergencyStopError",
     "EmergencyStopEvent",
     "EmergencyStop",
@@ -0,0 +1,212 @@
+"""
+WAVE v2 Halt Latency SLO
+
+Measures how long it takes every subscribed worker to halt after an
+emergency stop, against HALT_TIMEOUT_SECONDS.
+
+Protocol:
+1. Workers call EmergencyStop.subscribe(worker_id); the listener registers
+   the worker in wave:emergency:workers and refreshes a heartbeat.
+2. HaltAckCollector.trigger() snapshots the live workers, subscribes to
+   wave:emergency:ack, then triggers the stop with a fresh halt ID.
+3. Each worker activates its stop (running callbacks) and publishes an ack
+   with the halt ID, its worker ID and timestamps.
+4. The collector waits until every expected worker acked or the timeout
+   passes, and reports per-worker latency, p100 and stragglers.
+
+Latencies are measured on the collector's clock (ack arrival - trigger),
+so they include the return trip but not clock skew between hosts.
+
+Usage:
+    report = HaltAckCollector().trigger(EmergencyStop(), "Budget exceeded")
+    if not report.met_slo:
+        print(report.stragglers)
+"""
+
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .emergency_stop import (
+    EmergencyStop,
+    get_redis_client,
+    EMERGENCY_ACK_CHANNEL,
+    EMERGENCY_ACKS_KEY,
+    EMERGENCY_WORKERS_KEY,
+    HALT_TIMEOUT_SECONDS,
+    WORKER_HEARTBEAT_SECONDS,
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Workers whose last heartbeat is older than this are not expected to ack
+WORKER_TTL_SECONDS = 3 * WORKER_HEARTBEAT_SECONDS
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DATA TYPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class HaltReport:
+    """Outcome of one acknowledged halt."""
+    halt_id: str
+    reason: str
+    timeout_seconds: float
+    expected: List[str] = field(default_factory=list)
+    latencies: Dict[str, float] = field(default_factory=dict)
+    late_acks: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def stragglers(self) -> List[str]:
+        """Expected workers that did not ack within the timeout."""
+        return [w for w in self.expected if w not in self.latencies]
+
+    @property
+    def p100_latency(self) -> Optional[float]:
+        """Time to full halt (slowest ack); None if nobody acked."""
+        return max(self.latencies.values()) if self.latencies else None
+
+    @property
+    def p50_latency(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        values = sorted(self.latencies.values())
+        return values[len(values) // 2]
+
+    @property
+    def met_slo(self) -> bool:
+        return not self.stragglers and (self.p100_latency or 0.0) <= self.timeout_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "halt_id": self.halt_id,
+            "reason": self.reason,
+            "timeout_seconds": self.timeout_seconds,
+            "expected_workers": len(self.expected),
+            "acked_workers": len(self.latencies),
+            "p50_latency_ms": _ms(self.p50_latency),
+            "p100_latency_ms": _ms(self.p100_latency),
+            "stragglers": self.stragglers,
+            "late_acks_ms": {w: _ms(v) for w, v in self.late_acks.items()},
+            "met_slo": self.met_slo,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COLLECTOR
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class HaltAckCollector:
+    """
+    Triggers an emergency stop and collects worker acknowledgements.
+    """
+
+    def __init__(self, redis_client: Optional[Any] = None, worker_ttl: float = WORKER_TTL_SECONDS):
+        """
+        Args:
+            redis_client: Redis client (default: from REDIS_URL)
+            worker_ttl: Max heartbeat age for a worker to be expected
+        """
+        self.redis = redis_client or get_redis_client()
+        if self.redis is None:
+            raise RuntimeError("redis package not installed. Run: pip install redis")
+        self.worker_ttl = worker_ttl
+
+    def live_workers(self, now: Optional[float] = None) -> List[str]:
+        """Workers with a recent heartbeat."""
+        now = now or time.time()
+        workers = self.redis.hgetall(EMERGENCY_WORKERS_KEY)
+        return sorted(
+            worker for worker, seen in workers.items()
+            if now - float(seen) <= self.worker_ttl
+        )
+
+    def trigger(
+        self,
+        emergency_stop: EmergencyStop,
+        reason: str,
+        source: str = "api",
+        timeout: float = HALT_TIMEOUT_SECONDS
+    ) -> HaltReport:
+        """
+        Trigger the stop and wait for every live worker to acknowledge.
+
+        Args:
+            emergency_stop: EmergencyStop to trigger through
+            reason: Stop reason
+            source: Stop source (file, redis, api, safety)
+            timeout: Halt SLO in seconds
+
+        Returns:
+            HaltReport (also written to the emergency stop log)
+        """
+        halt_id = uuid.uuid4().hex
+        report = HaltReport(
+            halt_id=halt_id,
+            reason=reason,
+            timeout_seconds=timeout,
+            expected=self.live_workers()
+        )
+
+        # Subscribe before triggering so no ack is missed
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(EMERGENCY_ACK_CHANNEL)
+        try:
+            sent_at = time.time()
+            emergency_stop.trigger(reason, source=source, halt_id=halt_id)
+            deadline = sent_at + timeout
+            pending = set(report.expected)
+
+            while pending and time.time() < deadline:
+                message = pubsub.get_message(timeout=max(0.0, min(0.05, deadline - time.time())))
+                if not message or message["type"] != "message":
+                    continue
+                try:
+                    ack = json.loads(message["data"])
+                except (ValueError, TypeError):
+                    continue
+                if ack.get("halt_id") != halt_id:
+                    continue
+                report.latencies[ack["worker_id"]] = time.time() - sent_at
+                pending.discard(ack["worker_id"])
+        finally:
+            pubsub.close()
+
+        # Acks recorded but missed on the channel, or that arrived late
+        for worker, raw in self.redis.hgetall(EMERGENCY_ACKS_KEY.format(halt_id=halt_id)).items():
+            if worker in report.latencies:
+                continue
+            halted_at = json.loads(raw).get("halted_at", sent_at)
+            latency = max(0.0, halted_at - sent_at)
+            if latency <= timeout:
+                report.latencies[worker] = latency
+            else:
+                report.late_acks[worker] = latency
+
+        emergency_stop._log_event(
+            f"Halt {halt_id}: {len(report.latencies)}/{len(report.expected)} acked, "
+            f"p100={_ms(report.p100_latency)}ms, stragglers={report.stragglers}, "
+            f"SLO {'met' if report.met_slo else 'MISSED'}"
+        )
+        return report
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "WORKER_TTL_SECONDS",
+    "HaltReport",
+    "HaltAckCollector",
+]
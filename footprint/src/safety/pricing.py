@@ -0,0 +1,170 @@
+"""
+WAVE v2 Model Pricing
+
+Central pricing registry keyed by exact model ID, with separate input,
+output, cache-read and cache-write rates, and a usage-accounting helper
+that takes provider usage metadata directly.
+
+Usage:
+    response = llm.invoke(messages)
+    usage = usage_cost("claude-sonnet-4-20250514", response.usage_metadata)
+    usage.total_tokens, usage.cost_usd
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PRICING TYPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class ModelPricing:
+    """USD per million tokens."""
+    input: float
+    output: float
+    cache_read: float
+    cache_write: float
+
+    def cost(
+        self,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
+    ) -> float:
+        """Cost in USD for a token breakdown (input excludes cached tokens)."""
+        return (
+            input_tokens * self.input
+            + output_tokens * self.output
+            + cache_read_tokens * self.cache_read
+            + cache_write_tokens * self.cache_write
+        ) / 1_000_000
+
+
+@dataclass
+class UsageCost:
+    """Token breakdown and cost of one LLM call."""
+    model: str
+    input_tokens: int = 0  # Uncached input
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return (
+            self.input_tokens + self.output_tokens
+            + self.cache_read_tokens + self.cache_write_tokens
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PRICING REGISTRY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Exact model ID -> pricing (USD per million tokens)
+MODEL_PRICING: Dict[str, ModelPricing] = {
+    # Claude 4
+    "claude-opus-4-5-20250514": ModelPricing(input=5.00, output=25.00, cache_read=0.50, cache_write=6.25),
+    "claude-opus-4-20250514": ModelPricing(input=15.00, output=75.00, cache_read=1.50, cache_write=18.75),
+    "claude-sonnet-4-20250514": ModelPricing(input=3.00, output=15.00, cache_read=0.30, cache_write=3.75),
+    # Claude 3.x
+    "claude-3-5-sonnet-20241022": ModelPricing(input=3.00, output=15.00, cache_read=0.30, cache_write=3.75),
+    "claude-3-5-haiku-20241022": ModelPricing(input=0.80, output=4.00, cache_read=0.08, cache_write=1.00),
+    "claude-3-opus-20240229": ModelPricing(input=15.00, output=75.00, cache_read=1.50, cache_write=18.75),
+    "claude-3-sonnet-20240229": ModelPricing(input=3.00, output=15.00, cache_read=3.00, cache_write=3.00),
+    # Grok
+    "grok-3": ModelPricing(input=3.00, output=15.00, cache_read=0.75, cache_write=3.00),
+}
+
+# Short names used in configs and older code -> exact model ID
+MODEL_ALIASES: Dict[str, str] = {
+    "claude-3-sonnet": "claude-3-sonnet-20240229",
+    "claude-3-opus": "claude-3-opus-20240229",
+    "claude-3-5-sonnet": "claude-3-5-sonnet-20241022",
+    "claude-3-5-haiku": "claude-3-5-haiku-20241022",
+    "claude-sonnet-4": "claude-sonnet-4-20250514",
+    "claude-opus-4": "claude-opus-4-20250514",
+    "claude-opus-4-5": "claude-opus-4-5-20250514",
+    "grok": "grok-3",
+}
+
+# Used for unknown models: the dev default (Sonnet 4)
+DEFAULT_PRICING_MODEL = "claude-sonnet-4-20250514"
+
+
+def get_model_pricing(model: Optional[str]) -> ModelPricing:
+    """
+    Pricing for a model ID.
+
+    Resolves exact IDs, then aliases, then the longest registered ID the
+    model starts with (e.g. a dated variant), then the default.
+    """
+    if model in MODEL_PRICING:
+        return MODEL_PRICING[model]
+    if model in MODEL_ALIASES:
+        return MODEL_PRICING[MODEL_ALIASES[model]]
+    if model:
+        for known in sorted(MODEL_PRICING, key=len, reverse=True):
+            if model.startswith(known):
+                return MODEL_PRICING[known]
+    return MODEL_PRICING[DEFAULT_PRICING_MODEL]
+
+
+def usage_cost(model: str, usage: Optional[Dict[str, Any]]) -> UsageCost:
+    """
+    Account for one call from provider usage metadata.
+
+    Accepts both shapes:
+    - LangChain usage_metadata: input_tokens includes cached tokens, with
+      input_token_details.cache_read / cache_creation breaking them out
+    - Anthropic API usage: input_tokens excludes cached tokens, with
+      cache_read_input_tokens / cache_creation_input_tokens alongside
+
+    Args:
+        model: Model ID the call was made with
+        usage: usage_metadata (or raw usage) dict; None counts as zero
+
+    Returns:
+        UsageCost with token breakdown and USD cost
+    """
+    usage = usage or {}
+    output_tokens = int(usage.get("output_tokens") or 0)
+
+    if "input_token_details" in usage:
+        details = usage.get("input_token_details") or {}
+        cache_read = int(details.get("cache_read") or 0)
+        cache_write = int(details.get("cache_creation") or 0)
+        input_tokens = max(0, int(usage.get("input_tokens") or 0) - cache_read - cache_write)
+    else:
+        cache_read = int(usage.get("cache_read_input_tokens") or 0)
+        cache_write = int(usage.get("cache_creation_input_tokens") or 0)
+        input_tokens = int(usage.get("input_tokens") or 0)
+
+    pricing = get_model_pricing(model)
+    return UsageCost(
+        model=model,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_read_tokens=cache_read,
+        cache_write_tokens=cache_write,
+        cost_usd=pricing.cost(input_tokens, output_tokens, cache_read, cache_write),
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "ModelPricing",
+    "UsageCost",
+    "MODEL_PRICING",
+    "MODEL_ALIASES",
+    "DEFAULT_PRICING_MODEL",
+    "get_model_pricing",
+    "usage_cost",
+]
@@ -0,0 +1,259 @@
+"""
+WAVE v2 Emergency Stop Watcher
+
+Keeps EmergencyStop.check() off the filesystem. Instead of a stat() of the
+stop file on every agent loop iteration (which goes over the network on
+shared volumes), a background thread watches the file and the check reads
+cached flags:
+
+1. StopFileWatcher - inotify on the stop file's directory (Linux), or
+   polling at poll_interval elsewhere / when inotify is unavailable. In
+   inotify mode the file is also re-checked every resync_interval, because
+   inotify does not see changes made by other hosts on network filesystems.
+2. SharedStopFlag - a one-page mmap'd file in /dev/shm (or the temp dir)
+   keyed on the stop file path. trigger() sets it, so sibling processes on
+   the same host see the stop on their next check() without waiting for
+   their watcher. The flag is only a hint: check() confirms it against the
+   stop file and clears it if the file has been removed by hand.
+
+Both are memory reads on the hot path: check() makes no syscalls while the
+stop is inactive.
+
+Usage:
+    EmergencyStop.start_watcher()          # or EmergencyStop(watch=True)
+    es = EmergencyStop()
+    if es.check():                         # memory read
+        raise EmergencyStopError(es.get_reason())
+"""
+
+import os
+import sys
+import time
+import mmap
+import select
+import struct
+import hashlib
+import tempfile
+import threading
+from typing import Callable, Optional
+
+# inotify via libc (Linux only)
+try:
+    import ctypes
+    import ctypes.util
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    INOTIFY_AVAILABLE = sys.platform.startswith("linux") and hasattr(_libc, "inotify_init1")
+except (ImportError, OSError):
+    _libc = None
+    INOTIFY_AVAILABLE = False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Polling interval when inotify is unavailable
+DEFAULT_POLL_INTERVAL = 0.25
+
+# Safety re-check of the file in inotify mode (network filesystems)
+DEFAULT_RESYNC_INTERVAL = 5.0
+
+# inotify event masks (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+    IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Shared flag layout: byte 0 = active, bytes 8..16 = generation counter
+_FLAG_SIZE = 16
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SHARED FLAG
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SharedStopFlag:
+    """
+    Host-wide stop flag in shared memory (mmap of a small file).
+    """
+
+    def __init__(self, stop_file: str, path: Optional[str] = None):
+        """
+        Args:
+            stop_file: Stop file the flag mirrors (keys the flag file)
+            path: Explicit flag file path (default: /dev/shm or temp dir)
+        """
+        if path is None:
+            key = hashlib.sha256(os.path.abspath(stop_file).encode()).hexdigest()[:16]
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            path = os.path.join(base, f"wave-estop-{key}")
+        self.path = path
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            if os.fstat(fd).st_size < _FLAG_SIZE:
+                os.ftruncate(fd, _FLAG_SIZE)
+            self._mm = mmap.mmap(fd, _FLAG_SIZE)
+        finally:
+            os.close(fd)
+
+    def is_set(self) -> bool:
+        return self._mm[0] == 1
+
+    @property
+    def generation(self) -> int:
+        return struct.unpack_from("Q", self._mm, 8)[0]
+
+    def set(self) -> None:
+        struct.pack_into("Q", self._mm, 8, self.generation + 1)
+        self._mm[0] = 1
+
+    def clear(self) -> None:
+        struct.pack_into("Q", self._mm, 8, self.generation + 1)
+        self._mm[0] = 0
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FILE WATCHER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StopFileWatcher:
+    """
+    Watches the stop file and keeps a cached exists flag.
+    """
+
+    def __init__(
+        self,
+        stop_file: str,
+        on_change: Optional[Callable[[bool], None]] = None,
+        mode: str = "auto",
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        resync_interval: float = DEFAULT_RESYNC_INTERVAL
+    ):
+        """
+        Args:
+            stop_file: File whose presence means "stop"
+            on_change: Called with the new exists state when it changes
+            mode: "inotify", "poll", or "auto" (inotify when available)
+            poll_interval: Seconds between checks in poll mode
+            resync_interval: Seconds between safety re-checks in inotify mode
+        """
+        self.path = os.path.abspath(stop_file)
+        self.directory = os.path.dirname(self.path)
+        self.name = os.path.basename(self.path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        self.mode = "inotify" if mode == "auto" and INOTIFY_AVAILABLE else mode
+        if self.mode == "auto":
+            self.mode = "poll"
+
+        self.exists = os.path.exists(self.path)
+        self._last_resync = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StopFileWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="estop-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.poll_interval, 1.0) + 1.0)
+            self._thread = None
+
+    def _refresh(self) -> None:
+        exists = os.path.exists(self.path)
+        if exists != self.exists:
+            self.exists = exists
+            if self.on_change:
+                try:
+                    self.on_change(exists)
+                except Exception as e:
+                    print(f"[EStopWatcher] Callback error: {e}", file=sys.stderr)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.mode == "inotify" and os.path.isdir(self.directory):
+                if self._run_inotify():
+                    continue
+                # inotify failed (e.g. watch limit reached) - poll from now on
+                self.mode = "poll"
+            self._refresh()
+            self._stop.wait(self.poll_interval)
+
+    def _run_inotify(self) -> bool:
+        """Watch until stopped or the directory goes away. False on setup failure."""
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+        try:
+            if _libc.inotify_add_watch(fd, self.directory.encode(), _WATCH_MASK) < 0:
+                return False
+            # Anything that changed before the watch was in place
+            self._refresh()
+
+            while not self._stop.is_set():
+                readable, _, _ = select.select([fd], [], [], min(self.resync_interval, 1.0))
+                if not readable:
+                    self._resync_tick()
+                    continue
+                try:
+                    data = os.read(fd, 4096)
+                except BlockingIOError:
+                    continue
+
+                relevant = dir_gone = False
+                offset = 0
+                while offset + _EVENT_HEADER.size <= len(data):
+                    _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                    offset += _EVENT_HEADER.size
+                    name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                    offset += length
+                    if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                        dir_gone = True
+                    if name == self.name:
+                        relevant = True
+
+                if relevant or dir_gone:
+                    self._refresh()
+                if dir_gone:
+                    return True
+            return True
+        finally:
+            os.close(fd)
+
+    def _resync_tick(self) -> None:
+        now = time.monotonic()
+        if now - self._last_resync >= self.resync_interval:
+            self._last_resync = now
+            self._refresh()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "INOTIFY_AVAILABLE",
+    "SharedStopFlag",
+    "StopFileWatcher",
+]
@@ -0,0 +1,310 @@
+"""
+WAVE v2 Token Counting
+
+Tokenizer-backed token counts for budget reservations and context fitting.
+
+Backends, per model family, in order of preference:
+1. HuggingFace tokenizer.json from WAVE_TOKENIZER_DIR/<family>.json
+   (requires the `tokenizers` package; works offline)
+2. tiktoken encoding (requires `tiktoken` and its BPE files, which are
+   read from TIKTOKEN_CACHE_DIR when offline)
+3. Built-in BPE-shaped heuristic - counts words, digit groups, punctuation
+   and non-ASCII characters separately, which tracks real tokenizers far
+   better than len(text) // 4 (especially for Hebrew UI copy and code)
+
+Counts are cached by content hash, objects are counted without
+re-serializing them, and IncrementalTokenCounter counts appended text only.
+"""
+
+import os
+import re
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    from tokenizers import Tokenizer
+    HF_TOKENIZERS_AVAILABLE = True
+except ImportError:
+    HF_TOKENIZERS_AVAILABLE = False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+TOKENIZER_DIR = os.getenv("WAVE_TOKENIZER_DIR", ".claude/tokenizers")
+
+# Model ID prefix -> (family, tiktoken encoding or None, heuristic chars per word-token)
+MODEL_TOKENIZERS = {
+    "claude": ("claude", None, 3.5),
+    "grok": ("grok", "o200k_base", 4.0),
+    "gpt-4o": ("openai", "o200k_base", 4.0),
+    "gpt-4": ("openai", "cl100k_base", 4.0),
+    "default": ("default", None, 4.0),
+}
+
+# Cache sizes
+COUNT_CACHE_SIZE = 8192
+
+# Texts longer than this are cached by digest instead of by value
+_HASH_KEY_MIN_CHARS = 256
+
+# JSON structure overhead per container element (braces, quotes, colon, comma)
+_JSON_OVERHEAD_TOKENS = 2
+
+# Word-ish runs, digit groups (BPE vocabularies split digits in 1-3s),
+# single punctuation / non-ASCII chars, and whitespace runs
+_HEURISTIC_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]|\s+")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TOKEN COUNTER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TokenCounter:
+    """
+    Per-model token counter with a content-hash cache.
+
+    Usage:
+        counter = get_token_counter()
+        counter.count("some prompt", "claude-sonnet-4-20250514")
+        counter.count_object(p_variable)
+    """
+
+    def __init__(self, cache_size: int = COUNT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, int]" = OrderedDict()
+        self._encoders: Dict[str, tuple] = {}  # cache key -> (backend name, encode fn)
+        self._lock = threading.Lock()
+
+    def backend_for(self, model: str = "default") -> str:
+        """Name of the backend used for a model (for diagnostics)."""
+        return self._encoder(model)[0]
+
+    def count(self, text: str, model: str = "default") -> int:
+        """
+        Count tokens in text.
+
+        Args:
+            text: Text to count
+            model: Model ID (exact or prefix from MODEL_TOKENIZERS)
+
+        Returns:
+            Token count
+        """
+        if not text:
+            return 0
+
+        backend, encode = self._encoder(model)
+        if len(text) >= _HASH_KEY_MIN_CHARS:
+            key = (backend, hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+        else:
+            key = (backend, text)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        tokens = encode(text)
+
+        with self._lock:
+            self._cache[key] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def count_object(self, obj: Any, model: str = "default") -> int:
+        """
+        Count tokens of an object as it would appear serialized to JSON,
+        without serializing it. Leaf strings hit the count cache, so
+        re-counting a mostly unchanged P Variable is cheap.
+        """
+        if obj is None:
+            return 1
+        if isinstance(obj, str):
+            return self.count(obj, model) + 1
+        if isinstance(obj, bool) or isinstance(obj, (int, float)):
+            return self.count(str(obj), model)
+        if isinstance(obj, dict):
+            return 1 + sum(
+                self.count(str(k), model) + self.count_object(v, model) + _JSON_OVERHEAD_TOKENS
+                for k, v in obj.items()
+            )
+        if isinstance(obj, (list, tuple, set)):
+            return 1 + sum(self.count_object(v, model) + 1 for v in obj)
+        return self.count(str(obj), model)
+
+    def incremental(self, model: str = "default") -> "IncrementalTokenCounter":
+        """Create a counter for a growing text (streamed output, chat transcript)."""
+        return IncrementalTokenCounter(self, model)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # BACKENDS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _encoder(self, model: str) -> tuple:
+        family, encoding, chars_per_token = _model_spec(model)
+        cache_key = f"{family}:{encoding}"
+        encoder = self._encoders.get(cache_key)
+        if encoder is None:
+            encoder = (
+                self._load_hf(family)
+                or self._load_tiktoken(encoding)
+                or (f"heuristic:{family}", lambda text: heuristic_token_count(text, chars_per_token))
+            )
+            self._encoders[cache_key] = encoder
+        return encoder
+
+    @staticmethod
+    def _load_hf(family: str) -> Optional[tuple]:
+        path = os.path.join(TOKENIZER_DIR, f"{family}.json")
+        if not HF_TOKENIZERS_AVAILABLE or not os.path.exists(path):
+            return None
+        try:
+            tokenizer = Tokenizer.from_file(path)
+        except Exception:
+            return None
+        return (f"hf:{family}", lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids))
+
+    @staticmethod
+    def _load_tiktoken(encoding: Optional[str]) -> Optional[tuple]:
+        if not encoding or not TIKTOKEN_AVAILABLE:
+            return None
+        try:
+            enc = tiktoken.get_encoding(encoding)
+        except Exception:
+            # BPE file not cached and no network
+            return None
+        return (f"tiktoken:{encoding}", lambda text: len(enc.encode(text, disallowed_special=())))
+
+
+def _model_spec(model: str) -> tuple:
+    model = (model or "default").lower()
+    for prefix in sorted(MODEL_TOKENIZERS, key=len, reverse=True):
+        if model.startswith(prefix):
+            return MODEL_TOKENIZERS[prefix]
+    return MODEL_TOKENIZERS["default"]
+
+
+def heuristic_token_count(text: str, chars_per_token: float = 4.0) -> int:
+    """
+    Tokenizer-free estimate shaped like BPE pre-tokenization.
+
+    Letter runs cost ceil(len / chars_per_token) (at least 1), digit groups
+    and punctuation cost 1, non-ASCII characters cost 1 each, and only
+    multi-character whitespace runs (indentation, blank lines) cost a token.
+    """
+    tokens = 0
+    for match in _HEURISTIC_RE.finditer(text):
+        run = match.group(0)
+        first = run[0]
+        if first.isspace():
+            tokens += 1 if len(run) > 1 else 0
+        elif first.isascii() and first.isalpha():
+            tokens += max(1, math.ceil(len(run) / chars_per_token))
+        else:
+            tokens += 1
+    return tokens
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INCREMENTAL COUNTING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class IncrementalTokenCounter:
+    """
+    Token count of a text that only grows.
+
+    Text up to the last whitespace boundary is counted once and committed;
+    only the open tail is re-counted on each append, so tokens that merge
+    across chunk boundaries are still counted correctly.
+    """
+
+    # Tails without whitespace are committed once they grow past this
+    MAX_TAIL_CHARS = 256
+
+    def __init__(self, counter: TokenCounter, model: str = "default"):
+        self.counter = counter
+        self.model = model
+        self._committed = 0
+        self._tail = ""
+
+    @property
+    def total(self) -> int:
+        return self._committed + self.counter.count(self._tail, self.model)
+
+    def append(self, text: str) -> int:
+        """
+        Add text and return the running total.
+        """
+        if not text:
+            return self.total
+
+        pending = self._tail + text
+        cut = max(pending.rfind(" "), pending.rfind("\n"))
+        # Keep the whole whitespace run in the tail (it belongs to the next token)
+        while cut > 0 and pending[cut - 1].isspace():
+            cut -= 1
+        if cut <= 0 and len(pending) > self.MAX_TAIL_CHARS:
+            cut = len(pending) - self.MAX_TAIL_CHARS // 2
+        if cut > 0:
+            self._committed += self.counter.count(pending[:cut], self.model)
+            pending = pending[cut:]
+        self._tail = pending
+        return self.total
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HELPER FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Global singleton
+_token_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Get or create global token counter instance"""
+    global _token_counter
+    if _token_counter is None:
+        _token_counter = TokenCounter()
+    return _token_counter
+
+
+def count_tokens(text: str, model: str = "default") -> int:
+    """Count tokens in text with the global counter."""
+    return get_token_counter().count(text, model)
+
+
+def count_object_tokens(obj: Any, model: str = "default") -> int:
+    """Count tokens of a JSON-like object with the global counter."""
+    return get_token_counter().count_object(obj, model)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "MODEL_TOKENIZERS",
+    "TokenCounter",
+    "IncrementalTokenCounter",
+    "get_token_counter",
+    "count_tokens",
+    "count_object_tokens",
+    "heuristic_token_count",
+]
@@ -0,0 +1,266 @@
+"""
+WAVE v2 Usage Events
+
+Per-call token/cost events published by agents and MultiLLMClient to a Redis
+stream, so budget monitors (RLMAuditor) react within milliseconds of a call
+instead of on a polling interval.
+
+A stream is used rather than plain pub/sub so a monitor that restarts picks
+up from its last event ID instead of missing calls made while it was down.
+
+Usage:
+    # Producer (after each LLM call)
+    publish_usage(story_id, "fe", model, response.usage_metadata, agent="fe-1")
+
+    # Consumer
+    UsageEventSubscriber().listen(on_event, on_idle=heartbeat, block_ms=300_000)
+"""
+
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional
+
+# Redis client
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from .pricing import usage_cost
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+USAGE_EVENTS_STREAM = "wave:usage:events"
+
+# Approximate cap on stream length (XADD MAXLEN ~)
+USAGE_EVENTS_MAXLEN = 100_000
+
+# Max seconds a publish may block the LLM call path when Redis is unreachable
+USAGE_EVENTS_SOCKET_TIMEOUT = 1.0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DATA TYPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class UsageEvent:
+    """One LLM call's usage."""
+    story_id: str
+    domain: str
+    model: str
+    tokens: int
+    cost_usd: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    agent: str = ""
+    timestamp: float = 0.0
+
+    def to_fields(self) -> Dict[str, str]:
+        """Flat string fields for XADD."""
+        return {key: str(value) for key, value in asdict(self).items()}
+
+    @classmethod
+    def from_fields(cls, fields: Dict[str, str]) -> "UsageEvent":
+        return cls(
+            story_id=fields.get("story_id", ""),
+            domain=fields.get("domain", ""),
+            model=fields.get("model", ""),
+            tokens=int(fields.get("tokens", 0) or 0),
+            cost_usd=float(fields.get("cost_usd", 0.0) or 0.0),
+            input_tokens=int(fields.get("input_tokens", 0) or 0),
+            output_tokens=int(fields.get("output_tokens", 0) or 0),
+            agent=fields.get("agent", ""),
+            timestamp=float(fields.get("timestamp", 0.0) or 0.0),
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PUBLISHER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class UsageEventPublisher:
+    """
+    Publishes usage events. Never raises: a monitoring outage must not fail
+    the LLM call that was already paid for.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self._redis = None
+        if REDIS_AVAILABLE:
+            try:
+                self._redis = redis.from_url(
+                    redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"),
+                    decode_responses=True,
+                    socket_timeout=USAGE_EVENTS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=USAGE_EVENTS_SOCKET_TIMEOUT
+                )
+            except Exception as e:
+                print(f"[UsageEvents] Redis unavailable: {e}")
+
+    def publish(self, event: UsageEvent) -> bool:
+        """
+        Append an event to the usage stream.
+
+        Returns:
+            True if published
+        """
+        if not self._redis:
+            return False
+        if not event.timestamp:
+            event.timestamp = time.time()
+        try:
+            self._redis.xadd(
+                USAGE_EVENTS_STREAM,
+                event.to_fields(),
+                maxlen=USAGE_EVENTS_MAXLEN,
+                approximate=True
+            )
+            return True
+        except Exception as e:
+            print(f"[UsageEvents] Publish error: {e}")
+            return False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SUBSCRIBER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class UsageEventSubscriber:
+    """
+    Reads usage events from the stream as they arrive (blocking XREAD).
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, last_id: str = "$"):
+        """
+        Args:
+            redis_url: Redis connection URL (default: from env or localhost)
+            last_id: Stream ID to read after ("$" = only new events)
+
+        Raises:
+            RuntimeError: If redis is not installed or the server is unreachable
+        """
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package not installed. Run: pip install redis")
+
+        self.redis = redis.from_url(
+            redis_url or os.getenv("REDIS_URL", "redis://localhost:6379"),
+            decode_responses=True,
+            socket_connect_timeout=USAGE_EVENTS_SOCKET_TIMEOUT
+        )
+        try:
+            self.redis.ping()
+        except redis.RedisError as e:
+            raise RuntimeError(f"Redis unavailable: {e}") from e
+        self.last_id = last_id
+        self._running = False
+
+    def listen(
+        self,
+        on_event: Callable[[UsageEvent], None],
+        on_idle: Optional[Callable[[], None]] = None,
+        block_ms: int = 60_000
+    ) -> None:
+        """
+        Dispatch events until stop() is called.
+
+        Args:
+            on_event: Called for each event, in stream order
+            on_idle: Called when no event arrived within block_ms (heartbeat)
+            block_ms: Max time to block waiting for events
+
+        Raises:
+            RuntimeError: If the connection to Redis is lost
+        """
+        self._running = True
+        while self._running:
+            try:
+                entries = self.redis.xread({USAGE_EVENTS_STREAM: self.last_id}, block=block_ms, count=100)
+            except redis.RedisError as e:
+                self._running = False
+                raise RuntimeError(f"Redis connection lost: {e}") from e
+            if not entries:
+                if on_idle:
+                    on_idle()
+                continue
+            for _stream, messages in entries:
+                for message_id, fields in messages:
+                    self.last_id = message_id
+                    try:
+                        on_event(UsageEvent.from_fields(fields))
+                    except Exception as e:
+                        print(f"[UsageEvents] Handler error: {e}")
+
+    def stop(self) -> None:
+        self._running = False
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HELPER FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Global singleton
+_usage_publisher: Optional[UsageEventPublisher] = None
+
+
+def get_usage_publisher() -> UsageEventPublisher:
+    """Get or create global usage event publisher instance"""
+    global _usage_publisher
+    if _usage_publisher is None:
+        _usage_publisher = UsageEventPublisher()
+    return _usage_publisher
+
+
+def publish_usage(
+    story_id: str,
+    domain: str,
+    model: str,
+    usage_metadata: Optional[Dict[str, Any]],
+    agent: str = ""
+) -> UsageEvent:
+    """
+    Price a call's usage metadata and publish it.
+
+    Args:
+        story_id: Story the call was made for
+        domain: Agent domain (fe, be, qa, cto, ...)
+        model: Exact model ID
+        usage_metadata: response.usage_metadata (or raw provider usage)
+        agent: Agent instance ID
+
+    Returns:
+        The published UsageEvent (also returned when Redis is unavailable)
+    """
+    usage = usage_cost(model, usage_metadata)
+    event = UsageEvent(
+        story_id=story_id,
+        domain=domain,
+        model=model,
+        tokens=usage.total_tokens,
+        cost_usd=usage.cost_usd,
+        input_tokens=usage.input_tokens + usage.cache_read_tokens + usage.cache_write_tokens,
+        output_tokens=usage.output_tokens,
+        agent=agent,
+        timestamp=time.time(),
+    )
+    get_usage_publisher().publish(event)
+    return event
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "USAGE_EVENTS_STREAM",
+    "UsageEvent",
+    "UsageEventPublisher",
+    "UsageEventSubscriber",
+    "get_usage_publisher",
+    "publish_usage",
+]
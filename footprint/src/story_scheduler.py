@@ -0,0 +1,747 @@
+"""
+WAVE Story Scheduler - dependency-aware dispatch of a whole wave
+
+Builds a DAG of a wave's stories and dispatches them to the TaskQueue as
+soon as they are safe to run, instead of one story at a time.
+
+Constraints:
+- Dependencies: a story waits for the stories in its `dependencies`
+  (list form, or {required_before, blocks}). Dependencies outside the wave
+  are taken as done by earlier waves.
+- File conflicts: stories that create/modify the same file never run at the
+  same time. Conflicts are exclusion constraints, not fixed edges, so
+  whichever conflicting story is ready first goes first.
+- File leases (optional): with a FileLeaseManager, a story is only
+  dispatched once it holds leases on its files, which also guards against
+  other waves and agents working outside this scheduler. run() renews the
+  leases of running stories every third of the lease TTL.
+- Budget (optional): with a BudgetForecaster, ready stories are only
+  dispatched while the projected spend fits the wave budget, and tasks
+  switch to the next cheaper model tier once a downgrade is recommended.
+  Stories still held once nothing is in flight (no completion can change
+  the forecast) fail with the forecast as the error.
+
+Priority is critical-path-first: among ready stories, the one with the
+longest chain of (estimated) work still depending on it is dispatched
+first, which minimises the wave's makespan for a given number of workers.
+
+Usage:
+    dag = StoryDAG.from_wave_dir("stories/wave8")
+    scheduler = WaveScheduler(dag, max_parallel=4)
+    results = scheduler.run(get_task_queue())
+
+    # Offline: replay durations and compare with sequential dispatch
+    report = simulate_schedule(dag, durations, workers={"fe": 1, "be": 2, "qa": 1})
+"""
+
+import os
+import json
+import time
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .task_queue import (
+    AgentTask,
+    TaskQueue,
+    TaskResult,
+    TaskStatus,
+    create_task_id,
+    get_queue_for_domain,
+)
+from .file_leases import FileLeaseManager
+from .safety.budget_forecast import BudgetForecast, BudgetForecaster, ForecastAction
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Duration estimates when a story has no recorded duration
+DEFAULT_STORY_SECONDS = 3600.0
+SECONDS_PER_STORY_POINT = 1800.0
+SECONDS_PER_1K_TOKENS = 60.0
+
+# Keys of files.* that mean the story writes the file (older waves use
+# created/modified)
+WRITE_FILE_KEYS = ("create", "modify", "created", "modified")
+
+# Agent queue per story domain when agent_assignment does not say
+STORY_DOMAIN_QUEUES = {
+    "frontend": "fe",
+    "backend": "be",
+    "fullstack": "be",
+    "integration": "be",
+    "security": "be",
+    "qa": "qa",
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DATA TYPES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class StoryNode:
+    """A story in the wave DAG."""
+    story_id: str
+    queue_domain: str                                   # fe, be, qa, ...
+    duration: float                                     # Estimated seconds
+    files: Set[str] = field(default_factory=set)        # create + modify
+    depends_on: Set[str] = field(default_factory=set)   # In-wave stories
+    external_deps: Set[str] = field(default_factory=set)
+    dependents: Set[str] = field(default_factory=set)
+    conflicts: Set[str] = field(default_factory=set)    # Same-file stories
+    critical_path: float = 0.0                          # Own + longest downstream
+    story: Dict[str, Any] = field(default_factory=dict)
+
+
+class StoryCycleError(ValueError):
+    """Raised when wave dependencies form a cycle."""
+    def __init__(self, stories: List[str]):
+        self.stories = stories
+        super().__init__(f"Dependency cycle between stories: {', '.join(stories)}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# HELPER FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _normalize_path(path: str) -> str:
+    path = os.path.normpath(path.strip())
+    return path[2:] if path.startswith("./") else path
+
+
+def story_id_of(story: Dict[str, Any], fallback: str = "") -> str:
+    return story.get("story_id") or story.get("id") or fallback
+
+
+def story_dependencies(story: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+    """
+    Dependencies of a story.
+
+    Returns:
+        (stories it requires, stories it blocks)
+    """
+    deps = story.get("dependencies") or []
+    if isinstance(deps, dict):
+        return set(deps.get("required_before") or []), set(deps.get("blocks") or [])
+    return {d for d in deps if isinstance(d, str)}, set()
+
+
+def story_write_files(story: Dict[str, Any]) -> Set[str]:
+    """Normalized paths the story creates or modifies."""
+    files = story.get("files") or {}
+    if not isinstance(files, dict):
+        return set()
+    paths = set()
+    for key in WRITE_FILE_KEYS:
+        for path in files.get(key) or []:
+            if isinstance(path, dict):
+                path = path.get("path", "")
+            if path:
+                paths.add(_normalize_path(path))
+    return paths
+
+
+def story_queue_domain(story: Dict[str, Any]) -> str:
+    """Agent queue domain (fe, be, qa) for a story."""
+    agent = str(story.get("agent_assignment") or story.get("agent") or "").lower()
+    for prefix in ("fe", "be", "qa"):
+        if agent.startswith(prefix):
+            return prefix
+    return STORY_DOMAIN_QUEUES.get(str(story.get("domain", "")).lower(), "be")
+
+
+def estimate_duration(story: Dict[str, Any]) -> float:
+    """
+    Estimated story duration in seconds.
+
+    Uses, in order: duration_seconds, actual/estimated tokens, story points.
+    """
+    if story.get("duration_seconds"):
+        return float(story["duration_seconds"])
+    tokens = story.get("actual_tokens") or story.get("estimated_tokens")
+    if tokens:
+        return float(tokens) / 1000 * SECONDS_PER_1K_TOKENS
+    if story.get("story_points"):
+        return float(story["story_points"]) * SECONDS_PER_STORY_POINT
+    return DEFAULT_STORY_SECONDS
+
+
+def load_durations(path: str) -> Dict[str, float]:
+    """
+    Load historical story durations.
+
+    Accepts a JSON object {story_id: seconds}, or JSON lines / a JSON list of
+    task results ({"story_id", "duration_seconds"}); task durations of the
+    same story are summed.
+    """
+    with open(path) as f:
+        content = f.read().strip()
+    if not content:
+        return {}
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        data = [json.loads(line) for line in content.splitlines() if line.strip()]
+    if isinstance(data, dict) and "story_id" not in data:
+        return {k: float(v) for k, v in data.items()}
+
+    records = data if isinstance(data, list) else [data]
+    durations: Dict[str, float] = {}
+    for record in records:
+        story_id = record.get("story_id")
+        if story_id:
+            durations[story_id] = durations.get(story_id, 0.0) + float(record.get("duration_seconds", 0.0))
+    return durations
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STORY DAG
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StoryDAG:
+    """
+    Stories of one wave with their dependency edges and file conflicts.
+    """
+
+    def __init__(self, stories: List[Dict[str, Any]], durations: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            stories: Story dicts (one wave)
+            durations: Known durations by story ID (default: estimate_duration)
+
+        Raises:
+            StoryCycleError: If dependencies form a cycle
+        """
+        durations = durations or {}
+        self.nodes: Dict[str, StoryNode] = {}
+        for i, story in enumerate(stories):
+            story_id = story_id_of(story, f"story-{i}")
+            self.nodes[story_id] = StoryNode(
+                story_id=story_id,
+                queue_domain=story_queue_domain(story),
+                duration=float(durations.get(story_id, estimate_duration(story))),
+                files=story_write_files(story),
+                story=story
+            )
+
+        # Dependency edges (blocks is the reverse of required_before)
+        for node in self.nodes.values():
+            required, blocks = story_dependencies(node.story)
+            for dep in required:
+                if dep in self.nodes and dep != node.story_id:
+                    node.depends_on.add(dep)
+                elif dep not in self.nodes:
+                    node.external_deps.add(dep)
+            for blocked in blocks:
+                if blocked in self.nodes and blocked != node.story_id:
+                    self.nodes[blocked].depends_on.add(node.story_id)
+        for node in self.nodes.values():
+            for dep in node.depends_on:
+                self.nodes[dep].dependents.add(node.story_id)
+
+        # File conflicts (redundant, but harmless, for stories that are
+        # already ordered by dependencies)
+        owners: Dict[str, List[str]] = {}
+        for node in self.nodes.values():
+            for path in node.files:
+                owners.setdefault(path, []).append(node.story_id)
+        for story_ids in owners.values():
+            for a in story_ids:
+                for b in story_ids:
+                    if a != b:
+                        self.nodes[a].conflicts.add(b)
+
+        self.order = self._topological_order()
+        self._compute_critical_paths()
+
+    @classmethod
+    def from_wave_dir(cls, wave_dir: str, durations: Optional[Dict[str, float]] = None) -> "StoryDAG":
+        """Load every story JSON in a wave directory."""
+        stories = []
+        for name in sorted(os.listdir(wave_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(wave_dir, name)) as f:
+                    story = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"[StoryScheduler] Skipping {name}: {e}")
+                continue
+            story.setdefault("story_id", story_id_of(story, name[:-len(".json")]))
+            stories.append(story)
+        return cls(stories, durations)
+
+    def _topological_order(self) -> List[str]:
+        indegree = {sid: len(node.depends_on) for sid, node in self.nodes.items()}
+        ready = sorted(sid for sid, n in indegree.items() if n == 0)
+        order = []
+        while ready:
+            sid = ready.pop(0)
+            order.append(sid)
+            for dependent in sorted(self.nodes[sid].dependents):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.nodes):
+            raise StoryCycleError(sorted(sid for sid, n in indegree.items() if n > 0))
+        return order
+
+    def _compute_critical_paths(self) -> None:
+        for sid in reversed(self.order):
+            node = self.nodes[sid]
+            downstream = max((self.nodes[d].critical_path for d in node.dependents), default=0.0)
+            node.critical_path = node.duration + downstream
+
+    @property
+    def critical_path_length(self) -> float:
+        """Lower bound on makespan with unlimited workers."""
+        return max((n.critical_path for n in self.nodes.values()), default=0.0)
+
+    @property
+    def total_duration(self) -> float:
+        """Makespan of sequential dispatch."""
+        return sum(n.duration for n in self.nodes.values())
+
+    def priority_key(self, story_id: str) -> Tuple[float, int, str]:
+        """Sort key: longest critical path, then most dependents, then ID."""
+        node = self.nodes[story_id]
+        return (-node.critical_path, -len(node.dependents), story_id)
+
+    def ready(self, done: Set[str], running: Set[str], skip: Set[str] = frozenset()) -> List[str]:
+        """
+        Stories that can start now, highest priority first.
+
+        A story is ready when its dependencies are done and no story it
+        shares files with is running (or was picked earlier in this list).
+
+        Args:
+            done: Completed stories
+            running: Stories in progress
+            skip: Stories not to start (failed or blocked)
+        """
+        candidates = sorted(
+            (sid for sid, node in self.nodes.items()
+             if sid not in done and sid not in running and sid not in skip
+             and node.depends_on <= done),
+            key=self.priority_key
+        )
+        picked: List[str] = []
+        busy = set(running)
+        for sid in candidates:
+            if self.nodes[sid].conflicts.isdisjoint(busy):
+                picked.append(sid)
+                busy.add(sid)
+        return picked
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stories": len(self.nodes),
+            "order": self.order,
+            "critical_path_seconds": self.critical_path_length,
+            "sequential_seconds": self.total_duration,
+            "nodes": {
+                sid: {
+                    "queue": n.queue_domain,
+                    "duration": n.duration,
+                    "critical_path": n.critical_path,
+                    "depends_on": sorted(n.depends_on),
+                    "external_deps": sorted(n.external_deps),
+                    "conflicts": sorted(n.conflicts),
+                }
+                for sid, n in self.nodes.items()
+            },
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCHEDULER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class WaveScheduler:
+    """
+    Dispatches a wave's stories to the TaskQueue in dependency order.
+    """
+
+    def __init__(
+        self,
+        dag: StoryDAG,
+        max_parallel: Optional[int] = None,
+        wave: Optional[Any] = None,
+        leases: Optional[FileLeaseManager] = None,
+        forecaster: Optional[BudgetForecaster] = None,
+        budget: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            dag: Wave story DAG
+            max_parallel: Max stories in flight (default: no limit besides
+                dependencies and file conflicts)
+            wave: Wave number (added to task payloads)
+            leases: Lease story files before dispatch, release on completion
+            forecaster: Throttle dispatch and pick the model from the
+                budget forecast
+            budget: Wave budget for the forecast (token_limit,
+                cost_limit_usd, model)
+        """
+        self.dag = dag
+        self.max_parallel = max_parallel
+        self.wave = wave
+        self.leases = leases
+        self.forecaster = forecaster
+        self.budget = dict(budget or {})
+        self.model: Optional[str] = self.budget.get("model")
+        self.tokens_used = 0
+        self.cost_usd = 0.0
+        self.lease_waiting: Set[str] = set()
+        self.leases_renewed_at = 0.0
+        self.budget_waiting: Set[str] = set()
+        self.last_forecast: Optional[BudgetForecast] = None
+        self.done: Set[str] = set()
+        self.failed: Set[str] = set()
+        self.running: Dict[str, str] = {}       # story_id -> task_id
+        self.results: Dict[str, TaskResult] = {}
+
+    @property
+    def blocked(self) -> Set[str]:
+        """Stories that cannot run because a dependency failed."""
+        blocked: Set[str] = set()
+        stack = list(self.failed)
+        while stack:
+            for dependent in self.dag.nodes[stack.pop()].dependents:
+                if dependent not in blocked:
+                    blocked.add(dependent)
+                    stack.append(dependent)
+        return blocked
+
+    @property
+    def finished(self) -> bool:
+        remaining = set(self.dag.nodes) - self.done - self.failed - self.blocked
+        return not remaining and not self.running
+
+    def next_stories(self) -> List[str]:
+        """Stories to dispatch now, highest priority first."""
+        slots = None if self.max_parallel is None else self.max_parallel - len(self.running)
+        if slots is not None and slots <= 0:
+            return []
+        ready = self.dag.ready(self.done, set(self.running), skip=self.failed | self.blocked)
+        return ready if slots is None else ready[:slots]
+
+    def _budget_allowance(self, story_ids: List[str]) -> List[str]:
+        """Stories the budget forecast allows now; updates the model tier."""
+        queued = []
+        for story_id in story_ids:
+            node = self.dag.nodes[story_id]
+            expected = node.story.get("estimated_tokens")
+            queued.append({
+                "domain": node.queue_domain,
+                "payload": {"expected_tokens": expected, "model": self.model or ""},
+            })
+        forecast = self.forecaster.forecast(
+            tokens_used=self.tokens_used,
+            token_limit=self.budget.get("token_limit", 0),
+            cost_usd=self.cost_usd,
+            cost_limit_usd=self.budget.get("cost_limit_usd", 0.0),
+            queued=queued,
+            model=self.model
+        )
+        self.last_forecast = forecast
+        if forecast.recommended_model and forecast.recommended_model != self.model:
+            print(f"[StoryScheduler] Projected {forecast.projected_percentage:.0%} of budget; "
+                  f"downgrading {self.model} -> {forecast.recommended_model}")
+            self.model = forecast.recommended_model
+        if forecast.action == ForecastAction.HALT:
+            allowed = []
+        elif forecast.action == ForecastAction.THROTTLE:
+            allowed = story_ids[:forecast.dispatch_allowance]
+        else:
+            allowed = story_ids
+        self.budget_waiting = set(story_ids) - set(allowed)
+        if self.budget_waiting:
+            print(f"[StoryScheduler] Budget {forecast.action.value}: holding {sorted(self.budget_waiting)}")
+        return allowed
+
+    def _task_priority(self, story_id: str) -> int:
+        longest = self.dag.critical_path_length or 1.0
+        return max(0, min(10, round(10 * self.dag.nodes[story_id].critical_path / longest)))
+
+    def dispatch(self, queue: TaskQueue) -> List[AgentTask]:
+        """
+        Enqueue every story that is ready now.
+
+        Args:
+            queue: Task queue
+
+        Returns:
+            Tasks enqueued
+        """
+        tasks = []
+        self.lease_waiting = set()
+        self.budget_waiting = set()
+        story_ids = self.next_stories()
+        if self.forecaster is not None and story_ids:
+            story_ids = self._budget_allowance(story_ids)
+        for story_id in story_ids:
+            node = self.dag.nodes[story_id]
+            if self.leases is not None and node.files:
+                lease = self.leases.try_acquire(story_id, node.files)
+                if not lease.granted:
+                    # Held outside this wave - retried on the next dispatch
+                    self.lease_waiting.add(story_id)
+                    continue
+            task = AgentTask(
+                task_id=create_task_id(node.queue_domain, story_id),
+                story_id=story_id,
+                domain=node.queue_domain,
+                action="develop",
+                payload={
+                    "story": node.story,
+                    "wave": self.wave,
+                    "critical_path_seconds": node.critical_path,
+                },
+                priority=self._task_priority(story_id)
+            )
+            if self.model:
+                task.payload["model"] = self.model
+            if queue.enqueue(get_queue_for_domain(node.queue_domain), task):
+                self.running[story_id] = task.task_id
+                tasks.append(task)
+            elif self.leases is not None:
+                self.leases.release(story_id)
+        return tasks
+
+    def renew_leases(self, now: Optional[float] = None) -> int:
+        """
+        Extend the leases of running stories, at most every third of the
+        lease TTL (stories can run longer than one TTL).
+
+        Returns:
+            Number of lock entries renewed
+        """
+        if self.leases is None or not self.running:
+            return 0
+        now = now or time.time()
+        if now - self.leases_renewed_at < self.leases.ttl / 3:
+            return 0
+        self.leases_renewed_at = now
+        renewed = 0
+        for story_id in list(self.running):
+            try:
+                renewed += self.leases.renew(story_id)
+            except Exception as e:
+                print(f"[StoryScheduler] Lease renewal failed for {story_id}: {e}")
+        return renewed
+
+    def fail_budget_held(self) -> List[str]:
+        """
+        Fail the stories the budget forecast holds (called when nothing is
+        in flight, so waiting cannot free budget). Their dependents are
+        blocked as for any failure.
+
+        Returns:
+            Stories failed
+        """
+        held = sorted(self.budget_waiting)
+        if not held:
+            return []
+        forecast = self.last_forecast
+        error = "Held by budget forecast"
+        if forecast is not None:
+            error += (f" ({forecast.action.value}: projected {forecast.projected_tokens} tokens, "
+                      f"{forecast.projected_percentage:.0%} of budget)")
+        print(f"[StoryScheduler] Nothing in flight and budget exhausted; failing {held}")
+        self.budget_waiting = set()
+        for story_id in held:
+            node = self.dag.nodes[story_id]
+            self.complete(story_id, TaskResult(
+                task_id=create_task_id(node.queue_domain, story_id),
+                status=TaskStatus.FAILED,
+                domain=node.queue_domain,
+                agent_id="scheduler",
+                result={},
+                error=error
+            ))
+        return held
+
+    def complete(self, story_id: str, result: TaskResult) -> None:
+        """Record a story's result, unblocking its dependents on success."""
+        self.running.pop(story_id, None)
+        self.results[story_id] = result
+        tokens = int((result.result or {}).get("tokens", 0) or 0)
+        cost_usd = float((result.result or {}).get("cost_usd", 0.0) or 0.0)
+        self.tokens_used += tokens
+        self.cost_usd += cost_usd
+        if self.forecaster is not None and tokens:
+            domain = self.dag.nodes[story_id].queue_domain
+            self.forecaster.record(story_id, domain, tokens, cost_usd, self.model or "")
+            self.forecaster.record_task(domain, tokens)
+        if self.leases is not None:
+            self.leases.release(story_id)
+        if result.status == TaskStatus.COMPLETED:
+            self.done.add(story_id)
+        else:
+            self.failed.add(story_id)
+            print(f"[StoryScheduler] {story_id} {result.status.value}; blocking {sorted(self.dag.nodes[story_id].dependents)}")
+
+    def run(self, queue: TaskQueue, timeout: float = 3600, poll_interval: float = 0.5) -> Dict[str, TaskResult]:
+        """
+        Dispatch the whole wave and wait for it to finish.
+
+        Args:
+            queue: Task queue
+            timeout: Max wall time for the wave in seconds
+            poll_interval: Result polling interval
+
+        Returns:
+            Dict of story_id -> TaskResult (in-flight stories time out)
+        """
+        deadline = time.time() + timeout
+        self.leases_renewed_at = time.time()
+        self.dispatch(queue)
+        while not self.finished and time.time() < deadline:
+            self.renew_leases()
+            progressed = False
+            for story_id, task_id in list(self.running.items()):
+                result = queue.get_result(task_id)
+                if result:
+                    self.complete(story_id, result)
+                    progressed = True
+            if progressed:
+                self.dispatch(queue)
+            elif not self.running and not self.lease_waiting:
+                # Nothing in flight and nothing dispatchable (held by the
+                # budget, or enqueue failed)
+                if not self.dispatch(queue):
+                    if self.fail_budget_held():
+                        continue
+                    break
+            else:
+                time.sleep(poll_interval)
+                if self.lease_waiting:
+                    self.dispatch(queue)
+
+        for story_id, task_id in list(self.running.items()):
+            self.complete(story_id, TaskResult(
+                task_id=task_id,
+                status=TaskStatus.TIMEOUT,
+                domain=self.dag.nodes[story_id].queue_domain,
+                agent_id="unknown",
+                result={},
+                error=f"Wave timed out after {timeout}s"
+            ))
+        return self.results
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIMULATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def simulate_schedule(
+    dag: StoryDAG,
+    durations: Optional[Dict[str, float]] = None,
+    max_parallel: Optional[int] = None,
+    workers: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    Replay story durations through the scheduler's dispatch policy.
+
+    Dispatched stories wait in their agent queue (FIFO, like the TaskQueue)
+    until one of that queue's workers is free. While waiting they count as
+    in flight for max_parallel and file conflicts, as they do in
+    WaveScheduler.
+
+    Args:
+        dag: Wave story DAG
+        durations: Actual durations by story ID (default: DAG estimates)
+        max_parallel: Max stories in flight (None = unlimited)
+        workers: Agents per queue domain, e.g. {"fe": 1, "be": 2, "qa": 1}
+            (None = a free agent for every story; unlisted queues are
+            unlimited)
+
+    Returns:
+        Dict with makespan, sequential makespan, speedup, critical path,
+        queue wait and the per-story schedule
+    """
+    durations = durations or {}
+    workers = workers or {}
+    scheduler = WaveScheduler(dag, max_parallel=max_parallel)
+    clock = 0.0
+    events: List[Tuple[float, str]] = []
+    schedule: Dict[str, Dict[str, float]] = {}
+    waiting: Dict[str, deque] = {}
+    busy: Dict[str, int] = {}
+
+    def start_ready() -> None:
+        for story_id in scheduler.next_stories():
+            scheduler.running[story_id] = story_id
+            waiting.setdefault(dag.nodes[story_id].queue_domain, deque()).append((clock, story_id))
+        for domain, stories in waiting.items():
+            limit = workers.get(domain)
+            while stories and (limit is None or busy.get(domain, 0) < limit):
+                queued_at, story_id = stories.popleft()
+                duration = float(durations.get(story_id, dag.nodes[story_id].duration))
+                busy[domain] = busy.get(domain, 0) + 1
+                schedule[story_id] = {"queued": queued_at, "start": clock, "end": clock + duration}
+                heapq.heappush(events, (clock + duration, story_id))
+
+    def finish(story_id: str) -> None:
+        scheduler.running.pop(story_id, None)
+        scheduler.done.add(story_id)
+        busy[dag.nodes[story_id].queue_domain] -= 1
+
+    start_ready()
+    while events:
+        clock, story_id = heapq.heappop(events)
+        finish(story_id)
+        # Stories finishing at the same instant complete before dispatch
+        while events and events[0][0] == clock:
+            finish(heapq.heappop(events)[1])
+        start_ready()
+
+    sequential = sum(float(durations.get(sid, n.duration)) for sid, n in dag.nodes.items())
+    makespan = clock
+    return {
+        "stories": len(dag.nodes),
+        "max_parallel": max_parallel,
+        "workers": dict(workers) or None,
+        "makespan_seconds": round(makespan, 3),
+        "sequential_seconds": round(sequential, 3),
+        "critical_path_seconds": round(dag.critical_path_length, 3),
+        "speedup": round(sequential / makespan, 2) if makespan else None,
+        "peak_parallelism": _peak_parallelism(schedule),
+        "queue_wait_seconds": round(sum(s["start"] - s["queued"] for s in schedule.values()), 3),
+        "schedule": schedule,
+    }
+
+
+def _peak_parallelism(schedule: Dict[str, Dict[str, float]]) -> int:
+    points = sorted(
+        [(s["start"], 1) for s in schedule.values()] + [(s["end"], -1) for s in schedule.values()],
+        key=lambda p: (p[0], p[1])
+    )
+    peak = current = 0
+    for _, delta in points:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPORTS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+__all__ = [
+    "StoryNode",
+    "StoryCycleError",
+    "StoryDAG",
+    "WaveScheduler",
+    "simulate_schedule",
+    "estimate_duration",
+    "load_durations",
+    "story_dependencies",
+    "story_write_files",
+    "story_queue_domain",
+]
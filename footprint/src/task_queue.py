@@ -231,6 +231,39 @@ class TaskQueue:
             print(f"[TaskQueue] Dequeue error: {e}")
             return None
 
+    def release(self, queue: DomainQueue, task: AgentTask, reason: str = "") -> bool:
+        """
+        Return a dequeued task to the head of its queue (cancelled work).
+
+        Args:
+            queue: Queue the task was taken from
+            task: Task to release
+            reason: Why the task was released
+
+        Returns:
+            True if released
+        """
+        try:
+            task_key = f"wave:task:{task.task_id}"
+            self.redis.hset(task_key, mapping={
+                "status": TaskStatus.PENDING.value,
+                "released_at": datetime.now().isoformat(),
+                "release_reason": reason
+            })
+            # RPUSH: BRPOP takes it next
+            self.redis.rpush(queue.value, task.task_id)
+
+            self.redis.publish(f"{queue.value}:notify", json.dumps({
+                "event": "task_released",
+                "task_id": task.task_id,
+                "story_id": task.story_id,
+                "reason": reason
+            }))
+            return True
+        except Exception as e:
+            print(f"[TaskQueue] Release error: {e}")
+            return False
+
     def mark_in_progress(self, task_id: str, agent_id: str):
         """Mark task as in progress"""
         task_key = f"wave:task:{task_id}"
@@ -0,0 +1,53 @@
+"""
+Regression tests for create_constitutional_node (src/safety/constitutional.py).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.safety.constitutional import (
+    ConstitutionalChecker,
+    code_outside_files,
+    create_constitutional_node,
+)
+
+
+FILES = {f"lib/util{i}.ts": f"export const value{i} = {i};" for i in range(8)}
+SHELL = "```bash\nrm -rf /\n```"
+
+
+def file_blocks(files):
+    return "\n\n".join(f"```typescript:{path}\n{body}\n```" for path, body in files.items())
+
+
+def run_node(state, parallel_min_files):
+    checker = ConstitutionalChecker(use_grok=False, record_events=False)
+    node = create_constitutional_node(checker, parallel_min_files=parallel_min_files)
+    return node(state)["safety"]
+
+
+def test_code_outside_files():
+    assert code_outside_files(file_blocks(FILES) + "\n\n" + SHELL) == SHELL
+
+
+def test_parallel_path_checks_code_outside_file_blocks():
+    state = {"story_id": "S-1", "code": file_blocks(FILES) + "\n\n" + SHELL}
+
+    serial = run_node(state, parallel_min_files=None)
+    parallel = run_node(state, parallel_min_files=8)
+
+    assert serial["emergency_stop"]
+    assert parallel["emergency_stop"]
+    assert any(v.startswith("P001") for v in parallel["violations"])
+    assert parallel["constitutional_score"] == serial["constitutional_score"]
+
+
+def test_parallel_path_checks_code_when_file_contents_given():
+    state = {"story_id": "S-1", "code": SHELL, "file_contents": dict(FILES)}
+
+    parallel = run_node(state, parallel_min_files=8)
+
+    assert parallel["emergency_stop"]
+    assert any(v.startswith("P001") for v in parallel["violations"])
@@ -0,0 +1,47 @@
+"""
+Tests for DomainRouter (src/domains/domain_router.py).
+"""
+
+import os
+import re
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.domains.domain_router import DOMAIN_PATTERNS, DomainRouter
+
+
+def search_domains(text):
+    """Previous detection: re.search of every pattern."""
+    return {
+        domain for domain, patterns in DOMAIN_PATTERNS.items()
+        if any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+    }
+
+
+def vocabulary():
+    """Words and two-word terms the patterns match, plus filler."""
+    words = ["the", "a", "new", "with", "for", "add", "fix", "update", "list", "and"]
+    for patterns in DOMAIN_PATTERNS.values():
+        for pattern in patterns:
+            body = re.sub(r"\\b|\(\?:|\)|\?|\[s\]", "", pattern).replace("[- ]", " ")
+            terms = [w for w in re.split(r"[\s|]+", body) if w.isalpha()]
+            words.extend(terms)
+            # Two-word terms: first word with each alternative ("account page")
+            words.extend(f"{terms[0]} {term}" for term in terms[1:])
+    return sorted(set(words))
+
+
+def test_word_consumed_by_one_domain_counts_for_another():
+    router = DomainRouter()
+    assert {m.domain for m in router.rank("account page")} == search_domains("account page")
+
+
+def test_domain_set_matches_per_pattern_search():
+    router = DomainRouter()
+    words = vocabulary()
+    rng = random.Random(45)
+    for _ in range(5000):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+        assert {m.domain for m in router.rank(text)} == search_domains(text), text
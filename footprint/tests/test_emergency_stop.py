@@ -0,0 +1,49 @@
+"""
+Regression tests for EmergencyStop in watcher mode (src/safety/emergency_stop.py).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.safety import emergency_stop
+from src.safety.emergency_stop import EmergencyStop
+from src.safety.stop_watcher import SharedStopFlag
+
+
+@pytest.fixture
+def estop(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Stop log and audit events go under .claude/
+    stop_file = str(tmp_path / "EMERGENCY-STOP")
+    monkeypatch.setattr(emergency_stop, "EMERGENCY_STOP_FILE", stop_file)
+    monkeypatch.setattr(emergency_stop, "get_redis_client", lambda: None)
+    monkeypatch.setattr(EmergencyStop, "_shared_flag", SharedStopFlag(stop_file, path=str(tmp_path / "flag")))
+    monkeypatch.setattr(EmergencyStop, "_active", False)
+    EmergencyStop.start_watcher(mode="poll", poll_interval=60)
+    yield EmergencyStop(watch=False)
+    EmergencyStop.stop_watcher()
+
+
+def test_stale_shared_flag_does_not_reactivate(estop):
+    estop.trigger("test")
+    assert estop.check()
+
+    # Stop file removed by hand, then this process resumes (e.g. RESUME broadcast)
+    os.unlink(emergency_stop.EMERGENCY_STOP_FILE)
+    EmergencyStop._active = False
+
+    assert not estop.check()
+    assert not EmergencyStop._shared_flag.is_set()
+    assert not estop.check()
+
+
+def test_shared_flag_with_stop_file_activates(estop):
+    with open(emergency_stop.EMERGENCY_STOP_FILE, "w") as f:
+        f.write("sibling trigger")
+    EmergencyStop._shared_flag.set()
+
+    assert estop.check()
+    assert estop.get_reason() == "sibling trigger"
@@ -0,0 +1,48 @@
+"""
+Regression tests for JSONFileCache (orchestrator/tools/json_cache.py) and
+cached reads under PVariableStore.lock().
+"""
+
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "orchestrator", "tools"))
+
+from json_cache import JSONFileCache
+from p_store import PVariableStore
+
+
+def replace_same_stamp(path, data, indent=None):
+    """os.replace() same-size content and restore the old mtime (one tick)."""
+    st = os.stat(path)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=indent)
+    assert os.path.getsize(tmp) == st.st_size
+    os.replace(tmp, path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_same_size_replace_in_one_tick_is_reloaded(tmp_path):
+    path = str(tmp_path / "P.json")
+    with open(path, "w") as f:
+        json.dump({"gate": "1"}, f)
+    cache = JSONFileCache()
+    assert cache.load(path) == {"gate": "1"}
+
+    replace_same_stamp(path, {"gate": "2"})
+
+    assert cache.load(path) == {"gate": "2"}
+
+
+def test_transaction_starts_from_disk(tmp_path):
+    store = PVariableStore(str(tmp_path), journal=False)
+    store.update({"wave_state": {"gate": "1"}}, touch=False)
+    assert store.read()["wave_state"] == {"gate": "1"}
+
+    # Another process rewrites P.json without going through this cache
+    replace_same_stamp(store.path, {"wave_state": {"gate": "2"}}, indent=2)
+
+    with store.transaction(sections=("wave_state",)) as p:
+        assert p["wave_state"] == {"gate": "2"}
@@ -0,0 +1,120 @@
+"""
+Tests for the wave scheduler and simulator (src/story_scheduler.py).
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.file_leases import LeaseResult
+from src.safety.budget_forecast import BudgetForecaster
+from src.story_scheduler import StoryDAG, WaveScheduler, simulate_schedule
+from src.task_queue import TaskResult, TaskStatus
+
+
+def story(story_id, domain, seconds, deps=(), files=()):
+    return {"story_id": story_id, "domain": domain, "duration_seconds": seconds,
+            "dependencies": list(deps), "files": {"create": list(files)}}
+
+
+class FakeLeases:
+    """FileLeaseManager stand-in that records renewals."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.renewals = []
+
+    def try_acquire(self, holder, paths, ttl=None):
+        return LeaseResult(holder=holder, granted=True, paths=sorted(paths))
+
+    def renew(self, holder, ttl=None):
+        self.renewals.append((holder, time.time()))
+        return 1
+
+    def release(self, holder, paths=None):
+        return 0
+
+
+class FakeQueue:
+    """TaskQueue stand-in whose tasks finish after a fixed time."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.started = {}
+
+    def enqueue(self, queue_name, task):
+        self.started[task.task_id] = (task, time.time())
+        return True
+
+    def get_result(self, task_id):
+        task, started = self.started[task_id]
+        if time.time() - started < self.seconds:
+            return None
+        return TaskResult(task_id=task_id, status=TaskStatus.COMPLETED, domain=task.domain,
+                          agent_id="fake", result={})
+
+
+def test_simulation_waits_for_queue_workers():
+    dag = StoryDAG([
+        story("BE-01", "backend", 100),
+        story("BE-02", "backend", 100),
+        story("BE-03", "backend", 100),
+        story("FE-01", "frontend", 100),
+    ])
+
+    unlimited = simulate_schedule(dag)
+    assert unlimited["makespan_seconds"] == 100
+    assert unlimited["queue_wait_seconds"] == 0
+
+    limited = simulate_schedule(dag, workers={"be": 2, "fe": 1})
+    assert limited["makespan_seconds"] == 200
+    assert limited["queue_wait_seconds"] == 100
+    assert limited["peak_parallelism"] == 3
+
+
+def test_queued_story_starts_in_dispatch_order():
+    # BE-01 heads the longest chain, so it is dispatched (and started) first
+    dag = StoryDAG([
+        story("BE-01", "backend", 100),
+        story("BE-02", "backend", 100),
+        story("QA-01", "qa", 100, deps=["BE-01"]),
+    ])
+    result = simulate_schedule(dag, workers={"be": 1})
+    assert result["schedule"]["BE-01"]["start"] == 0
+    assert result["schedule"]["BE-02"]["start"] == 100
+    assert result["makespan_seconds"] == 200
+
+
+def test_run_renews_leases_of_running_stories():
+    dag = StoryDAG([story("BE-01", "backend", 100, files=["lib/a.ts"])])
+    leases = FakeLeases(ttl=0.3)
+    scheduler = WaveScheduler(dag, leases=leases)
+
+    results = scheduler.run(FakeQueue(seconds=0.7), timeout=5, poll_interval=0.02)
+
+    assert results["BE-01"].status == TaskStatus.COMPLETED
+    # Renewed about every ttl/3 while running: well before the lease expires
+    times = [t for holder, t in leases.renewals if holder == "BE-01"]
+    assert len(times) >= 4
+    assert max(b - a for a, b in zip(times, times[1:])) < leases.ttl
+
+
+def test_run_fails_stories_held_by_budget():
+    dag = StoryDAG([
+        dict(story(f"BE-0{i}", "backend", 100), estimated_tokens=30000) for i in range(1, 5)
+    ] + [story("QA-01", "qa", 100, deps=["BE-01"])])
+    scheduler = WaveScheduler(
+        dag,
+        forecaster=BudgetForecaster(horizon_seconds=0),
+        budget={"token_limit": 20000, "cost_limit_usd": 100.0}
+    )
+
+    results = scheduler.run(FakeQueue(seconds=0), timeout=5, poll_interval=0.01)
+
+    assert scheduler.finished
+    assert sorted(results) == ["BE-01", "BE-02", "BE-03", "BE-04"]
+    assert all(r.status == TaskStatus.FAILED for r in results.values())
+    assert "budget" in results["BE-01"].error
+    assert "QA-01" in scheduler.blocked
@@ -0,0 +1,40 @@
+"""
+Regression tests for StreamingSafetyScanner (src/safety/constitutional.py).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.safety.constitutional import (
+    ConstitutionalChecker,
+    CriticalViolationError,
+    StreamingSafetyScanner,
+)
+
+
+def stream(scanner, chunks):
+    for chunk in chunks:
+        scanner.feed(chunk)
+    return scanner.finish()
+
+
+def test_deferred_hit_does_not_hide_critical_env_pattern():
+    text = "const API_KEY = x; cat .env\n" + 400 * "a"
+    assert any(v.principle_id == "P002" for v in ConstitutionalChecker().check_patterns(text))
+
+    scanner = StreamingSafetyScanner()
+    with pytest.raises(CriticalViolationError) as excinfo:
+        stream(scanner, [text[:30], text[30:]])
+
+    assert excinfo.value.violation.principle_id == "P002"
+    assert excinfo.value.violation.matched_pattern == r"\.env"
+
+
+def test_skippable_hit_alone_is_still_deferred():
+    scanner = StreamingSafetyScanner(probe_chars=2048)
+    assert scanner.feed("const API_KEY = x;\n") == []
+    assert scanner._pending